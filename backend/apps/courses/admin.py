@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Lesson, LessonSchedule
+from .models import Lesson, LessonContentSnapshot, LessonSchedule
 
 
 class LessonScheduleInline(admin.TabularInline):
@@ -20,4 +20,11 @@ class LessonAdmin(admin.ModelAdmin):
 @admin.register(LessonSchedule)
 class LessonScheduleAdmin(admin.ModelAdmin):
     list_display = ('lesson', 'group_type', 'available_from')
-    list_filter = ('group_type',)
\ No newline at end of file
+    list_filter = ('group_type',)
+
+
+@admin.register(LessonContentSnapshot)
+class LessonContentSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('lesson', 'notion_page_id', 'source_last_edited_time', 'updated_at')
+    search_fields = ('lesson__title', 'notion_page_id')
+    readonly_fields = ('content_hash', 'source_last_edited_time', 'files_expire_at', 'created_at', 'updated_at')
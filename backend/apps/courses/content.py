@@ -0,0 +1,197 @@
+"""
+Dars Notion kontenti nusxalari (LessonContentSnapshot)
+
+Notion bloklari HTML ga so'rov siklida emas, sinxronlash vazifasida
+aylantiriladi va bazaga saqlanadi - LessonDetailView faqat tayyor HTML ni
+o'qiydi va Notionga murojaat qilmaydi. Nusxa yo'q bo'lsa sahifa Notion
+havolasi bilan ochiladi; yangi dars yoki page ID o'zgarganda nusxa
+dashboarddan fon oqimida tayyorlanadi.
+
+Sinxronlash inkremental: har bir sahifa uchun avval faqat metadata
+(/pages/{id}) so'raladi va last_edited_time nusxadagidan farq qilgan
+sahifalarning bloklari qayta yuklanadi. Notion fayllari (rasm, PDF)
+vaqtinchalik imzolangan havolalar bilan keladi - havolalari eskirayotgan
+nusxa sahifa o'zgarmagan bo'lsa ham qayta render qilinadi (files_expire_at).
+Davriy sinxronlash faqat cron orqali: manage.py sync_notion (har 10-15
+daqiqada, FILE_URL_REFRESH_MARGIN dan tez-tez).
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.background import run_in_background
+from integrations.notion import notion_client
+
+from .models import Lesson, LessonContentSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Notion last_edited_time daqiqagacha yaxlitlanadi: shu daqiqa ichida
+# sinxronlangan nusxa keyingi tahrirni o'tkazib yuborgan bo'lishi mumkin
+EDIT_TIME_PRECISION = timedelta(minutes=1)
+
+# Notion fayllari havolalari ~1 soatda eskiradi: muddati shu oraliqdan kam
+# qolgan nusxa keyingi sinxronlashda qayta render qilinadi (sinxronlash
+# davri bu oraliqdan qisqa bo'lishi kerak)
+FILE_URL_REFRESH_MARGIN = timedelta(minutes=20)
+
+
+@dataclass
+class NotionSyncResult:
+    """Sinxronlash natijasi"""
+    checked: int = 0
+    changed: int = 0  # HTML o'zgargan
+    unchanged: int = 0  # last_edited_time o'zgarmagan - bloklar yuklanmadi
+    failed: int = 0
+
+
+def get_content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def get_snapshot_html(lesson: Lesson) -> str:
+    """
+    Dars uchun tayyor HTML (Notionga murojaat qilmaydi)
+    content_snapshot oldindan select_related bilan yuklangan bo'lishi kerak
+    """
+    if not lesson.notion_page_id:
+        return ""
+
+    try:
+        snapshot = lesson.content_snapshot
+    except LessonContentSnapshot.DoesNotExist:
+        return ""
+
+    # Page ID almashtirilgan - eski sahifa kontentini ko'rsatmaymiz
+    if snapshot.notion_page_id != lesson.notion_page_id:
+        return ""
+    return snapshot.html
+
+
+def _parse_edit_time(page):
+    return parse_datetime(page.last_edited_time) if page.last_edited_time else None
+
+
+def is_snapshot_current(lesson: Lesson, last_edited_time) -> bool:
+    """Nusxa Notion sahifasining joriy holatiga mosmi (bloklarni yuklamasdan)"""
+    try:
+        snapshot = lesson.content_snapshot
+    except LessonContentSnapshot.DoesNotExist:
+        return False
+
+    return bool(
+        last_edited_time
+        and snapshot.notion_page_id == lesson.notion_page_id
+        and snapshot.source_last_edited_time == last_edited_time
+        and snapshot.updated_at >= last_edited_time + EDIT_TIME_PRECISION
+        and not snapshot_files_expiring(snapshot)
+    )
+
+
+def snapshot_files_expiring(snapshot: LessonContentSnapshot) -> bool:
+    """Nusxadagi Notion fayllari havolalari tez orada eskiradimi"""
+    return bool(
+        snapshot.files_expire_at
+        and snapshot.files_expire_at <= timezone.now() + FILE_URL_REFRESH_MARGIN
+    )
+
+
+def refresh_lesson_snapshot(lesson: Lesson, page=None) -> bool:
+    """
+    Dars Notion sahifasini yuklab, HTML nusxasini yangilash
+    page - oldindan olingan sahifa metadatasi (qayta so'ramaslik uchun)
+    Returns: True - HTML o'zgardi (yoki birinchi marta saqlandi)
+    Notion xatosida mavjud nusxa o'zgarishsiz qoladi
+    """
+    if not lesson.notion_page_id:
+        return False
+
+    page = page or notion_client.get_page(lesson.notion_page_id)
+    if not page:
+        return False
+
+    rendered = notion_client.render_page(lesson.notion_page_id)
+    if rendered is None:
+        return False
+
+    html = rendered.html
+    content_hash = get_content_hash(html)
+    last_edited_time = _parse_edit_time(page)
+
+    snapshot = LessonContentSnapshot.objects.filter(lesson=lesson).first()
+    if snapshot is None:
+        snapshot = LessonContentSnapshot(lesson=lesson)
+    elif snapshot.notion_page_id == lesson.notion_page_id and snapshot.content_hash == content_hash:
+        # Kontent o'zgarmagan - HTML ni qayta yozmaymiz
+        snapshot.source_last_edited_time = last_edited_time
+        snapshot.files_expire_at = rendered.files_expire_at
+        snapshot.save(update_fields=['source_last_edited_time', 'files_expire_at', 'updated_at'])
+        return False
+
+    snapshot.notion_page_id = lesson.notion_page_id
+    snapshot.html = html
+    snapshot.content_hash = content_hash
+    snapshot.source_last_edited_time = last_edited_time
+    snapshot.files_expire_at = rendered.files_expire_at
+    snapshot.save()
+    return True
+
+
+def sync_lesson_snapshots(lessons=None, force: bool = False) -> NotionSyncResult:
+    """
+    Darslar nusxalarini inkremental yangilash
+    Har bir sahifa uchun 1 ta metadata so'rovi; bloklar faqat o'zgargan sahifalar uchun
+    force - last_edited_time dan qat'i nazar hammasini qayta yuklash
+    """
+    if lessons is None:
+        lessons = Lesson.objects.exclude(notion_page_id='').order_by('order')
+    lessons = lessons.select_related('content_snapshot')
+
+    result = NotionSyncResult()
+    for lesson in lessons:
+        result.checked += 1
+        try:
+            page = notion_client.get_page(lesson.notion_page_id)
+            if not page:
+                result.failed += 1
+                continue
+
+            if not force and is_snapshot_current(lesson, _parse_edit_time(page)):
+                result.unchanged += 1
+                continue
+
+            if refresh_lesson_snapshot(lesson, page=page):
+                result.changed += 1
+            else:
+                result.unchanged += 1
+        except Exception:
+            result.failed += 1
+            logger.exception("Dars %s Notion kontentini yangilashda xatolik", lesson.id)
+    return result
+
+
+def get_snapshot_lock_key(lesson_id: int) -> str:
+    return f"lesson_snapshot_lock_{lesson_id}"
+
+
+def _run_refresh(lesson_id: int) -> None:
+    try:
+        lesson = Lesson.objects.filter(id=lesson_id).first()
+        if lesson:
+            refresh_lesson_snapshot(lesson)
+    except Exception:
+        logger.exception("Dars %s Notion kontentini yangilashda xatolik", lesson_id)
+
+
+def schedule_snapshot_refresh(lesson_id: int) -> bool:
+    """
+    Dars nusxasini fon oqimida yangilash (so'rovni bloklamaydi)
+    Returns: False - shu dars uchun yangilash allaqachon ishlayapti
+    """
+    return run_in_background(get_snapshot_lock_key(lesson_id), _run_refresh, lesson_id)
+
@@ -0,0 +1,121 @@
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from integrations.http import HTTPClientConfig, PooledHTTPClient
+
+STUB_BODY = b'{"object": "page", "id": "00000000-0000-0000-0000-000000000000", "properties": {}}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Notion /pages/{id} ga o'xshash javob; yangi ulanish handshake_delay ga sekinlashadi"""
+    protocol_version = 'HTTP/1.1'
+    # Sarlavha va tana bitta paketda (aks holda Nagle + delayed ACK ~40 ms qo'shadi)
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        # TCP+TLS handshake o'rniga (stub oddiy HTTP)
+        time.sleep(self.server.handshake_delay)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(STUB_BODY)))
+        self.end_headers()
+        self.wfile.write(STUB_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Integratsiya HTTP klientlarini lokal stub serverda solishtirish: har so'rovda "
+        "yangi httpx.Client, pooldagi sinxron klient va pooldagi asinxron klient. "
+        "So'rov/s, p50/p99 kechikish va ochilgan ulanishlar soni chiqariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--handshake-ms', type=float, default=20.0, help="Yangi ulanish narxi (ms)")
+        parser.add_argument('--concurrency', type=int, default=10, help="Asinxron klient uchun parallel so'rovlar")
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.connections = 0
+        server.handshake_delay = options['handshake_ms'] / 1000
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        config = HTTPClientConfig(base_url=base_url, max_connections=options['concurrency'])
+        pooled = PooledHTTPClient(config)
+        count = options['requests']
+
+        def fresh_client():
+            with httpx.Client(base_url=base_url, timeout=30.0) as client:
+                client.get('/pages/bench').raise_for_status()
+
+        def pooled_sync():
+            pooled.sync.get('/pages/bench').raise_for_status()
+
+        try:
+            self.stdout.write(f"Stub: {base_url}, so'rovlar: {count}, handshake: {options['handshake_ms']} ms\n")
+            self._run_sequential(server, "Har so'rovda yangi klient", fresh_client, count)
+            self._run_sequential(server, "Pool (sinxron)", pooled_sync, count)
+            self._run_async(server, pooled, count, options['concurrency'])
+        finally:
+            pooled.close()
+            server.shutdown()
+            server.server_close()
+
+    def _run_sequential(self, server, name: str, send, count: int) -> None:
+        server.connections = 0
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(count):
+            request_started = time.perf_counter()
+            send()
+            latencies.append(time.perf_counter() - request_started)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        self.stdout.write(
+            f"{name:<28} {count / elapsed:8.0f} so'rov/s   p50 {p50:6.2f} ms   "
+            f"p99 {p99:6.2f} ms   ulanishlar {server.connections}"
+        )
+
+    def _run_async(self, server, pooled: PooledHTTPClient, count: int, concurrency: int) -> None:
+        server.connections = 0
+
+        async def send_all(client):
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def send():
+                async with semaphore:
+                    response = await client.get('/pages/bench')
+                    response.raise_for_status()
+
+            await asyncio.gather(*(send() for _ in range(count)))
+
+        started = time.perf_counter()
+        pooled.run(send_all)
+        elapsed = time.perf_counter() - started
+
+        name = f"Pool (asinxron, {concurrency} parallel)"
+        self.stdout.write(
+            f"{name:<28} {count / elapsed:8.0f} so'rov/s   "
+            f"{'':>30}ulanishlar {server.connections}"
+        )
@@ -0,0 +1,130 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from integrations.notion.renderer import notion_renderer
+
+
+def _text(rng: random.Random, words: int = 12) -> list:
+    """Turli annotatsiyali rich_text bo'laklari"""
+    parts = []
+    for index in range(rng.randint(1, 4)):
+        parts.append({
+            'plain_text': ' '.join(f"so'z{rng.randint(0, 999)}" for _ in range(words)) + ' <&> ',
+            'annotations': {
+                'bold': rng.random() < 0.2,
+                'italic': rng.random() < 0.1,
+                'code': rng.random() < 0.05,
+                'color': rng.choice(['default', 'default', 'blue', 'red_background']),
+            },
+            'href': 'https://example.com' if rng.random() < 0.05 else None,
+        })
+    return parts
+
+
+def _block(block_type: str, **data) -> dict:
+    return {'type': block_type, 'has_children': False, block_type: data}
+
+
+def build_synthetic_page(blocks_count: int, seed: int = 0) -> list[dict]:
+    """Haqiqiy dars sahifasiga o'xshash bloklar (ichki bloklar ham hisobga olinadi)"""
+    rng = random.Random(seed)
+    blocks = []
+    count = 0
+
+    while count < blocks_count:
+        kind = rng.random()
+        if kind < 0.35:
+            blocks.append(_block('paragraph', rich_text=_text(rng)))
+            count += 1
+        elif kind < 0.45:
+            blocks.append(_block(rng.choice(['heading_1', 'heading_2', 'heading_3']), rich_text=_text(rng, 4)))
+            count += 1
+        elif kind < 0.65:
+            list_type = rng.choice(['bulleted_list_item', 'numbered_list_item'])
+            for _ in range(rng.randint(2, 6)):
+                blocks.append(_block(list_type, rich_text=_text(rng, 6)))
+                count += 1
+        elif kind < 0.70:
+            blocks.append(_block('to_do', rich_text=_text(rng, 5), checked=rng.random() < 0.5))
+            count += 1
+        elif kind < 0.75:
+            blocks.append(_block('code', rich_text=[{'plain_text': 'for i in range(10):\n    print(i < 5)'}],
+                                 language='python', caption=[]))
+            count += 1
+        elif kind < 0.80:
+            blocks.append(_block(rng.choice(['quote', 'callout']), rich_text=_text(rng),
+                                 icon={'type': 'emoji', 'emoji': '💡'}, color='blue_background'))
+            count += 1
+        elif kind < 0.87:
+            toggle = _block('toggle', rich_text=_text(rng, 4))
+            toggle['children'] = [_block('paragraph', rich_text=_text(rng)) for _ in range(3)]
+            blocks.append(toggle)
+            count += 4
+        elif kind < 0.92:
+            table = _block('table', has_column_header=True, has_row_header=False)
+            table['children'] = [
+                _block('table_row', cells=[_text(rng, 2) for _ in range(3)]) for _ in range(5)
+            ]
+            blocks.append(table)
+            count += 6
+        elif kind < 0.95:
+            columns = _block('column_list')
+            columns['children'] = []
+            for _ in range(2):
+                column = _block('column')
+                column['children'] = [_block('paragraph', rich_text=_text(rng)) for _ in range(2)]
+                columns['children'].append(column)
+            blocks.append(columns)
+            count += 7
+        elif kind < 0.98:
+            blocks.append(_block('image', type='external', external={'url': 'https://example.com/a.png'},
+                                 caption=_text(rng, 3)))
+            count += 1
+        else:
+            blocks.append(_block('divider'))
+            count += 1
+
+    return blocks
+
+
+class Command(BaseCommand):
+    help = (
+        "Notion rendererini sintetik sahifalarda o'lchash: blok/s va eng yuqori xotira "
+        "(butun HTML satr sifatida va StreamingHttpResponse kabi bo'laklab)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=5000, help="Sahifadagi bloklar soni")
+        parser.add_argument('--pages', type=int, default=20, help="Sahifalar soni")
+
+    def handle(self, *args, **options):
+        pages = [build_synthetic_page(options['blocks'], seed) for seed in range(options['pages'])]
+        total_blocks = options['blocks'] * len(pages)
+
+        def render_joined(blocks):
+            return len(notion_renderer.render(blocks))
+
+        def render_streamed(blocks):
+            # Bo'laklar yuborilgandan keyin xotirada saqlanmaydi
+            return sum(len(chunk) for chunk in notion_renderer.iter_html(blocks))
+
+        self.stdout.write(f"Sahifalar: {len(pages)} x {options['blocks']} blok\n")
+        for name, render in (('render() - bitta satr', render_joined), ('iter_html() - oqim', render_streamed)):
+            started = time.perf_counter()
+            size = sum(render(blocks) for blocks in pages)
+            elapsed = time.perf_counter() - started
+
+            # Xotira alohida o'lchanadi - tracemalloc vaqtni sekinlashtiradi
+            tracemalloc.start()
+            render(pages[0])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"{name:<24} {total_blocks / elapsed:10.0f} blok/s   "
+                f"{elapsed / len(pages) * 1000:7.1f} ms/sahifa   "
+                f"HTML {size / len(pages) / 1024:7.0f} KiB   eng yuqori xotira {peak / 1024:7.0f} KiB"
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.courses.content import sync_lesson_snapshots
+from apps.courses.models import Lesson
+
+
+class Command(BaseCommand):
+    help = (
+        "Darslarning Notion kontentini inkremental sinxronlash: faqat last_edited_time "
+        "o'zgargan sahifalar qayta yuklanadi (cron orqali davriy ishlatish uchun)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lesson', type=int, action='append', dest='lesson_ids', help="Dars ID (bir necha marta berish mumkin)")
+        parser.add_argument('--force', action='store_true', help="O'zgarmagan sahifalarni ham qayta yuklash")
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.exclude(notion_page_id='').order_by('order')
+        if options['lesson_ids']:
+            lessons = lessons.filter(id__in=options['lesson_ids'])
+
+        result = sync_lesson_snapshots(lessons, force=options['force'])
+
+        self.stdout.write(
+            f"Tekshirildi: {result.checked}, o'zgarmagan: {result.unchanged}, xato: {result.failed}"
+        )
+        style = self.style.WARNING if result.failed else self.style.SUCCESS
+        self.stdout.write(style(f"{result.changed} ta dars kontenti yangilandi"))
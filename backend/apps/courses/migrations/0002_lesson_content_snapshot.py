@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonContentSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('notion_page_id', models.CharField(max_length=100, verbose_name='Notion Page ID')),
+                ('html', models.TextField(blank=True, verbose_name='HTML')),
+                ('source_last_edited_time', models.DateTimeField(blank=True, null=True, verbose_name='Notionda oxirgi tahrir')),
+                ('content_hash', models.CharField(blank=True, max_length=64, verbose_name='Kontent xeshi')),
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='content_snapshot', to='courses.lesson', verbose_name='Dars')),
+            ],
+            options={
+                'verbose_name': 'Dars kontenti nusxasi',
+                'verbose_name_plural': 'Dars kontenti nusxalari',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_lesson_content_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessoncontentsnapshot',
+            name='files_expire_at',
+            field=models.DateTimeField(blank=True, help_text='HTML dagi Notion fayllari imzolangan havolalarining eng erta muddati', null=True, verbose_name='Fayl havolalari muddati'),
+        ),
+    ]
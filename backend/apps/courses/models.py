@@ -85,4 +85,47 @@ class LessonSchedule(TimeStampMixin):
         ordering = ['available_from']
 
     def __str__(self):
-        return f"{self.lesson.title} - {self.group_type.name}"
\ No newline at end of file
+        return f"{self.lesson.title} - {self.group_type.name}"
+
+
+class LessonContentSnapshot(TimeStampMixin):
+    """
+    Dars Notion sahifasining tayyor HTML nusxasi (sinxronlash vazifasi yangilaydi)
+    """
+    lesson = models.OneToOneField(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='content_snapshot',
+        verbose_name="Dars"
+    )
+    notion_page_id = models.CharField(
+        max_length=100,
+        verbose_name="Notion Page ID"
+    )
+    html = models.TextField(
+        blank=True,
+        verbose_name="HTML"
+    )
+    source_last_edited_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Notionda oxirgi tahrir"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Kontent xeshi"
+    )
+    files_expire_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="HTML dagi Notion fayllari imzolangan havolalarining eng erta muddati",
+        verbose_name="Fayl havolalari muddati"
+    )
+
+    class Meta:
+        verbose_name = "Dars kontenti nusxasi"
+        verbose_name_plural = "Dars kontenti nusxalari"
+
+    def __str__(self):
+        return f"{self.lesson.title} ({self.notion_page_id})"
@@ -1,7 +1,22 @@
-from django.db.models import QuerySet
+from dataclasses import dataclass
+
+from django.db.models import QuerySet, OuterRef, Subquery
 from django.utils import timezone
 
 from .models import Lesson, LessonSchedule
+from apps.progress.models import UserProgress
+from apps.progress.selectors import get_user_progress, get_lessons_access_map
+
+
+@dataclass
+class LessonPageContext:
+    """Dars sahifasi uchun kerakli barcha ma'lumotlar"""
+    lesson: Lesson
+    progress: UserProgress | None
+    prev_lesson: Lesson | None
+    next_lesson: Lesson | None
+    can_access: bool
+    can_access_next: bool
 
 
 def get_all_lessons(only_active: bool = True) -> QuerySet[Lesson]:
@@ -64,4 +79,47 @@ def is_lesson_available_for_user(lesson: Lesson, user) -> bool:
     if not schedule:
         return False
 
-    return schedule.available_from <= timezone.now()
\ No newline at end of file
+    return schedule.available_from <= timezone.now()
+
+
+def get_lesson_page_context(user, slug: str) -> LessonPageContext | None:
+    """
+    Dars sahifasi kontekstini o'zgarmas sondagi so'rovlar bilan yuklash:
+    dars + kontent nusxasi + qo'shnilar ID (1), qo'shni darslar (1), kirish huquqi (3), progress (1)
+    """
+    active_lessons = Lesson.objects.filter(is_active=True)
+
+    lesson = active_lessons.filter(slug=slug).select_related('content_snapshot').annotate(
+        prev_lesson_id=Subquery(
+            active_lessons.filter(order__lt=OuterRef('order')).order_by('-order').values('id')[:1]
+        ),
+        next_lesson_id=Subquery(
+            active_lessons.filter(order__gt=OuterRef('order')).order_by('order').values('id')[:1]
+        ),
+    ).first()
+
+    if not lesson:
+        return None
+
+    neighbour_ids = [i for i in (lesson.prev_lesson_id, lesson.next_lesson_id) if i]
+    neighbours = Lesson.objects.in_bulk(neighbour_ids) if neighbour_ids else {}
+    prev_lesson = neighbours.get(lesson.prev_lesson_id)
+    next_lesson = neighbours.get(lesson.next_lesson_id)
+
+    access_map = get_lessons_access_map(user, [lesson, next_lesson] if next_lesson else [lesson])
+
+    progress = get_user_progress(user.id, lesson.id)
+
+    # Keyingi darsga kirish mumkinmi
+    can_access_next = bool(
+        next_lesson and progress and progress.is_completed and access_map[next_lesson.id]
+    )
+
+    return LessonPageContext(
+        lesson=lesson,
+        progress=progress,
+        prev_lesson=prev_lesson,
+        next_lesson=next_lesson,
+        can_access=access_map[lesson.id],
+        can_access_next=can_access_next,
+    )
@@ -1,3 +1,232 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from integrations.notion import NotionPage, RenderedPage
+
+from apps.accounts.models import User
+from apps.groups.models import GroupType, Group
+from apps.progress.models import UserProgress
+from apps.progress.selectors import can_user_access_lesson
+
+from .content import (
+    get_content_hash,
+    refresh_lesson_snapshot,
+    sync_lesson_snapshots,
+)
+from .models import Lesson, LessonContentSnapshot, LessonSchedule
+from .selectors import get_lesson_page_context
+
+
+class LessonPageContextTests(TestCase):
+    """get_lesson_page_context uchun testlar"""
+
+    # Dars sahifasi konteksti uchun so'rovlar soni (darslar soniga bog'liq emas)
+    QUERY_BUDGET = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        group_type = GroupType.objects.create(name='7.0 A')
+        cls.group = Group.objects.create(name='A1', group_type=group_type)
+
+        opened = timezone.now() - timedelta(days=1)
+        cls.lessons = []
+        for order in range(1, 31):
+            lesson = Lesson.objects.create(title=f'Dars {order}', order=order)
+            LessonSchedule.objects.create(lesson=lesson, group_type=group_type, available_from=opened)
+            cls.lessons.append(lesson)
+
+        cls.student = User.objects.create_user(
+            phone_number='+998901234567',
+            full_name='Test Student',
+            group=cls.group
+        )
+        for lesson in cls.lessons[:3]:
+            UserProgress.objects.create(user=cls.student, lesson=lesson, is_completed=True)
+
+    def setUp(self):
+        self.student.refresh_from_db()
+        self.student.group  # guruhni oldindan yuklash
+
+    def test_query_budget(self):
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            get_lesson_page_context(self.student, self.lessons[2].slug)
+
+    def test_neighbours_and_access(self):
+        page = get_lesson_page_context(self.student, self.lessons[2].slug)
+
+        self.assertEqual(page.lesson, self.lessons[2])
+        self.assertEqual(page.prev_lesson, self.lessons[1])
+        self.assertEqual(page.next_lesson, self.lessons[3])
+        self.assertTrue(page.progress.is_completed)
+        self.assertTrue(page.can_access)
+        self.assertTrue(page.can_access_next)
+
+    def test_locked_lesson(self):
+        page = get_lesson_page_context(self.student, self.lessons[10].slug)
+
+        self.assertFalse(page.can_access)
+        self.assertFalse(page.can_access_next)
+        self.assertIsNone(page.progress)
+
+    def test_matches_single_lesson_check(self):
+        for lesson in self.lessons[:6]:
+            page = get_lesson_page_context(self.student, lesson.slug)
+            self.assertEqual(page.can_access, can_user_access_lesson(self.student, lesson))
+
+    def test_missing_lesson(self):
+        self.assertIsNone(get_lesson_page_context(self.student, 'no-such-lesson'))
+
+
+class LessonContentSnapshotTests(TestCase):
+    """Notion kontenti nusxalari uchun testlar"""
+
+    PAGE_ID = 'a' * 32
+
+    @classmethod
+    def setUpTestData(cls):
+        group_type = GroupType.objects.create(name='7.0 A')
+        group = Group.objects.create(name='A1', group_type=group_type)
+        cls.lesson = Lesson.objects.create(title='Dars 1', order=1, notion_page_id=cls.PAGE_ID)
+        LessonSchedule.objects.create(
+            lesson=cls.lesson, group_type=group_type, available_from=timezone.now() - timedelta(days=1)
+        )
+        cls.student = User.objects.create_user(
+            phone_number='+998901234567',
+            full_name='Test Student',
+            group=group
+        )
+
+    def mock_notion(self, html='<p>Salom</p>', last_edited_time='2024-05-01T10:00:00.000Z', files_expire_at=None):
+        page = NotionPage(
+            id=self.PAGE_ID, title='Dars', icon='', cover_url='', last_edited_time=last_edited_time
+        )
+        client = mock.patch('apps.courses.content.notion_client').start()
+        self.addCleanup(mock.patch.stopall)
+        client.get_page.return_value = page
+        client.render_page.return_value = RenderedPage(html=html, files_expire_at=files_expire_at)
+        return client
+
+    def test_refresh_creates_snapshot(self):
+        self.mock_notion()
+
+        self.assertTrue(refresh_lesson_snapshot(self.lesson))
+
+        snapshot = LessonContentSnapshot.objects.get(lesson=self.lesson)
+        self.assertEqual(snapshot.html, '<p>Salom</p>')
+        self.assertEqual(snapshot.content_hash, get_content_hash('<p>Salom</p>'))
+        self.assertEqual(snapshot.source_last_edited_time.year, 2024)
+
+    def test_unchanged_content_is_not_rewritten(self):
+        self.mock_notion()
+        refresh_lesson_snapshot(self.lesson)
+
+        self.mock_notion(last_edited_time='2024-06-01T10:00:00.000Z')
+        self.assertFalse(refresh_lesson_snapshot(self.lesson))
+        self.assertEqual(LessonContentSnapshot.objects.get().source_last_edited_time.month, 6)
+
+        self.mock_notion(html='<p>Yangi</p>')
+        self.assertTrue(refresh_lesson_snapshot(self.lesson))
+        self.assertEqual(LessonContentSnapshot.objects.get().html, '<p>Yangi</p>')
+
+    def test_notion_error_keeps_snapshot(self):
+        self.mock_notion()
+        refresh_lesson_snapshot(self.lesson)
+
+        client = self.mock_notion()
+        client.get_page.return_value = None
+        self.assertFalse(refresh_lesson_snapshot(self.lesson))
+        self.assertEqual(LessonContentSnapshot.objects.get().html, '<p>Salom</p>')
+
+    def test_detail_view_does_not_call_notion(self):
+        LessonContentSnapshot.objects.create(
+            lesson=self.lesson, notion_page_id=self.PAGE_ID, html='<p>Nusxa</p>'
+        )
+        client = self.mock_notion()
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse('student:lesson_detail', args=[self.lesson.slug]))
+
+        self.assertContains(response, '<p>Nusxa</p>')
+        client.get_page.assert_not_called()
+        client.render_page.assert_not_called()
+
+    def test_snapshot_of_replaced_page_is_hidden(self):
+        LessonContentSnapshot.objects.create(
+            lesson=self.lesson, notion_page_id='b' * 32, html='<p>Eski</p>'
+        )
+        self.client.force_login(self.student)
+
+        with mock.patch('apps.courses.content.run_in_background') as run:
+            response = self.client.get(reverse('student:lesson_detail', args=[self.lesson.slug]))
+            self.client.get(reverse('student:lesson_detail', args=[self.lesson.slug]))
+
+        self.assertNotContains(response, '<p>Eski</p>')
+        # Sahifa ko'rish fon vazifasini boshlamaydi - nusxani dashboard va cron yangilaydi
+        run.assert_not_called()
+
+    def test_sync_skips_unchanged_pages(self):
+        self.mock_notion()
+        refresh_lesson_snapshot(self.lesson)
+        # Sinxronlash tahrirdan bir daqiqadan ko'proq keyin bo'lgan
+        LessonContentSnapshot.objects.update(updated_at=timezone.now())
+
+        client = self.mock_notion()
+        result = sync_lesson_snapshots()
+
+        self.assertEqual((result.checked, result.changed, result.unchanged), (1, 0, 1))
+        client.get_page.assert_called_once()
+        client.render_page.assert_not_called()
+
+        client = self.mock_notion(html='<p>Yangi</p>', last_edited_time='2024-06-01T10:00:00.000Z')
+        result = sync_lesson_snapshots()
+
+        self.assertEqual(result.changed, 1)
+        client.render_page.assert_called_once()
+        self.assertEqual(LessonContentSnapshot.objects.get().html, '<p>Yangi</p>')
+
+    def test_sync_refetches_page_edited_during_last_sync(self):
+        self.mock_notion()
+        refresh_lesson_snapshot(self.lesson)
+        # last_edited_time daqiqagacha yaxlitlangan - shu daqiqadagi keyingi tahrir ko'rinmaydi
+        edited = LessonContentSnapshot.objects.get().source_last_edited_time
+        LessonContentSnapshot.objects.update(updated_at=edited + timedelta(seconds=30))
+
+        client = self.mock_notion()
+        sync_lesson_snapshots()
+
+        client.render_page.assert_called_once()
+
+    def test_sync_rerenders_expiring_file_urls(self):
+        self.mock_notion(files_expire_at=timezone.now() + timedelta(hours=1))
+        refresh_lesson_snapshot(self.lesson)
+        LessonContentSnapshot.objects.update(updated_at=timezone.now())
+
+        # Sahifa o'zgarmagan, havolalar hali yangi - bloklar yuklanmaydi
+        client = self.mock_notion()
+        sync_lesson_snapshots()
+        client.render_page.assert_not_called()
+
+        # Havolalar muddati yaqinlashdi - sahifa qayta render qilinadi
+        LessonContentSnapshot.objects.update(files_expire_at=timezone.now() + timedelta(minutes=5))
+        client = self.mock_notion(html='<img src="yangi">', files_expire_at=timezone.now() + timedelta(hours=1))
+        sync_lesson_snapshots()
+
+        client.render_page.assert_called_once()
+        snapshot = LessonContentSnapshot.objects.get()
+        self.assertEqual(snapshot.html, '<img src="yangi">')
+        self.assertGreater(snapshot.files_expire_at, timezone.now() + timedelta(minutes=30))
+
+    def test_sync_command(self):
+        self.mock_notion()
+        out = io.StringIO()
+
+        call_command('sync_notion', stdout=out)
 
-# Create your tests here.
+        self.assertEqual(LessonContentSnapshot.objects.get().html, '<p>Salom</p>')
+        self.assertIn('1 ta dars kontenti yangilandi', out.getvalue())
@@ -4,24 +4,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
+from core.utils import create_heartbeat_token
+
+from .content import get_snapshot_html
 from .models import Lesson
 from .selectors import (
     get_all_lessons,
     get_lesson_by_slug,
     get_available_lessons_for_group_type,
+    get_lesson_page_context,
     is_lesson_available_for_user
 )
 from apps.progress.selectors import (
     get_user_progress,
     get_all_user_progress,
     get_user_current_lesson,
-    can_user_access_lesson
+    get_progress_summary,
+    can_user_access_lesson,
+    get_lessons_access_map
+)
+from apps.progress.services import (
+    update_video_progress,
+    update_video_progress_batch,
+    mark_lesson_completed
 )
-from apps.progress.services import update_video_progress, mark_lesson_completed
 
 
 class StudentRequiredMixin(LoginRequiredMixin):
@@ -54,11 +65,14 @@ class StudentDashboardView(StudentRequiredMixin, View):
         available_lessons = get_available_lessons_for_group_type(user.group.group_type_id)
 
         # Progress
-        all_progress = get_all_user_progress(user.id)
-        current_lesson_number = get_user_current_lesson(user.id)
+        summary = get_progress_summary(user.id)
+        if summary:
+            current_lesson_number = summary.current_lesson
+            completed_count = summary.completed_count
+        else:
+            current_lesson_number = get_user_current_lesson(user.id)
+            completed_count = get_all_user_progress(user.id).filter(is_completed=True).count()
 
-        # Completed lessons count
-        completed_count = all_progress.filter(is_completed=True).count()
         total_lessons = available_lessons.count()
 
         # Progress percentage
@@ -94,12 +108,13 @@ class LessonListView(StudentRequiredMixin, View):
         available_lessons = get_available_lessons_for_group_type(user.group.group_type_id)
         all_progress = {p.lesson_id: p for p in get_all_user_progress(user.id)}
         current_lesson_number = get_user_current_lesson(user.id)
+        access_map = get_lessons_access_map(user, available_lessons)
 
         # Darslarni progress bilan birlashtirish
         lessons_with_progress = []
         for lesson in available_lessons:
             progress = all_progress.get(lesson.id)
-            can_access = can_user_access_lesson(user, lesson)
+            can_access = access_map.get(lesson.id, False)
 
             lessons_with_progress.append({
                 'lesson': lesson,
@@ -124,33 +139,20 @@ class LessonDetailView(StudentRequiredMixin, View):
         if not user.group:
             return render(request, 'student/no_group.html')
 
-        lesson = get_object_or_404(Lesson, slug=slug, is_active=True)
+        page = get_lesson_page_context(user, slug)
+        if not page:
+            raise Http404
+
+        lesson = page.lesson
 
         # Darsga kirish huquqini tekshirish
-        if not can_user_access_lesson(user, lesson):
+        if not page.can_access:
             messages.error(request, "Bu darsga hali kirishingiz mumkin emas. Oldingi darsni yakunlang.")
             return redirect('student:lesson_list')
 
-        # Progress
-        progress = get_user_progress(user.id, lesson.id)
-
-        # Oldingi va keyingi darslar
-        prev_lesson = Lesson.objects.filter(order__lt=lesson.order, is_active=True).order_by('-order').first()
-        next_lesson = Lesson.objects.filter(order__gt=lesson.order, is_active=True).order_by('order').first()
-
-        # Keyingi darsga kirish mumkinmi
-        can_access_next = False
-        if next_lesson and progress and progress.is_completed:
-            can_access_next = can_user_access_lesson(user, next_lesson)
-
-        # Notion content olish
-        notion_content = ""
-        if lesson.notion_page_id:
-            try:
-                from integrations.notion import get_lesson_content
-                notion_content = get_lesson_content(lesson)
-            except Exception as e:
-                print(f"Notion content error: {e}")
+        # Notion content - sinxronlangan nusxadan (Notionga so'rov yuborilmaydi,
+        # nusxani dashboard va sync_notion cron vazifasi yangilaydi)
+        notion_content = get_snapshot_html(lesson)
 
         # Kinescope secure URL
         kinescope_embed_url = ""
@@ -163,10 +165,12 @@ class LessonDetailView(StudentRequiredMixin, View):
 
         context = {
             'lesson': lesson,
-            'progress': progress,
-            'prev_lesson': prev_lesson,
-            'next_lesson': next_lesson,
-            'can_access_next': can_access_next,
+            'heartbeat_url': settings.HEARTBEAT_PATH,
+            'heartbeat_token': create_heartbeat_token(user.id, lesson.id),
+            'progress': page.progress,
+            'prev_lesson': page.prev_lesson,
+            'next_lesson': page.next_lesson,
+            'can_access_next': page.can_access_next,
             'notion_content': notion_content,
             'kinescope_embed_url': kinescope_embed_url,
         }
@@ -215,6 +219,65 @@ class UpdateProgressView(StudentRequiredMixin, View):
             return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchUpdateProgressView(StudentRequiredMixin, View):
+    """
+    Bir nechta heartbeatni bitta so'rovda qabul qilish (AJAX)
+    Body: {"events": [{"lesson": "<slug>", "position": 120}, ...]}
+
+    Eventlar tartibi ahamiyatsiz: har bir dars uchun eng katta pozitsiya
+    olinadi va baza ham faqat oshiradi, shuning uchun kechikkan yoki qayta
+    yuborilgan batch progressni orqaga qaytarmaydi (eski "ts" maydoni
+    e'tiborsiz qoldiriladi).
+    """
+    max_events = 500
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            events = data.get('events')
+
+            if not isinstance(events, list) or not events:
+                raise ValueError("events ro'yxati bo'sh yoki noto'g'ri")
+            if len(events) > self.max_events:
+                raise ValueError(f"Bitta so'rovda ko'pi bilan {self.max_events} ta event")
+
+            # Har bir dars uchun eng katta pozitsiya olinadi (progress orqaga qaytmaydi)
+            positions = {}
+            for index, event in enumerate(events):
+                if not isinstance(event, dict):
+                    raise ValueError(f"events[{index}]: obyekt bo'lishi kerak")
+
+                slug = event.get('lesson')
+                position = event.get('position')
+
+                if not isinstance(slug, str) or not slug:
+                    raise ValueError(f"events[{index}]: lesson talab qilinadi")
+                if isinstance(position, bool) or not isinstance(position, int) or position < 0:
+                    raise ValueError(f"events[{index}]: position musbat butun son bo'lishi kerak")
+
+                positions[slug] = max(position, positions.get(slug, 0))
+
+            lesson_ids = dict(
+                Lesson.objects.filter(
+                    slug__in=positions.keys(),
+                    is_active=True
+                ).values_list('slug', 'id')
+            )
+            unknown = sorted(set(positions) - set(lesson_ids))
+            if unknown:
+                raise ValueError(f"Dars topilmadi: {', '.join(unknown)}")
+
+            accepted = update_video_progress_batch(
+                request.user.id,
+                {lesson_ids[slug]: position for slug, position in positions.items()}
+            )
+
+            return JsonResponse({'success': True, 'accepted': accepted})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+
 class ProfileView(StudentRequiredMixin, View):
     """O'quvchi profili"""
     template_name = 'student/profile.html'
@@ -222,9 +285,14 @@ class ProfileView(StudentRequiredMixin, View):
     def get(self, request):
         user = request.user
         all_progress = get_all_user_progress(user.id)
-        current_lesson = get_user_current_lesson(user.id)
 
-        completed_count = all_progress.filter(is_completed=True).count()
+        summary = get_progress_summary(user.id)
+        if summary:
+            current_lesson = summary.current_lesson
+            completed_count = summary.completed_count
+        else:
+            current_lesson = get_user_current_lesson(user.id)
+            completed_count = all_progress.filter(is_completed=True).count()
 
         return render(request, self.template_name, {
             'user': user,
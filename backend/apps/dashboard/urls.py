@@ -19,6 +19,7 @@ urlpatterns = [
     path('groups/', views.GroupListView.as_view(), name='group_list'),
     path('groups/create/', views.GroupCreateView.as_view(), name='group_create'),
     path('groups/<int:pk>/', views.GroupDetailView.as_view(), name='group_detail'),
+    path('groups/<int:pk>/matrix/', views.GroupProgressMatrixView.as_view(), name='group_progress_matrix'),
     path('groups/<int:pk>/edit/', views.GroupEditView.as_view(), name='group_edit'),
     path('groups/<int:pk>/delete/', views.GroupDeleteView.as_view(), name='group_delete'),
 
@@ -34,6 +35,7 @@ urlpatterns = [
     path('lessons/create/', views.LessonCreateView.as_view(), name='lesson_create'),
     path('lessons/<int:pk>/', views.LessonDetailView.as_view(), name='lesson_detail'),
     path('lessons/<int:pk>/edit/', views.LessonEditView.as_view(), name='lesson_edit'),
+    path('lessons/<int:pk>/notion-preview/', views.LessonNotionPreviewView.as_view(), name='lesson_notion_preview'),
     path('lessons/<int:pk>/delete/', views.LessonDeleteView.as_view(), name='lesson_delete'),
 
     # Testlar
@@ -42,6 +44,9 @@ urlpatterns = [
     path('quizzes/<int:pk>/', views.QuizDetailView.as_view(), name='quiz_detail'),
     path('quizzes/<int:pk>/edit/', views.QuizEditView.as_view(), name='quiz_edit'),
     path('quizzes/<int:pk>/delete/', views.QuizDeleteView.as_view(), name='quiz_delete'),
+    path('quizzes/<int:pk>/regrade/', views.QuizRegradeView.as_view(), name='quiz_regrade'),
+    path('quizzes/<int:pk>/import/', views.QuizImportView.as_view(), name='quiz_import'),
+    path('quizzes/<int:pk>/export/', views.QuizExportView.as_view(), name='quiz_export'),
 
     # Savollar
     path('quizzes/<int:quiz_pk>/questions/create/', views.QuestionCreateView.as_view(), name='question_create'),
@@ -50,6 +55,9 @@ urlpatterns = [
     path('quizzes/<int:quiz_pk>/questions/<int:question_pk>/delete/', views.QuestionDeleteView.as_view(),
          name='question_delete'),
 
+    # Integratsiyalar
+    path('integrations/metrics/', views.IntegrationMetricsView.as_view(), name='integration_metrics'),
+
     # Adminlar
     path('admins/', views.AdminListView.as_view(), name='admin_list'),
     path('admins/create/', views.AdminCreateView.as_view(), name='admin_create'),
@@ -1,13 +1,21 @@
+import hmac
+import io
+from itertools import chain
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.views import View
 from django.contrib import messages
 from django.db.models import Count, Q
+from django.core.paginator import Paginator
 
 from .permissions import AdminRequiredMixin, SuperAdminRequiredMixin
 
 from apps.accounts.models import User
 from apps.accounts.services import create_student, create_admin, update_user
-from apps.accounts.selectors import get_user_by_id, get_students_by_group, get_all_admins
+from apps.accounts.selectors import get_user_by_id, get_all_admins
 
 from apps.groups.models import GroupType, Group
 from apps.groups.services import (
@@ -19,11 +27,16 @@ from apps.groups.selectors import (
     get_all_groups, get_groups_by_type, get_group_by_id
 )
 
+from apps.courses.content import schedule_snapshot_refresh
 from apps.courses.models import Lesson
 from apps.courses.services import create_lesson, update_lesson, delete_lesson
 from apps.courses.selectors import get_all_lessons, get_lesson_by_id
 
-from apps.progress.selectors import get_user_current_lesson
+from apps.progress.selectors import get_user_current_lesson, get_group_students_with_progress
+from apps.progress.analytics import build_group_progress_matrix
+
+from integrations.notion import notion_client
+from integrations.transport import integration_metrics
 
 
 # ============== DASHBOARD INDEX ==============
@@ -193,23 +206,44 @@ class GroupCreateView(AdminRequiredMixin, View):
 class GroupDetailView(AdminRequiredMixin, View):
     """Guruh tafsilotlari - o'quvchilar ro'yxati"""
     template_name = 'admin_panel/groups/detail.html'
+    paginate_by = 50
 
     def get(self, request, pk):
         group = get_object_or_404(Group.objects.select_related('group_type'), pk=pk)
-        students = get_students_by_group(pk)
+        students = get_group_students_with_progress(pk)
+
+        paginator = Paginator(students, self.paginate_by)
+        page_obj = paginator.get_page(request.GET.get('page'))
 
-        # Har bir o'quvchi uchun qaysi darsda ekanligini olish
-        students_with_progress = []
-        for student in students:
-            current_lesson = get_user_current_lesson(student.id)
-            students_with_progress.append({
+        students_with_progress = [
+            {
                 'student': student,
-                'current_lesson': current_lesson
-            })
+                'current_lesson': student.current_lesson,
+                'completed_count': student.completed_count,
+                'last_activity': student.last_activity,
+            }
+            for student in page_obj
+        ]
+
+        return render(request, self.template_name, {
+            'group': group,
+            'students_with_progress': students_with_progress,
+            'page_obj': page_obj,
+        })
+
+
+class GroupProgressMatrixView(AdminRequiredMixin, View):
+    """Guruh progress matritsasi (o'quvchilar x darslar) - HTMX orqali yuklanadi"""
+    template_name = 'admin_panel/groups/progress_matrix.html'
+
+    def get(self, request, pk):
+        group = get_object_or_404(Group, pk=pk)
+        matrix = build_group_progress_matrix(group)
 
         return render(request, self.template_name, {
             'group': group,
-            'students_with_progress': students_with_progress
+            'matrix_rows': matrix.rows(),
+            'lesson_columns': matrix.lesson_columns(),
         })
 
 
@@ -441,6 +475,8 @@ class LessonCreateView(AdminRequiredMixin, View):
             kinescope_video_id=kinescope_video_id,
             notion_page_id=notion_page_id
         )
+        if notion_page_id:
+            schedule_snapshot_refresh(lesson.id)
 
         messages.success(request, f"'{title}' darsi yaratildi")
         return redirect('dashboard:lesson_detail', pk=lesson.pk)
@@ -528,11 +564,36 @@ class LessonEditView(AdminRequiredMixin, View):
             notion_page_id=notion_page_id,
             is_active=is_active
         )
+        # Yangi sahifa kontentini oldindan tayyorlash
+        if notion_page_id and notion_page_id != lesson.notion_page_id:
+            schedule_snapshot_refresh(pk)
 
         messages.success(request, "O'zgarishlar saqlandi")
         return redirect('dashboard:lesson_list')
 
 
+class LessonNotionPreviewView(AdminRequiredMixin, View):
+    """Notion sahifani to'g'ridan-to'g'ri API dan ko'rish (snapshot va keshsiz, oqim bilan)"""
+    head_template_name = 'admin_panel/lessons/notion_preview_head.html'
+
+    def get(self, request, pk):
+        lesson = get_object_or_404(Lesson, pk=pk)
+        if not lesson.notion_page_id:
+            messages.error(request, "Notion sahifa ulanmagan")
+            return redirect('dashboard:lesson_detail', pk=pk)
+
+        chunks = notion_client.iter_page_html(lesson.notion_page_id)
+        if chunks is None:
+            messages.error(request, "Notion sahifani yuklab bo'lmadi")
+            return redirect('dashboard:lesson_detail', pk=pk)
+
+        head = render_to_string(self.head_template_name, {'lesson': lesson}, request=request)
+        return StreamingHttpResponse(
+            chain([head], chunks, ['</div>\n</body>\n</html>']),
+            content_type='text/html; charset=utf-8'
+        )
+
+
 class LessonDeleteView(AdminRequiredMixin, View):
     """Darsni o'chirish"""
 
@@ -543,6 +604,29 @@ class LessonDeleteView(AdminRequiredMixin, View):
         return redirect('dashboard:lesson_list')
 
 
+# ============== INTEGRATIONS ==============
+
+class IntegrationMetricsView(SuperAdminRequiredMixin, View):
+    """
+    Notion/Kinescope so'rovlari metrikalari (Prometheus text format)
+    Prometheus uchun: Authorization: Bearer <INTEGRATION_METRICS_TOKEN>
+    Javob faqat so'rovni olgan worker jarayoniniki (worker yorlig'i bilan)
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = settings.INTEGRATION_METRICS_TOKEN
+        authorization = request.headers.get('Authorization', '')
+        if token and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+            return View.dispatch(self, request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        return HttpResponse(
+            integration_metrics.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
 # ============== ADMINS ==============
 
 class AdminListView(SuperAdminRequiredMixin, View):
@@ -619,6 +703,10 @@ from apps.quizzes.services import (
     create_answer, update_answer, delete_answer,
     set_correct_answer
 )
+from apps.quizzes.analytics import get_quiz_item_analysis
+from apps.quizzes.regrade import start_regrade, is_regrade_running
+from apps.quizzes.transfer import detect_format, import_quiz_questions, export_quiz_questions
+from core.exceptions import QuizImportError
 
 
 class QuizListView(AdminRequiredMixin, View):
@@ -649,6 +737,8 @@ class QuizCreateView(AdminRequiredMixin, View):
         title = request.POST.get('title', '').strip()
         passing_score = request.POST.get('passing_score', 70)
         max_attempts = request.POST.get('max_attempts', 3)
+        shuffle_questions = request.POST.get('shuffle_questions') == 'on'
+        questions_per_attempt = request.POST.get('questions_per_attempt', '').strip()
 
         lessons = Lesson.objects.filter(
             is_active=True
@@ -662,7 +752,9 @@ class QuizCreateView(AdminRequiredMixin, View):
             lesson_id=int(lesson_id),
             title=title,
             passing_score=int(passing_score),
-            max_attempts=int(max_attempts)
+            max_attempts=int(max_attempts),
+            shuffle_questions=shuffle_questions,
+            questions_per_attempt=int(questions_per_attempt) if questions_per_attempt else None
         )
 
         messages.success(request, f"'{title}' testi yaratildi")
@@ -680,7 +772,15 @@ class QuizDetailView(AdminRequiredMixin, View):
             messages.error(request, "Test topilmadi")
             return redirect('dashboard:quiz_list')
 
-        return render(request, self.template_name, {'quiz': quiz})
+        analysis = get_quiz_item_analysis(quiz.id)
+
+        return render(request, self.template_name, {
+            'quiz': quiz,
+            'item_analysis': analysis.rows(quiz.questions.all()),
+            'analysed_attempts': analysis.attempts_count,
+            'cronbach_alpha': analysis.cronbach_alpha,
+            'regrade_running': is_regrade_running(quiz.id),
+        })
 
 
 class QuizEditView(AdminRequiredMixin, View):
@@ -705,6 +805,8 @@ class QuizEditView(AdminRequiredMixin, View):
         passing_score = request.POST.get('passing_score', 70)
         max_attempts = request.POST.get('max_attempts', 3)
         is_active = request.POST.get('is_active') == 'on'
+        shuffle_questions = request.POST.get('shuffle_questions') == 'on'
+        questions_per_attempt = request.POST.get('questions_per_attempt', '').strip()
 
         if not title:
             messages.error(request, "Test nomini kiriting")
@@ -715,7 +817,9 @@ class QuizEditView(AdminRequiredMixin, View):
             title=title,
             passing_score=int(passing_score),
             max_attempts=int(max_attempts),
-            is_active=is_active
+            is_active=is_active,
+            shuffle_questions=shuffle_questions,
+            questions_per_attempt=int(questions_per_attempt) if questions_per_attempt else None
         )
 
         messages.success(request, "O'zgarishlar saqlandi")
@@ -794,7 +898,7 @@ class QuestionEditView(AdminRequiredMixin, View):
             return redirect('dashboard:quiz_list')
 
         # Javoblarni list qilib tayyorlash
-        answers_list = list(question.answers.all())
+        answers_list = list(question.answers.order_by('id'))
         # 4 tagacha to'ldirish
         while len(answers_list) < 4:
             answers_list.append(None)
@@ -834,15 +938,21 @@ class QuestionEditView(AdminRequiredMixin, View):
         # Savolni yangilash
         update_question(question_pk, text=text, order=int(order) if order else 0)
 
-        # Mavjud javoblarni o'chirish
-        question.answers.all().delete()
+        # Javoblarni joyida yangilash - ID lar saqlanadi, shuning uchun
+        # urinishlardagi tanlangan javoblar (QuizAttemptAnswer) yo'qolmaydi
+        existing_answers = list(question.answers.order_by('id'))
+        old_correct_ids = {answer.id for answer in existing_answers if answer.is_correct}
 
-        # Yangi javoblarni yaratish
         for i in range(1, 5):
             answer_text = request.POST.get(f'answer_{i}', '').strip()
             is_correct = request.POST.get('correct_answer') == str(i)
+            existing = existing_answers[i - 1] if i <= len(existing_answers) else None
 
-            if answer_text:
+            if existing and answer_text:
+                update_answer(existing.id, text=answer_text, is_correct=is_correct)
+            elif existing:
+                delete_answer(existing.id)
+            elif answer_text:
                 create_answer(
                     question_id=question_pk,
                     text=answer_text,
@@ -850,9 +960,86 @@ class QuestionEditView(AdminRequiredMixin, View):
                 )
 
         messages.success(request, "Savol yangilandi")
+
+        # Kalit o'zgargan bo'lsa eski urinishlarni fonda qayta baholash
+        new_correct_ids = set(question.answers.filter(is_correct=True).values_list('id', flat=True))
+        # Qayta baholash ishlayotgan bo'lsa ham bu o'zgarish tugagach qayta baholanadi
+        if new_correct_ids != old_correct_ids and quiz.attempts.exists():
+            start_regrade(quiz_pk)
+            messages.info(request, "Javoblar kaliti o'zgardi - urinishlar fonda qayta baholanmoqda")
+
         return redirect('dashboard:quiz_detail', pk=quiz_pk)
 
 
+class QuizImportView(AdminRequiredMixin, View):
+    """Savollarni JSON/CSV fayldan import qilish"""
+
+    def post(self, request, pk):
+        quiz = get_quiz_by_id(pk)
+        if not quiz:
+            messages.error(request, "Test topilmadi")
+            return redirect('dashboard:quiz_list')
+
+        upload = request.FILES.get('file')
+        file_format = detect_format(upload.name) if upload else None
+
+        if not file_format:
+            messages.error(request, "JSON yoki CSV fayl tanlang")
+            return redirect('dashboard:quiz_detail', pk=quiz.pk)
+
+        try:
+            created = import_quiz_questions(
+                quiz.id,
+                io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''),
+                file_format
+            )
+        except QuizImportError as e:
+            messages.error(request, "Import bekor qilindi: " + '; '.join(e.errors))
+        else:
+            messages.success(request, f"{created} ta savol import qilindi")
+
+        return redirect('dashboard:quiz_detail', pk=quiz.pk)
+
+
+class QuizExportView(AdminRequiredMixin, View):
+    """Savollarni JSON/CSV ga eksport qilish (oqim bilan)"""
+
+    content_types = {
+        'json': 'application/json; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get(self, request, pk):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        file_format = request.GET.get('format', 'json')
+        if file_format not in self.content_types:
+            file_format = 'json'
+
+        response = StreamingHttpResponse(
+            export_quiz_questions(quiz.id, file_format),
+            content_type=self.content_types[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.pk}.{file_format}"'
+        return response
+
+
+class QuizRegradeView(AdminRequiredMixin, View):
+    """Test urinishlarini qayta baholashni fonda boshlash"""
+
+    def post(self, request, pk):
+        quiz = get_quiz_by_id(pk)
+        if not quiz:
+            messages.error(request, "Test topilmadi")
+            return redirect('dashboard:quiz_list')
+
+        if start_regrade(quiz.id):
+            messages.success(request, "Qayta baholash boshlandi")
+        else:
+            messages.warning(request, "Qayta baholash allaqachon ishlayapti - tugagach yana bir marta baholanadi")
+
+        return redirect('dashboard:quiz_detail', pk=quiz.pk)
+
+
 class QuestionDeleteView(AdminRequiredMixin, View):
     """Savolni o'chirish"""
 
@@ -1,10 +1,32 @@
 from django.contrib import admin
 
-from .models import UserProgress
+from .models import UserProgress, StudentProgressSummary
+from .services import refresh_progress_summary
 
 
 @admin.register(UserProgress)
 class UserProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'lesson', 'progress_percent', 'is_completed', 'completed_at')
     list_filter = ('is_completed', 'lesson')
-    search_fields = ('user__full_name', 'user__phone_number')
\ No newline at end of file
+    search_fields = ('user__full_name', 'user__phone_number')
+
+    # Admin orqali o'zgarishlar servislarni chetlab o'tadi - jamlanmani qayta hisoblash
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_progress_summary(obj.user_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_progress_summary(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            refresh_progress_summary(user_id)
+
+
+@admin.register(StudentProgressSummary)
+class StudentProgressSummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'completed_count', 'highest_completed_order', 'percent_complete', 'last_activity_at')
+    search_fields = ('user__full_name', 'user__phone_number')
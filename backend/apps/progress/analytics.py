@@ -0,0 +1,114 @@
+"""
+Guruh progress matritsasi (o'quvchilar x darslar)
+
+Guruhning barcha UserProgress yozuvlari bitta so'rov bilan olinadi va
+NumPy matritsalariga joylanadi; statistikalar vektorlashtirilgan holda
+hisoblanadi.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .models import UserProgress
+
+
+@dataclass
+class GroupProgressMatrix:
+    """Guruh progress matritsasi"""
+    students: list
+    lessons: list
+    completed: np.ndarray  # (students, lessons) bool
+    watch_percent: np.ndarray  # (students, lessons) 0..100
+    lesson_completion_rates: np.ndarray  # (lessons,) 0..100
+    student_completed_counts: np.ndarray  # (students,)
+    student_percentiles: np.ndarray  # (students,) 0..100
+
+    def rows(self) -> list[dict]:
+        """Template uchun qatorlar"""
+        completed = self.completed.tolist()
+        watch_percent = self.watch_percent.astype(int).tolist()
+        # Heatmap katak shaffofligi (0.05..1.00)
+        opacity = np.maximum(self.watch_percent / 100, 0.05).round(2).tolist()
+        completed_counts = self.student_completed_counts.tolist()
+        percentiles = self.student_percentiles.astype(int).tolist()
+
+        return [
+            {
+                'student': student,
+                'cells': list(zip(completed[i], watch_percent[i], opacity[i])),
+                'completed_count': completed_counts[i],
+                'percentile': percentiles[i],
+            }
+            for i, student in enumerate(self.students)
+        ]
+
+    def lesson_columns(self) -> list[dict]:
+        """Template uchun ustunlar"""
+        rates = self.lesson_completion_rates.astype(int).tolist()
+        return [
+            {'lesson': lesson, 'completion_rate': rates[j]}
+            for j, lesson in enumerate(self.lessons)
+        ]
+
+
+def build_group_progress_matrix(group) -> GroupProgressMatrix:
+    """
+    Guruh uchun progress matritsasini qurish
+    So'rovlar: o'quvchilar (1), ochiq darslar (1), progress yozuvlari (1)
+    """
+    from apps.accounts.selectors import get_students_by_group
+    from apps.courses.selectors import get_available_lessons_for_group_type
+
+    students = list(get_students_by_group(group.id).order_by('full_name', 'id'))
+    lessons = list(get_available_lessons_for_group_type(group.group_type_id))
+
+    shape = (len(students), len(lessons))
+    completed = np.zeros(shape, dtype=bool)
+    video_progress = np.zeros(shape, dtype=np.float64)
+
+    if students and lessons:
+        student_index = {student.id: i for i, student in enumerate(students)}
+        lesson_index = {lesson.id: j for j, lesson in enumerate(lessons)}
+
+        rows = UserProgress.objects.filter(
+            user_id__in=student_index.keys(),
+            lesson_id__in=lesson_index.keys()
+        ).values_list('user_id', 'lesson_id', 'video_progress', 'is_completed')
+
+        records = np.array(
+            [(student_index[u], lesson_index[l], seconds, done) for u, l, seconds, done in rows],
+            dtype=np.int64
+        ).reshape(-1, 4)
+
+        i, j = records[:, 0], records[:, 1]
+        video_progress[i, j] = records[:, 2]
+        completed[i, j] = records[:, 3].astype(bool)
+
+    # Video davomiyligi 0 bo'lgan darslar uchun foiz 0 (UserProgress.progress_percent kabi)
+    durations = np.array([lesson.video_duration for lesson in lessons], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        watch_percent = np.where(durations > 0, video_progress / durations * 100, 0)
+    watch_percent = np.clip(np.floor(watch_percent), 0, 100)
+
+    lesson_completion_rates = (
+        completed.mean(axis=0) * 100 if students else np.zeros(len(lessons))
+    )
+
+    # Percentil: guruhdagi o'quvchilarning necha foizi shu natijadan oshmagan
+    student_completed_counts = completed.sum(axis=1)
+    sorted_counts = np.sort(student_completed_counts)
+    student_percentiles = (
+        np.searchsorted(sorted_counts, student_completed_counts, side='right') / len(students) * 100
+        if students else np.zeros(0)
+    )
+
+    return GroupProgressMatrix(
+        students=students,
+        lessons=lessons,
+        completed=completed,
+        watch_percent=watch_percent,
+        lesson_completion_rates=lesson_completion_rates,
+        student_completed_counts=student_completed_counts,
+        student_percentiles=student_percentiles,
+    )
@@ -4,4 +4,13 @@ from django.apps import AppConfig
 class ProgressConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.progress'
-    verbose_name = 'Progress'
\ No newline at end of file
+    verbose_name = 'Progress'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .buffer import is_write_behind_enabled, flush_video_progress_buffer
+
+        # Process to'xtaganda buferdagi heartbeatlarni yo'qotmaslik
+        if is_write_behind_enabled():
+            import atexit
+            atexit.register(flush_video_progress_buffer)
@@ -0,0 +1,197 @@
+"""
+Video progress write-behind buffer
+
+Heartbeatlar darhol bazaga yozilmaydi: har biri cache dagi alohida slotga
+tushadi, flush esa (user, lesson) bo'yicha eng katta pozitsiyani olib
+davriy ravishda bitta bulk upsert bilan bazaga yozadi. Bir nechta worker
+bilan umumiy cache (Redis/Memcached) kerak - LocMemCache har bir jarayonda
+alohida.
+
+Sozlamalar:
+    PROGRESS_WRITE_BEHIND - buferni yoqish (default: False)
+    PROGRESS_FLUSH_INTERVAL - flush oralig'i sekundlarda (default: 30)
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import UserProgress
+from .upsert import supports_upsert, upsert_video_progress
+
+KEY_PREFIX = 'progress_buffer'
+GENERATION_KEY = f'{KEY_PREFIX}_generation'
+FLUSH_LOCK_KEY = f'{KEY_PREFIX}_flush_lock'
+FLUSHED_AT_KEY = f'{KEY_PREFIX}_flushed_at'
+
+# Bekor qilish belgisi avlod o'chirilgandan keyin ham qolsa - o'zi eskiradi
+DISCARD_TIMEOUT = 60 * 60 * 24
+
+
+def is_write_behind_enabled() -> bool:
+    """Write-behind rejimi yoqilganmi?"""
+    return getattr(settings, 'PROGRESS_WRITE_BEHIND', False)
+
+
+def _discard_key(generation: int, user_id: int, lesson_id: int) -> str:
+    return f'{KEY_PREFIX}_{generation}_{user_id}_{lesson_id}_discard'
+
+
+def _slot_count_key(generation: int) -> str:
+    return f'{KEY_PREFIX}_{generation}_slots'
+
+
+def _slot_key(generation: int, slot: int) -> str:
+    return f'{KEY_PREFIX}_{generation}_slot_{slot}'
+
+
+def _incr(key: str) -> int:
+    """Atomik hisoblagich (cache.incr kalit yo'q bo'lsa ValueError beradi)"""
+    cache.add(key, 0, None)
+    return cache.incr(key)
+
+
+def _current_generation() -> int:
+    cache.add(GENERATION_KEY, 1, None)
+    return cache.get(GENERATION_KEY) or 1
+
+
+def buffer_video_progress(user_id: int, lesson_id: int, progress_seconds: int) -> None:
+    """
+    Heartbeatni buferga qo'shish
+
+    Har bir heartbeat atomik incr bilan ajratilgan o'z slotiga yoziladi -
+    umumiy qiymatni o'qib-yozish (get/set) yo'q, shuning uchun parallel
+    heartbeatlar bir-birining pozitsiyasini ustidan yozmaydi. Maksimal
+    pozitsiya flush paytida olinadi.
+
+    Slotlar avlodlarga (generation) bo'lingan: flush avlodni yopadi va
+    yangi heartbeatlar keyingisiga tushadi, shuning uchun flush o'qigan
+    yozuvni o'chirib yuborish holati yo'q.
+    """
+    generation = _current_generation()
+    slot = _incr(_slot_count_key(generation))
+    cache.set(_slot_key(generation, slot), (user_id, lesson_id, progress_seconds), None)
+
+    _maybe_flush()
+
+
+def _maybe_flush() -> None:
+    """Davriy flush: interval o'tganda faqat bitta so'rov flush qiladi"""
+    interval = getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 30)
+    now = time.time()
+
+    flushed_at = cache.get(FLUSHED_AT_KEY)
+    if flushed_at is None:
+        cache.set(FLUSHED_AT_KEY, now, None)
+        return
+
+    if now - flushed_at >= interval and cache.add(FLUSH_LOCK_KEY, 1, interval):
+        cache.set(FLUSHED_AT_KEY, now, None)
+        flush_video_progress_buffer()
+
+
+def discard_buffered_progress(user_id: int, lesson_id: int) -> None:
+    """
+    Buferdagi qiymatni bekor qilish (masalan progress reset qilinganda)
+    Shu paytgacha ajratilgan slotlar flush da o'tkazib yuboriladi
+    """
+    generation = _current_generation()
+    # Hali yozilmagan yopiq avlodlar ham (flush ularni qayta yozmasin)
+    for g in range(max(1, generation - 2), generation + 1):
+        cache.set(_discard_key(g, user_id, lesson_id), cache.get(_slot_count_key(g)) or 0, DISCARD_TIMEOUT)
+
+
+def _read_generation(generation: int, pending: dict[tuple[int, int], int]) -> list[str]:
+    """Avlod slotlarini pending ga qo'shish. Returns: avlodning barcha kalitlari"""
+    count = cache.get(_slot_count_key(generation)) or 0
+    slot_keys = [_slot_key(generation, slot) for slot in range(1, count + 1)]
+    entries = cache.get_many(slot_keys)
+
+    discard_keys = {
+        _discard_key(generation, user_id, lesson_id): (user_id, lesson_id)
+        for user_id, lesson_id, _ in entries.values()
+    }
+    discarded = {discard_keys[key]: slot for key, slot in cache.get_many(list(discard_keys)).items()}
+
+    for slot, key in enumerate(slot_keys, start=1):
+        if key not in entries:
+            continue
+        user_id, lesson_id, progress_seconds = entries[key]
+        pair = (user_id, lesson_id)
+        if slot <= discarded.get(pair, 0):
+            continue
+        pending[pair] = max(progress_seconds, pending.get(pair, 0))
+
+    return [_slot_count_key(generation), *slot_keys, *discard_keys]
+
+
+def flush_video_progress_buffer() -> int:
+    """
+    Buferdagi barcha heartbeatlarni bazaga yozish
+
+    Joriy avlod yopiladi va u bilan birga oldingi (allaqachon bir marta
+    yozilgan) avlod o'qiladi: yopilish paytida generation ni o'qib ulgurgan
+    kechikkan heartbeatlar shu ikkinchi o'tishda yoziladi. Upsert faqat
+    oshiradi (GREATEST), shuning uchun qayta yozish zararsiz. Ikkinchi
+    o'tishdan keyin avlod kalitlari o'chiriladi.
+
+    Returns: yangilangan yozuvlar soni
+    """
+    closed = _incr(GENERATION_KEY) - 1
+
+    pending = {}
+    _read_generation(closed, pending)
+    if closed > 1:
+        cache.delete_many(_read_generation(closed - 1, pending))
+
+    if not pending:
+        return 0
+
+    if supports_upsert():
+        count = len(upsert_video_progress(pending))
+    else:
+        count = _bulk_upsert_video_progress(pending)
+
+    from .services import touch_progress_activity
+    touch_progress_activity(user_id for user_id, _ in pending)
+    return count
+
+
+def _bulk_upsert_video_progress(pending: dict[tuple[int, int], int]) -> int:
+    """ON CONFLICT qo'llab-quvvatlanmaydigan bazalar uchun: mavjud qiymatlarni o'qib, bulk upsert"""
+    user_ids = {user_id for user_id, _ in pending}
+    lesson_ids = {lesson_id for _, lesson_id in pending}
+
+    existing = {
+        (user_id, lesson_id): video_progress
+        for user_id, lesson_id, video_progress in UserProgress.objects.filter(
+            user_id__in=user_ids,
+            lesson_id__in=lesson_ids
+        ).values_list('user_id', 'lesson_id', 'video_progress')
+    }
+
+    now = timezone.now()
+    rows = [
+        UserProgress(
+            user_id=user_id,
+            lesson_id=lesson_id,
+            video_progress=progress_seconds,
+            created_at=now,
+            updated_at=now
+        )
+        for (user_id, lesson_id), progress_seconds in pending.items()
+        if progress_seconds > existing.get((user_id, lesson_id), -1)
+    ]
+
+    if rows:
+        UserProgress.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'lesson'],
+            update_fields=['video_progress', 'updated_at']
+        )
+
+    return len(rows)
@@ -0,0 +1,150 @@
+"""
+Middleware'siz video heartbeat endpointi
+
+Heartbeat (20 baytli JSON) uchun sessiya, CSRF, messages, HTMX kabi
+middleware'lar kerak emas. Bu modul WSGI/ASGI ilovani o'raydi va
+HEARTBEAT_PATH ga kelgan so'rovlarni Django request/response siklisiz
+qayta ishlaydi. Autentifikatsiya - LessonDetailView beradigan imzolangan
+qisqa muddatli token (core.utils.create_heartbeat_token).
+
+Body: {"token": "<heartbeat token>", "position": 120}
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.courses.models import Lesson
+from core.utils import verify_heartbeat_token
+from .services import update_video_progress
+
+MAX_BODY_SIZE = 1024
+
+# UserProgress.video_progress (PositiveIntegerField) chegarasi
+MAX_POSITION = 2_147_483_647
+
+STATUS_TEXT = {
+    200: '200 OK',
+    400: '400 Bad Request',
+    401: '401 Unauthorized',
+    405: '405 Method Not Allowed',
+    413: '413 Payload Too Large',
+}
+
+
+def get_heartbeat_path() -> str:
+    return getattr(settings, 'HEARTBEAT_PATH', '/heartbeat/')
+
+
+def handle_heartbeat(body: bytes) -> tuple[int, dict]:
+    """
+    Heartbeatni qayta ishlash
+    Returns: (status_code, json_payload)
+    """
+    try:
+        data = json.loads(body)
+        token = data['token']
+        position = int(data['position'])
+    except (ValueError, TypeError, KeyError, OverflowError):
+        # OverflowError - JSON dagi 1e400 kabi cheksiz son
+        return 400, {'success': False, 'error': 'invalid_body'}
+
+    if not 0 <= position <= MAX_POSITION:
+        return 400, {'success': False, 'error': 'invalid_position'}
+
+    payload = verify_heartbeat_token(token, settings.HEARTBEAT_TOKEN_MAX_AGE)
+    if not payload:
+        return 401, {'success': False, 'error': 'invalid_token'}
+
+    user_id, lesson_id = payload
+
+    # request_started/request_finished signallari yuborilmaydi,
+    # shuning uchun eskirgan ulanishlarni o'zimiz yopamiz
+    close_old_connections()
+    try:
+        duration = Lesson.objects.filter(id=lesson_id).values_list('video_duration', flat=True).first()
+        if duration is None:
+            return 400, {'success': False, 'error': 'invalid_lesson'}
+        # Davomiyligi noma'lum (0) darsda faqat MAX_POSITION tekshiriladi
+        if duration and position > duration:
+            return 400, {'success': False, 'error': 'invalid_position'}
+
+        update_video_progress(user_id, lesson_id, position)
+    finally:
+        close_old_connections()
+
+    return 200, {'success': True}
+
+
+class HeartbeatWSGIMiddleware:
+    """WSGI ilova oldidagi heartbeat fast path"""
+
+    def __init__(self, application):
+        self.application = application
+        self.path = get_heartbeat_path()
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') != self.path:
+            return self.application(environ, start_response)
+
+        if environ.get('REQUEST_METHOD') != 'POST':
+            status, payload = 405, {'success': False, 'error': 'method_not_allowed'}
+        else:
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+
+            if length > MAX_BODY_SIZE:
+                status, payload = 413, {'success': False, 'error': 'too_large'}
+            else:
+                status, payload = handle_heartbeat(environ['wsgi.input'].read(length))
+
+        body = json.dumps(payload).encode()
+        start_response(STATUS_TEXT[status], [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Cache-Control', 'no-store'),
+        ])
+        return [body]
+
+
+class HeartbeatASGIMiddleware:
+    """ASGI ilova oldidagi heartbeat fast path"""
+
+    def __init__(self, application):
+        self.application = application
+        self.path = get_heartbeat_path()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            return await self.application(scope, receive, send)
+
+        if scope['method'] != 'POST':
+            status, payload = 405, {'success': False, 'error': 'method_not_allowed'}
+        else:
+            body = b''
+            more_body = True
+            while more_body and len(body) <= MAX_BODY_SIZE:
+                message = await receive()
+                body += message.get('body', b'')
+                more_body = message.get('more_body', False)
+
+            if len(body) > MAX_BODY_SIZE:
+                status, payload = 413, {'success': False, 'error': 'too_large'}
+            else:
+                status, payload = await sync_to_async(handle_heartbeat)(body)
+
+        body = json.dumps(payload).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'cache-control', b'no-store'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,84 @@
+import io
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.courses.models import Lesson
+from apps.progress.heartbeat import HeartbeatWSGIMiddleware
+from core.utils import create_heartbeat_token
+
+BENCH_PHONE = '+000bench-heartbeat'
+
+
+class Command(BaseCommand):
+    help = (
+        "Heartbeat endpointlarini solishtirish: to'liq middleware stekli "
+        "/lessons/<slug>/progress/ va middleware'siz HEARTBEAT_PATH. "
+        "p50/p99 kechikish va so'rov uchun CPU vaqti chiqariladi. "
+        "Vaqtinchalik user va dars yaratiladi va oxirida o'chiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Har bir endpoint uchun so'rovlar soni")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(phone_number=BENCH_PHONE, full_name='Bench')
+        lesson = Lesson.objects.create(title='Bench heartbeat', order=100000)
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                client = Client()
+                client.force_login(user)
+                url = reverse('student:update_progress', kwargs={'slug': lesson.slug})
+
+                def legacy(position):
+                    return client.post(url, json.dumps({'progress': position}), content_type='application/json')
+
+                fast_app = HeartbeatWSGIMiddleware(WSGIHandler())
+                token = create_heartbeat_token(user.id, lesson.id)
+
+                def fast(position):
+                    body = json.dumps({'token': token, 'position': position}).encode()
+                    environ = {
+                        'REQUEST_METHOD': 'POST',
+                        'PATH_INFO': settings.HEARTBEAT_PATH,
+                        'CONTENT_TYPE': 'application/json',
+                        'CONTENT_LENGTH': str(len(body)),
+                        'wsgi.input': io.BytesIO(body),
+                    }
+                    return fast_app(environ, lambda status, headers: None)
+
+                for name, send in (('middleware stek', legacy), ('heartbeat fast path', fast)):
+                    self._report(name, send, options['requests'])
+        finally:
+            lesson.delete()
+            user.delete()
+
+    def _report(self, name: str, send, count: int):
+        # Isitish (connection, URL resolver, import keshlari)
+        for position in range(20):
+            send(position)
+
+        latencies = []
+        cpu_started = time.process_time()
+        for position in range(count):
+            started = time.perf_counter()
+            send(position)
+            latencies.append(time.perf_counter() - started)
+        cpu_per_request = (time.process_time() - cpu_started) / count
+
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+        self.stdout.write(
+            f"{name:<20} p50 {p50 * 1000:7.3f} ms  p99 {p99 * 1000:7.3f} ms  "
+            f"CPU {cpu_per_request * 1000:7.3f} ms/so'rov"
+        )
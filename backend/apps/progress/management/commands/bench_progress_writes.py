@@ -0,0 +1,84 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.accounts.models import User
+from apps.courses.models import Lesson
+from apps.progress.models import UserProgress
+from apps.progress.services import _update_video_progress_orm
+from apps.progress.upsert import supports_upsert, upsert_video_progress
+
+BENCH_PHONE_PREFIX = '+000bench'
+
+
+class Command(BaseCommand):
+    help = (
+        "Parallel yozuvchilar bilan progress yangilash tezligini solishtirish: "
+        "get_or_create + save va bitta so'rovli upsert. "
+        "Vaqtinchalik user va darslar yaratiladi va oxirida o'chiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help="Parallel yozuvchilar soni")
+        parser.add_argument('--events', type=int, default=500, help="Har bir yozuvchi uchun heartbeatlar soni")
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--lessons', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not supports_upsert():
+            raise CommandError(f"'{connection.vendor}' bazasida upsert qo'llab-quvvatlanmaydi")
+
+        users, lessons = self._create_fixtures(options['users'], options['lessons'])
+        pairs = [(user.id, lesson.id) for user in users for lesson in lessons]
+
+        try:
+            strategies = [
+                ('get_or_create + save', lambda u, l, s: _update_video_progress_orm(u, l, s)),
+                ('upsert (ON CONFLICT)', lambda u, l, s: upsert_video_progress({(u, l): s})),
+            ]
+            for name, write in strategies:
+                UserProgress.objects.filter(user__in=users).delete()
+                elapsed, errors = self._run(write, pairs, options['writers'], options['events'])
+                total = options['writers'] * options['events']
+                self.stdout.write(
+                    f"{name:<24} {total / elapsed:>10.0f} yozuv/s  "
+                    f"({total} yozuv, {elapsed:.2f}s, xatolar: {errors})"
+                )
+        finally:
+            UserProgress.objects.filter(user__in=users).delete()
+            Lesson.objects.filter(id__in=[lesson.id for lesson in lessons]).delete()
+            User.objects.filter(phone_number__startswith=BENCH_PHONE_PREFIX).delete()
+
+    def _create_fixtures(self, users_count: int, lessons_count: int):
+        users = [
+            User.objects.create_user(phone_number=f'{BENCH_PHONE_PREFIX}{i}', full_name=f'Bench {i}')
+            for i in range(users_count)
+        ]
+        lessons = [
+            Lesson.objects.create(title=f'Bench {i}', order=100000 + i, is_active=False)
+            for i in range(lessons_count)
+        ]
+        return users, lessons
+
+    def _run(self, write, pairs, writers: int, events: int) -> tuple[float, int]:
+        def worker(seed: int) -> int:
+            rng = random.Random(seed)
+            errors = 0
+            try:
+                for position in range(events):
+                    user_id, lesson_id = rng.choice(pairs)
+                    try:
+                        write(user_id, lesson_id, position)
+                    except Exception:
+                        errors += 1
+            finally:
+                connection.close()
+            return errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as executor:
+            errors = sum(executor.map(worker, range(writers)))
+        return time.perf_counter() - started, errors
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.progress.buffer import flush_video_progress_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Buferdagi video progress heartbeatlarini bazaga yozish "
+        "(umumiy cache - Redis/Memcached bilan cron orqali ishlatish uchun)"
+    )
+
+    def handle(self, *args, **options):
+        count = flush_video_progress_buffer()
+        self.stdout.write(self.style.SUCCESS(f"{count} ta progress yozildi"))
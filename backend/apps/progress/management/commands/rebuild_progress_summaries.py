@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.progress.services import rebuild_progress_summaries
+
+
+class Command(BaseCommand):
+    help = "O'quvchilar progress jamlanmalarini UserProgress dan qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_progress_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} ta jamlanma qayta hisoblandi"))
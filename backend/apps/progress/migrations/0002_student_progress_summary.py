@@ -0,0 +1,63 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def build_summaries(apps, schema_editor):
+    """Mavjud progress bo'yicha jamlanmalarni yaratish"""
+    User = apps.get_model('accounts', 'User')
+    Lesson = apps.get_model('courses', 'Lesson')
+    StudentProgressSummary = apps.get_model('progress', 'StudentProgressSummary')
+
+    total_lessons = Lesson.objects.filter(is_active=True).count()
+    completed = Q(progress__is_completed=True)
+
+    students = User.objects.filter(role='student').annotate(
+        completed_count=Count('progress', filter=completed),
+        highest_completed_order=Max('progress__lesson__order', filter=completed),
+        last_activity_at=Max('progress__updated_at'),
+    ).values_list('id', 'completed_count', 'highest_completed_order', 'last_activity_at')
+
+    StudentProgressSummary.objects.bulk_create([
+        StudentProgressSummary(
+            user_id=user_id,
+            completed_count=completed_count,
+            highest_completed_order=highest_completed_order or 0,
+            last_activity_at=last_activity_at,
+            percent_complete=min(100, int(completed_count / total_lessons * 100)) if total_lessons else 0,
+        )
+        for user_id, completed_count, highest_completed_order, last_activity_at in students.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0001_initial'),
+        ('courses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentProgressSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Tugatilgan darslar')),
+                ('highest_completed_order', models.PositiveIntegerField(default=0, verbose_name='Eng oxirgi tugatilgan dars raqami')),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True, verbose_name='Oxirgi faollik')),
+                ('percent_complete', models.PositiveSmallIntegerField(default=0, help_text='Faol darslarga nisbatan (%)', verbose_name='Umumiy progress')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='progress_summary', to=settings.AUTH_USER_MODEL, verbose_name="O'quvchi")),
+            ],
+            options={
+                'verbose_name': 'Progress jamlanmasi',
+                'verbose_name_plural': 'Progress jamlanmalari',
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -47,4 +47,50 @@ class UserProgress(TimeStampMixin):
         """Video progress foizda"""
         if self.lesson.video_duration == 0:
             return 0
-        return min(100, int(self.video_progress / self.lesson.video_duration * 100))
\ No newline at end of file
+        return min(100, int(self.video_progress / self.lesson.video_duration * 100))
+
+
+class StudentProgressSummary(TimeStampMixin):
+    """
+    O'quvchi progressining jamlanmasi (denormalizatsiya)
+    Progress servislari va admin tomonidan yangilanadi. UserProgress ni
+    to'g'ridan-to'g'ri ORM orqali o'zgartirgandan keyin
+    rebuild_progress_summaries buyrug'i bilan qaytadan hisoblanadi.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='progress_summary',
+        verbose_name="O'quvchi"
+    )
+    completed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Tugatilgan darslar"
+    )
+    highest_completed_order = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Eng oxirgi tugatilgan dars raqami"
+    )
+    last_activity_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Oxirgi faollik"
+    )
+    percent_complete = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Faol darslarga nisbatan (%)",
+        verbose_name="Umumiy progress"
+    )
+
+    class Meta:
+        verbose_name = "Progress jamlanmasi"
+        verbose_name_plural = "Progress jamlanmalari"
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.completed_count} dars"
+
+    @property
+    def current_lesson(self) -> int:
+        """Hozirgi dars raqami"""
+        return self.highest_completed_order + 1
@@ -1,6 +1,8 @@
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Count, Max, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
-from .models import UserProgress
+from .models import UserProgress, StudentProgressSummary
 
 
 def get_user_progress(user_id: int, lesson_id: int) -> UserProgress | None:
@@ -18,8 +20,20 @@ def get_all_user_progress(user_id: int) -> QuerySet[UserProgress]:
     ).select_related('lesson').order_by('lesson__order')
 
 
+def get_progress_summary(user_id: int) -> StudentProgressSummary | None:
+    """Userning progress jamlanmasini olish"""
+    try:
+        return StudentProgressSummary.objects.get(user_id=user_id)
+    except StudentProgressSummary.DoesNotExist:
+        return None
+
+
 def get_user_current_lesson(user_id: int) -> int:
     """Userning hozirgi dars raqamini olish"""
+    summary = get_progress_summary(user_id)
+    if summary:
+        return summary.current_lesson
+
     last_completed = UserProgress.objects.filter(
         user_id=user_id,
         is_completed=True
@@ -30,6 +44,21 @@ def get_user_current_lesson(user_id: int) -> int:
     return 1
 
 
+def get_group_students_with_progress(group_id: int) -> QuerySet:
+    """
+    Guruh o'quvchilarini progress bilan birga olish (bitta aggregate so'rov)
+    Har bir userga: current_lesson, completed_count, last_activity
+    """
+    from apps.accounts.selectors import get_students_by_group
+
+    completed = Q(progress__is_completed=True)
+    return get_students_by_group(group_id).annotate(
+        completed_count=Count('progress', filter=completed),
+        current_lesson=Coalesce(Max('progress__lesson__order', filter=completed), 0) + 1,
+        last_activity=Max('progress__updated_at'),
+    ).order_by('full_name', 'id')
+
+
 def is_lesson_completed(user_id: int, lesson_id: int) -> bool:
     """Dars tugatilganmi?"""
     progress = get_user_progress(user_id, lesson_id)
@@ -58,4 +87,60 @@ def can_user_access_lesson(user, lesson) -> bool:
     if not previous_lesson:
         return True
 
-    return is_lesson_completed(user.id, previous_lesson.id)
\ No newline at end of file
+    return is_lesson_completed(user.id, previous_lesson.id)
+
+
+def get_lessons_access_map(user, lessons) -> dict[int, bool]:
+    """
+    Bir nechta dars uchun kirish huquqini birdaniga aniqlash
+    Har bir dars uchun can_user_access_lesson bilan bir xil natija,
+    lekin darslar soniga bog'liq bo'lmagan 3 ta so'rov bilan.
+
+    Returns: {lesson_id: can_access}
+    """
+    from apps.courses.models import Lesson, LessonSchedule
+
+    lessons = list(lessons)
+    if not lessons:
+        return {}
+
+    if not user.group:
+        return {lesson.id: False for lesson in lessons}
+
+    # Guruh turi uchun barcha jadvallar
+    now = timezone.now()
+    open_lesson_ids = set(
+        LessonSchedule.objects.filter(
+            group_type_id=user.group.group_type_id,
+            available_from__lte=now
+        ).values_list('lesson_id', flat=True)
+    )
+
+    # Faol darslar tartibi: order -> lesson_id
+    lesson_id_by_order = {}
+    for lesson_id, order in Lesson.objects.filter(
+            is_active=True
+    ).order_by('order', 'id').values_list('id', 'order'):
+        lesson_id_by_order.setdefault(order, lesson_id)
+
+    # Tugatilgan darslar
+    completed_ids = set(
+        UserProgress.objects.filter(
+            user_id=user.id,
+            is_completed=True
+        ).values_list('lesson_id', flat=True)
+    )
+
+    access_map = {}
+    for lesson in lessons:
+        if lesson.id not in open_lesson_ids:
+            access_map[lesson.id] = False
+        elif lesson.order == 1:
+            access_map[lesson.id] = True
+        else:
+            previous_lesson_id = lesson_id_by_order.get(lesson.order - 1)
+            access_map[lesson.id] = (
+                previous_lesson_id is None or previous_lesson_id in completed_ids
+            )
+
+    return access_map
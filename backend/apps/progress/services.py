@@ -1,11 +1,36 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least, NullIf
 from django.utils import timezone
 
-from .models import UserProgress
+from .models import UserProgress, StudentProgressSummary
 from .selectors import get_user_progress
+from .upsert import supports_upsert, upsert_video_progress, upsert_lesson_completed
+from .buffer import is_write_behind_enabled, buffer_video_progress, discard_buffered_progress
 
 
-def update_video_progress(user_id: int, lesson_id: int, progress_seconds: int) -> UserProgress:
-    """Video progress yangilash"""
+def update_video_progress(user_id: int, lesson_id: int, progress_seconds: int) -> UserProgress | None:
+    """
+    Video progress yangilash
+    Write-behind rejimida heartbeat buferga yoziladi va None qaytadi
+    """
+    if is_write_behind_enabled():
+        buffer_video_progress(user_id, lesson_id, progress_seconds)
+        return None
+
+    if supports_upsert():
+        user_progress = upsert_video_progress({(user_id, lesson_id): progress_seconds})[0]
+    else:
+        user_progress = _update_video_progress_orm(user_id, lesson_id, progress_seconds)
+
+    # Yozuvdan keyin: yangi jamlanma shu progressni ham hisobga oladi
+    touch_progress_activity([user_id])
+    return user_progress
+
+
+def _update_video_progress_orm(user_id: int, lesson_id: int, progress_seconds: int) -> UserProgress:
+    """Video progress yangilash (get_or_create + save, upsert yo'q bazalar uchun)"""
     user_progress, created = UserProgress.objects.get_or_create(
         user_id=user_id,
         lesson_id=lesson_id
@@ -19,8 +44,52 @@ def update_video_progress(user_id: int, lesson_id: int, progress_seconds: int) -
     return user_progress
 
 
+def update_video_progress_batch(user_id: int, progress: dict[int, int]) -> int:
+    """
+    Bir nechta dars progressini bitta yozuv bilan yangilash
+    Args:
+        progress: {lesson_id: progress_seconds}
+    Returns: qabul qilingan darslar soni
+    """
+    if not progress:
+        return 0
+
+    if is_write_behind_enabled():
+        for lesson_id, progress_seconds in progress.items():
+            buffer_video_progress(user_id, lesson_id, progress_seconds)
+        return len(progress)
+
+    if supports_upsert():
+        pending = {(user_id, lesson_id): seconds for lesson_id, seconds in progress.items()}
+        accepted = len(upsert_video_progress(pending))
+    else:
+        for lesson_id, progress_seconds in progress.items():
+            _update_video_progress_orm(user_id, lesson_id, progress_seconds)
+        accepted = len(progress)
+
+    touch_progress_activity([user_id])
+    return accepted
+
+
 def mark_lesson_completed(user_id: int, lesson_id: int) -> UserProgress:
-    """Darsni tugatilgan deb belgilash"""
+    """
+    Darsni tugatilgan deb belgilash
+    Jamlanma shu tranzaksiyada bitta UPDATE bilan oshiriladi (faqat birinchi marta tugatilganda)
+    """
+    with transaction.atomic():
+        if supports_upsert():
+            user_progress, newly_completed = upsert_lesson_completed(user_id, lesson_id)
+        else:
+            user_progress, newly_completed = _mark_lesson_completed_orm(user_id, lesson_id)
+
+        if newly_completed:
+            _increment_completed_summary(user_id, lesson_id)
+
+    return user_progress
+
+
+def _mark_lesson_completed_orm(user_id: int, lesson_id: int) -> tuple[UserProgress, bool]:
+    """Darsni tugatilgan deb belgilash (get_or_create + save, upsert yo'q bazalar uchun)"""
     user_progress, created = UserProgress.objects.get_or_create(
         user_id=user_id,
         lesson_id=lesson_id
@@ -30,12 +99,16 @@ def mark_lesson_completed(user_id: int, lesson_id: int) -> UserProgress:
         user_progress.is_completed = True
         user_progress.completed_at = timezone.now()
         user_progress.save(update_fields=['is_completed', 'completed_at', 'updated_at'])
+        return user_progress, True
 
-    return user_progress
+    return user_progress, False
 
 
 def reset_progress(user_id: int, lesson_id: int) -> bool:
     """Progressni qaytadan boshlash"""
+    if is_write_behind_enabled():
+        discard_buffered_progress(user_id, lesson_id)
+
     progress = get_user_progress(user_id, lesson_id)
     if not progress:
         return False
@@ -44,4 +117,146 @@ def reset_progress(user_id: int, lesson_id: int) -> bool:
     progress.is_completed = False
     progress.completed_at = None
     progress.save()
-    return True
\ No newline at end of file
+
+    refresh_progress_summary(user_id)
+    return True
+
+
+# ============== PROGRESS SUMMARY ==============
+
+# Heartbeatlarda last_activity_at ni tez-tez yozmaslik uchun (sekund)
+ACTIVITY_TOUCH_INTERVAL = 60
+
+
+def _percent(completed_count: int, total_lessons: int) -> int:
+    return min(100, int(completed_count / total_lessons * 100)) if total_lessons > 0 else 0
+
+
+def refresh_progress_summary(user_id: int) -> StudentProgressSummary:
+    """Bitta user uchun progress jamlanmasini qayta hisoblash"""
+    from apps.courses.models import Lesson
+
+    stats = UserProgress.objects.filter(user_id=user_id).aggregate(
+        completed_count=Count('id', filter=Q(is_completed=True)),
+        highest_completed_order=Max('lesson__order', filter=Q(is_completed=True)),
+        last_activity_at=Max('updated_at'),
+    )
+    total_lessons = Lesson.objects.filter(is_active=True).count()
+
+    summary, created = StudentProgressSummary.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'completed_count': stats['completed_count'],
+            'highest_completed_order': stats['highest_completed_order'] or 0,
+            'last_activity_at': stats['last_activity_at'],
+            'percent_complete': _percent(stats['completed_count'], total_lessons),
+        }
+    )
+    return summary
+
+
+def _increment_completed_summary(user_id: int, lesson_id: int) -> None:
+    """Yangi tugatilgan dars uchun jamlanmani bitta UPDATE bilan oshirish"""
+    from apps.courses.models import Lesson
+
+    total_lessons = Lesson.objects.filter(is_active=True).order_by().values('is_active').annotate(
+        total=Count('id')
+    ).values('total')
+    lesson_order = Lesson.objects.filter(id=lesson_id).values('order')
+
+    updated = StudentProgressSummary.objects.filter(user_id=user_id).update(
+        completed_count=F('completed_count') + 1,
+        highest_completed_order=Greatest('highest_completed_order', Coalesce(Subquery(lesson_order), 0)),
+        percent_complete=Coalesce(
+            Least(Value(100), (F('completed_count') + 1) * 100 / NullIf(Subquery(total_lessons), 0)),
+            0
+        ),
+        last_activity_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # Jamlanmasi hali yo'q user - to'liq hisoblash
+        refresh_progress_summary(user_id)
+
+
+def touch_progress_activity(user_ids) -> None:
+    """
+    Userlarning oxirgi faollik vaqtini yangilash
+    Har bir user uchun ACTIVITY_TOUCH_INTERVAL da ko'pi bilan bitta yozuv
+    """
+    due = [
+        user_id for user_id in set(user_ids)
+        if cache.add(f'progress_summary_touch_{user_id}', 1, ACTIVITY_TOUCH_INTERVAL)
+    ]
+    if not due:
+        return
+
+    now = timezone.now()
+    updated = StudentProgressSummary.objects.filter(user_id__in=due).update(
+        last_activity_at=now,
+        updated_at=now
+    )
+    if updated < len(due):
+        # Jamlanmasi yo'q userlar (masalan backfilldan oldin dars tugatganlar) - to'liq hisoblash
+        existing = set(StudentProgressSummary.objects.filter(user_id__in=due).values_list('user_id', flat=True))
+        for user_id in set(due) - existing:
+            refresh_progress_summary(user_id)
+
+
+def refresh_progress_percentages() -> int:
+    """
+    Barcha jamlanmalarda percent_complete ni bitta UPDATE bilan qayta hisoblash
+    Faol darslar soni o'zgarganda (dars qo'shilsa/o'chirilsa) chaqiriladi
+    """
+    from apps.courses.models import Lesson
+
+    total_lessons = Lesson.objects.filter(is_active=True).count()
+    if not total_lessons:
+        return StudentProgressSummary.objects.exclude(percent_complete=0).update(percent_complete=0)
+
+    percent = Least(Value(100), F('completed_count') * 100 / total_lessons)
+    return StudentProgressSummary.objects.exclude(percent_complete=percent).update(percent_complete=percent)
+
+
+def rebuild_progress_summaries(batch_size: int = 1000) -> int:
+    """
+    Barcha o'quvchilar uchun jamlanmalarni UserProgress dan qayta qurish
+    Returns: yozilgan jamlanmalar soni
+    """
+    from apps.accounts.models import User
+    from apps.courses.models import Lesson
+
+    total_lessons = Lesson.objects.filter(is_active=True).count()
+    completed = Q(progress__is_completed=True)
+
+    students = User.objects.filter(role=User.Role.STUDENT).annotate(
+        completed_count=Count('progress', filter=completed),
+        highest_completed_order=Max('progress__lesson__order', filter=completed),
+        last_activity_at=Max('progress__updated_at'),
+    ).values_list('id', 'completed_count', 'highest_completed_order', 'last_activity_at').order_by('id')
+
+    now = timezone.now()
+    rows = [
+        StudentProgressSummary(
+            user_id=user_id,
+            completed_count=completed_count,
+            highest_completed_order=highest_completed_order or 0,
+            last_activity_at=last_activity_at,
+            percent_complete=_percent(completed_count, total_lessons),
+            created_at=now,
+            updated_at=now,
+        )
+        for user_id, completed_count, highest_completed_order, last_activity_at in students.iterator()
+    ]
+
+    StudentProgressSummary.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[
+            'completed_count', 'highest_completed_order',
+            'last_activity_at', 'percent_complete', 'updated_at'
+        ]
+    )
+    return len(rows)
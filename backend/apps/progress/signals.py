@@ -0,0 +1,39 @@
+"""
+Darslar o'zgarganda progress jamlanmalarini yangilash
+
+percent_complete faol darslar soniga bog'liq, shuning uchun dars qo'shilsa
+yoki faolligi o'zgarsa barcha jamlanmalar bitta UPDATE bilan qayta
+hisoblanadi. Dars tartibi o'zgarsa yoki dars o'chirilsa (progress yozuvlari
+ham o'chadi) highest_completed_order va completed_count ham eskiradi - bu
+holda jamlanmalar to'liq qayta quriladi. Ikkalasi ham tranzaksiya
+tugagandan keyin bajariladi.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.courses.models import Lesson
+from .services import rebuild_progress_summaries, refresh_progress_percentages
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_order(sender, instance, **kwargs):
+    instance._progress_previous_order = (
+        Lesson.objects.filter(pk=instance.pk).values_list('order', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    previous_order = getattr(instance, '_progress_previous_order', None)
+    if not created and previous_order is not None and previous_order != instance.order:
+        transaction.on_commit(rebuild_progress_summaries)
+    else:
+        transaction.on_commit(refresh_progress_percentages)
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, **kwargs):
+    transaction.on_commit(rebuild_progress_summaries)
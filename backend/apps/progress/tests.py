@@ -1,3 +1,498 @@
-from django.test import TestCase
+import io
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.utils import create_heartbeat_token
+
+from apps.accounts.models import User
+from apps.courses.models import Lesson, LessonSchedule
+from apps.groups.models import Group, GroupType
+
+from . import buffer
+from .analytics import build_group_progress_matrix
+from .heartbeat import HeartbeatWSGIMiddleware, get_heartbeat_path
+from .models import StudentProgressSummary, UserProgress
+from .selectors import get_group_students_with_progress
+from .upsert import upsert_lesson_completed
+from .services import (
+    mark_lesson_completed,
+    rebuild_progress_summaries,
+    reset_progress,
+    update_video_progress,
+)
+
+
+@override_settings(PROGRESS_WRITE_BEHIND=True, PROGRESS_FLUSH_INTERVAL=3600)
+class VideoProgressBufferTests(TestCase):
+    """Write-behind bufer uchun testlar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901110000', full_name='Student')
+        cls.lesson = Lesson.objects.create(title='Dars 1', order=1)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_position(self) -> int:
+        return UserProgress.objects.get(user=self.student, lesson=self.lesson).video_progress
+
+    def test_keeps_max_position_until_flush(self):
+        for position in (30, 90, 60):
+            self.assertIsNone(update_video_progress(self.student.id, self.lesson.id, position))
+        self.assertFalse(UserProgress.objects.exists())
+
+        self.assertEqual(buffer.flush_video_progress_buffer(), 1)
+        self.assertEqual(self.get_position(), 90)
+
+    def test_heartbeat_during_flush_is_not_lost(self):
+        update_video_progress(self.student.id, self.lesson.id, 30)
+        read_generation = buffer._read_generation
+
+        def read_then_heartbeat(generation, pending):
+            keys = read_generation(generation, pending)
+            # Flush o'qib bo'lgandan keyin kelgan heartbeat
+            update_video_progress(self.student.id, self.lesson.id, 120)
+            return keys
+
+        with mock.patch.object(buffer, '_read_generation', read_then_heartbeat):
+            buffer.flush_video_progress_buffer()
+
+        self.assertEqual(self.get_position(), 30)
+        buffer.flush_video_progress_buffer()
+        self.assertEqual(self.get_position(), 120)
+
+    def test_every_pair_is_indexed(self):
+        other = Lesson.objects.create(title='Dars 2', order=2)
+        update_video_progress(self.student.id, self.lesson.id, 10)
+        update_video_progress(self.student.id, other.id, 20)
+
+        self.assertEqual(buffer.flush_video_progress_buffer(), 2)
+        self.assertEqual(
+            dict(UserProgress.objects.values_list('lesson_id', 'video_progress')),
+            {self.lesson.id: 10, other.id: 20}
+        )
+
+    def test_reset_discards_buffered_position(self):
+        update_video_progress(self.student.id, self.lesson.id, 50)
+        buffer.flush_video_progress_buffer()
+        update_video_progress(self.student.id, self.lesson.id, 80)
+
+        reset_progress(self.student.id, self.lesson.id)
+        buffer.flush_video_progress_buffer()
+        buffer.flush_video_progress_buffer()
+
+        self.assertEqual(self.get_position(), 0)
+
+    def test_closed_generation_is_removed_after_second_pass(self):
+        update_video_progress(self.student.id, self.lesson.id, 50)
+        generation = buffer._current_generation()
+
+        buffer.flush_video_progress_buffer()
+        self.assertEqual(cache.get(buffer._slot_key(generation, 1)), (self.student.id, self.lesson.id, 50))
+
+        buffer.flush_video_progress_buffer()
+        self.assertIsNone(cache.get(buffer._slot_key(generation, 1)))
+        self.assertIsNone(cache.get(buffer._slot_count_key(generation)))
+
+    def test_concurrent_heartbeats_keep_max(self):
+        real_cache = buffer.cache
+        student, lesson = self.student, self.lesson
+
+        class InterleavingCache:
+            """Birinchi heartbeat yozishidan oldin ikkinchisi to'liq bajariladi"""
+            interleaved = False
+
+            def __getattr__(self, name):
+                return getattr(real_cache, name)
+
+            def set(self, key, *args, **kwargs):
+                if not self.interleaved and '_slot_' in key:
+                    self.interleaved = True
+                    update_video_progress(student.id, lesson.id, 120)
+                return real_cache.set(key, *args, **kwargs)
+
+        with mock.patch.object(buffer, 'cache', InterleavingCache()):
+            update_video_progress(self.student.id, self.lesson.id, 60)
+
+        buffer.flush_video_progress_buffer()
+        self.assertEqual(self.get_position(), 120)
+
+
+class ProgressUpsertTests(TestCase):
+    """Bitta so'rovli progress yozuvlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901110001', full_name='Student')
+        cls.lessons = [Lesson.objects.create(title=f'Dars {order}', order=order) for order in (1, 2, 3, 4)]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_video_progress_is_idempotent_and_monotonic(self):
+        lesson = self.lessons[0]
+        for position in (40, 40, 25, 70):
+            update_video_progress(self.student.id, lesson.id, position)
+
+        progress = UserProgress.objects.get(user=self.student, lesson=lesson)
+        self.assertEqual(progress.video_progress, 70)
+        self.assertEqual(UserProgress.objects.count(), 1)
+
+    def test_backwards_heartbeat_keeps_updated_at(self):
+        lesson = self.lessons[0]
+        update_video_progress(self.student.id, lesson.id, 40)
+        updated_at = UserProgress.objects.get(user=self.student, lesson=lesson).updated_at
+
+        update_video_progress(self.student.id, lesson.id, 10)
+
+        self.assertEqual(UserProgress.objects.get(user=self.student, lesson=lesson).updated_at, updated_at)
+
+    def test_complete_is_idempotent(self):
+        lesson = self.lessons[1]
+        first = mark_lesson_completed(self.student.id, lesson.id)
+        second = mark_lesson_completed(self.student.id, lesson.id)
+
+        self.assertTrue(second.is_completed)
+        self.assertEqual(second.completed_at, first.completed_at)
+        summary = StudentProgressSummary.objects.get(user=self.student)
+        self.assertEqual(summary.completed_count, 1)
+        self.assertEqual(summary.highest_completed_order, 2)
+        self.assertEqual(summary.percent_complete, 25)
+
+        # Jamlanma mavjud - F() bilan oshiriladi
+        mark_lesson_completed(self.student.id, self.lessons[3].id)
+        summary.refresh_from_db()
+        self.assertEqual(
+            (summary.completed_count, summary.highest_completed_order, summary.percent_complete),
+            (2, 4, 50)
+        )
+
+    def test_repeat_complete_skips_summary(self):
+        mark_lesson_completed(self.student.id, self.lessons[0].id)
+
+        # Upsert (qator qaytmaydi), mavjud qatorni o'qish, tranzaksiya savepoint'lari
+        with self.assertNumQueries(4):
+            mark_lesson_completed(self.student.id, self.lessons[0].id)
+
+    def test_complete_at_same_timestamp_counts_once(self):
+        lesson = self.lessons[0]
+        frozen = timezone.now()
+
+        with mock.patch('apps.progress.upsert.timezone.now', return_value=frozen):
+            mark_lesson_completed(self.student.id, lesson.id)
+            mark_lesson_completed(self.student.id, lesson.id)
+            progress, newly_completed = upsert_lesson_completed(self.student.id, lesson.id)
+
+        self.assertFalse(newly_completed)
+        self.assertEqual(progress.completed_at, frozen)
+        self.assertEqual(StudentProgressSummary.objects.get(user=self.student).completed_count, 1)
+
+
+class BatchUpdateProgressTests(TestCase):
+    """Heartbeatlarni bitta so'rovda qabul qiluvchi endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        group_type = GroupType.objects.create(name='7.0 A')
+        group = Group.objects.create(name='A1', group_type=group_type)
+        cls.student = User.objects.create_user(phone_number='+998901110002', full_name='Student', group=group)
+        cls.lessons = [Lesson.objects.create(title=f'Dars {order}', order=order) for order in (1, 2)]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.student)
+
+    def post(self, data):
+        return self.client.post(
+            reverse('student:batch_update_progress'), json.dumps(data), content_type='application/json'
+        )
+
+    def test_keeps_highest_position_per_lesson(self):
+        first, second = self.lessons
+        response = self.post({'events': [
+            {'lesson': first.slug, 'position': 90},
+            {'lesson': first.slug, 'position': 30},
+            {'lesson': second.slug, 'position': 15},
+        ]})
+
+        self.assertEqual(response.json(), {'success': True, 'accepted': 2})
+        self.assertEqual(
+            dict(UserProgress.objects.values_list('lesson_id', 'video_progress')),
+            {first.id: 90, second.id: 15}
+        )
+
+    def test_late_batch_does_not_move_back(self):
+        lesson = self.lessons[0]
+        self.post({'events': [{'lesson': lesson.slug, 'position': 120}]})
+        self.post({'events': [{'lesson': lesson.slug, 'position': 60}]})
+
+        self.assertEqual(UserProgress.objects.get().video_progress, 120)
+
+    def test_validation_errors(self):
+        slug = self.lessons[0].slug
+        invalid = [
+            {},
+            {'events': []},
+            {'events': ['x']},
+            {'events': [{'position': 10}]},
+            {'events': [{'lesson': slug, 'position': -1}]},
+            {'events': [{'lesson': slug, 'position': True}]},
+            {'events': [{'lesson': slug, 'position': 10}] * 501},
+            {'events': [{'lesson': 'yoq', 'position': 10}]},
+        ]
+        for data in invalid:
+            with self.subTest(data=str(data)[:60]):
+                response = self.post(data)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+
+        self.assertFalse(UserProgress.objects.exists())
+
+
+class HeartbeatEndpointTests(TestCase):
+    """Middleware'siz heartbeat endpointi va uning tokeni"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901110003', full_name='Student')
+        cls.lesson = Lesson.objects.create(title='Dars 1', order=1)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.token = create_heartbeat_token(self.student.id, self.lesson.id)
+
+    def call(self, body: bytes, method: str = 'POST'):
+        """HeartbeatWSGIMiddleware ni WSGI environ bilan chaqirish"""
+        app = mock.Mock()
+        start_response = mock.Mock()
+        environ = {
+            'PATH_INFO': get_heartbeat_path(),
+            'REQUEST_METHOD': method,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }
+
+        response = HeartbeatWSGIMiddleware(app)(environ, start_response)
+
+        app.assert_not_called()
+        return start_response.call_args.args[0], json.loads(b''.join(response))
+
+    def test_valid_heartbeat(self):
+        status, payload = self.call(json.dumps({'token': self.token, 'position': 42}).encode())
+
+        self.assertEqual(status, '200 OK')
+        self.assertTrue(payload['success'])
+        self.assertEqual(UserProgress.objects.get(user=self.student).video_progress, 42)
+
+    def test_rejects_forged_token(self):
+        user_id, lesson_id, timestamp, signature = self.token.split('_')
+        forged = [
+            f'{user_id}_{lesson_id}_{timestamp}_{"0" * 32}',
+            f'{int(user_id) + 1}_{lesson_id}_{timestamp}_{signature}',
+            'garbage',
+        ]
+        for token in forged:
+            with self.subTest(token=token):
+                status, payload = self.call(json.dumps({'token': token, 'position': 10}).encode())
+                self.assertEqual(status, '401 Unauthorized')
+
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_rejects_expired_token(self):
+        later = timezone.now() + timedelta(seconds=settings.HEARTBEAT_TOKEN_MAX_AGE + 1)
+
+        with mock.patch('core.utils.timezone.now', return_value=later):
+            status, payload = self.call(json.dumps({'token': self.token, 'position': 10}).encode())
+
+        self.assertEqual(status, '401 Unauthorized')
+        self.assertEqual(payload['error'], 'invalid_token')
+
+    def test_bad_requests(self):
+        self.assertEqual(self.call(b'{')[0], '400 Bad Request')
+        self.assertEqual(self.call(json.dumps({'token': self.token, 'position': -5}).encode())[0], '400 Bad Request')
+        self.assertEqual(self.call(b'', method='GET')[0], '405 Method Not Allowed')
+        self.assertEqual(self.call(b'x' * 2048)[0], '413 Payload Too Large')
+
+    def test_rejects_out_of_range_positions(self):
+        for position in (b'1e400', b'-1e400', b'-5', b'2147483648'):
+            with self.subTest(position=position):
+                body = b'{"token": "%s", "position": %s}' % (self.token.encode(), position)
+                status, payload = self.call(body)
+                self.assertEqual(status, '400 Bad Request')
+
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_rejects_position_beyond_lesson_duration(self):
+        Lesson.objects.filter(id=self.lesson.id).update(video_duration=600)
+
+        status, payload = self.call(json.dumps({'token': self.token, 'position': 601}).encode())
+        self.assertEqual((status, payload['error']), ('400 Bad Request', 'invalid_position'))
+
+        status, payload = self.call(json.dumps({'token': self.token, 'position': 600}).encode())
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(UserProgress.objects.get(user=self.student).video_progress, 600)
+
+    def test_other_paths_pass_through(self):
+        app = mock.Mock(return_value=[b'ok'])
+
+        response = HeartbeatWSGIMiddleware(app)({'PATH_INFO': '/lessons/'}, mock.Mock())
+
+        self.assertEqual(response, [b'ok'])
+
+
+class ProgressSummaryTests(TestCase):
+    """StudentProgressSummary jamlanmasi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901110004', full_name='Student')
+        cls.lessons = [Lesson.objects.create(title=f'Dars {order}', order=order) for order in (1, 2, 3, 4)]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_summary(self) -> tuple[int, int, int]:
+        summary = StudentProgressSummary.objects.get(user=self.student)
+        return summary.completed_count, summary.highest_completed_order, summary.percent_complete
+
+    def test_counts_after_complete_and_reset(self):
+        for lesson in self.lessons[:3]:
+            mark_lesson_completed(self.student.id, lesson.id)
+        self.assertEqual(self.get_summary(), (3, 3, 75))
+
+        reset_progress(self.student.id, self.lessons[2].id)
+        self.assertEqual(self.get_summary(), (2, 2, 50))
+
+        reset_progress(self.student.id, self.lessons[0].id)
+        self.assertEqual(self.get_summary(), (1, 2, 25))
+
+    def test_heartbeat_does_not_hide_earlier_completions(self):
+        # Jamlanma paydo bo'lishidan oldin tugatilgan dars
+        UserProgress.objects.create(user=self.student, lesson=self.lessons[0], is_completed=True)
+
+        update_video_progress(self.student.id, self.lessons[1].id, 30)
+
+        self.assertEqual(self.get_summary(), (1, 1, 25))
+        self.assertIsNotNone(StudentProgressSummary.objects.get(user=self.student).last_activity_at)
+
+    def test_percent_follows_active_lessons(self):
+        mark_lesson_completed(self.student.id, self.lessons[0].id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(title='Dars 5', order=5)
+        self.assertEqual(self.get_summary()[2], 20)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.filter(order__gte=4).delete()
+        self.assertEqual(self.get_summary()[2], 33)
+
+    def test_reorder_and_delete_rebuild_summary(self):
+        for lesson in self.lessons[:2]:
+            mark_lesson_completed(self.student.id, lesson.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lessons[1].order = 10
+            self.lessons[1].save()
+        summary = StudentProgressSummary.objects.get(user=self.student)
+        self.assertEqual((summary.highest_completed_order, summary.current_lesson), (10, 11))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lessons[1].delete()
+        summary = StudentProgressSummary.objects.get(user=self.student)
+        self.assertEqual((summary.completed_count, summary.highest_completed_order), (1, 1))
+        self.assertEqual(summary.current_lesson, 2)
+
+    def test_rebuild_matches_incremental_updates(self):
+        for lesson in self.lessons[1:3]:
+            mark_lesson_completed(self.student.id, lesson.id)
+        incremental = self.get_summary()
+
+        StudentProgressSummary.objects.all().delete()
+        rebuild_progress_summaries()
+
+        self.assertEqual(self.get_summary(), incremental)
+
+
+class GroupProgressTests(TestCase):
+    """Guruh ro'yxati (progress bilan) va progress matritsasi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        group_type = GroupType.objects.create(name='7.0 A')
+        cls.group = Group.objects.create(name='A1', group_type=group_type)
+        opened = timezone.now() - timedelta(days=1)
+        cls.lessons = []
+        for order in (1, 2, 3):
+            lesson = Lesson.objects.create(title=f'Dars {order}', order=order, video_duration=200)
+            LessonSchedule.objects.create(lesson=lesson, group_type=group_type, available_from=opened)
+            cls.lessons.append(lesson)
+
+        cls.students = [
+            User.objects.create_user(phone_number=f'+99890222000{i}', full_name=f'Student {i}', group=cls.group)
+            for i in range(4)
+        ]
+        # Student 0: 2 dars, Student 1: 1 dars + yarim video, qolganlar: hech narsa
+        for lesson in cls.lessons[:2]:
+            UserProgress.objects.create(user=cls.students[0], lesson=lesson, is_completed=True, video_progress=200)
+        UserProgress.objects.create(user=cls.students[1], lesson=cls.lessons[0], is_completed=True)
+        UserProgress.objects.create(user=cls.students[1], lesson=cls.lessons[1], video_progress=100)
+
+        cls.admin = User.objects.create_superuser(phone_number='+998902229999', full_name='Admin', password='x')
+
+    def test_roster_annotations(self):
+        students = {student.id: student for student in get_group_students_with_progress(self.group.id)}
+
+        first, second, third = (students[self.students[i].id] for i in range(3))
+        self.assertEqual((first.completed_count, first.current_lesson), (2, 3))
+        self.assertEqual((second.completed_count, second.current_lesson), (1, 2))
+        self.assertEqual((third.completed_count, third.current_lesson, third.last_activity), (0, 1, None))
+
+    def test_roster_is_paginated(self):
+        self.client.force_login(self.admin)
+        url = reverse('dashboard:group_detail', args=[self.group.pk])
+
+        with mock.patch('apps.dashboard.views.GroupDetailView.paginate_by', 3):
+            response = self.client.get(url)
+            self.assertEqual(len(response.context['students_with_progress']), 3)
+            self.assertTrue(response.context['page_obj'].has_next())
+
+            second_page = self.client.get(url, {'page': 2})
+            self.assertEqual(
+                [row['student'].id for row in second_page.context['students_with_progress']],
+                [self.students[3].id]
+            )
+
+    def test_matrix(self):
+        matrix = build_group_progress_matrix(self.group)
+
+        self.assertEqual(matrix.completed.shape, (4, 3))
+        self.assertEqual(matrix.completed[0].tolist(), [True, True, False])
+        self.assertEqual(matrix.watch_percent[1].tolist(), [0, 50, 0])
+        self.assertEqual(matrix.lesson_completion_rates.tolist(), [50, 25, 0])
+        self.assertEqual(matrix.student_completed_counts.tolist(), [2, 1, 0, 0])
+        self.assertEqual(matrix.student_percentiles.tolist(), [100, 75, 50, 50])
+
+    def test_matrix_query_count(self):
+        with self.assertNumQueries(3):
+            build_group_progress_matrix(self.group)
+
+    def test_matrix_view(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('dashboard:group_progress_matrix', args=[self.group.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['matrix_rows']), 4)
@@ -0,0 +1,96 @@
+"""
+UserProgress uchun bitta so'rovli upsert (INSERT ... ON CONFLICT)
+
+PostgreSQL va SQLite da o'qish + yozish o'rniga bitta atomik so'rov
+ishlatiladi, shuning uchun parallel heartbeatlar bir-birini bosib ketmaydi.
+Boshqa bazalarda None qaytadi va chaqiruvchi ORM yo'lidan foydalanadi.
+"""
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import UserProgress
+
+COLUMNS = ('user_id', 'lesson_id', 'video_progress', 'is_completed', 'completed_at', 'created_at', 'updated_at')
+
+
+def supports_upsert() -> bool:
+    """Joriy baza ON CONFLICT upsertni qo'llab-quvvatlaydimi?"""
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def _greatest(a: str, b: str) -> str:
+    # SQLite da GREATEST yo'q, lekin ko'p argumentli MAX() xuddi shunday ishlaydi
+    func = 'GREATEST' if connection.vendor == 'postgresql' else 'MAX'
+    return f'{func}({a}, {b})'
+
+
+def _now():
+    # Raw SQL uchun datetime ni baza formatiga o'tkazish (SQLite da naive UTC matn)
+    return connection.ops.adapt_datetimefield_value(timezone.now())
+
+
+def _execute(values: list[tuple], on_conflict: str, where: str = '') -> list[UserProgress]:
+    """where - mavjud qatorni yangilash sharti (bajarilmasa qator qaytarilmaydi)"""
+    table = connection.ops.quote_name(UserProgress._meta.db_table)
+    row_placeholder = f"({', '.join(['%s'] * len(COLUMNS))})"
+    where_clause = f"WHERE {where} " if where else ""
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) "
+        f"VALUES {', '.join([row_placeholder] * len(values))} "
+        f"ON CONFLICT (user_id, lesson_id) DO UPDATE SET {on_conflict} "
+        f"{where_clause}RETURNING *"
+    )
+    params = [param for row in values for param in row]
+
+    # raw() qiymatlarni ORM kabi konvertatsiya qiladi (datetime, bool)
+    return list(UserProgress.objects.raw(sql, params))
+
+
+def upsert_video_progress(pending: dict[tuple[int, int], int]) -> list[UserProgress]:
+    """
+    {(user_id, lesson_id): seconds} ni bitta so'rov bilan yozish
+    video_progress faqat oshadi (GREATEST), updated_at faqat o'zgarganda yangilanadi
+    """
+    if not pending:
+        return []
+
+    now = _now()
+    values = [
+        (user_id, lesson_id, seconds, False, None, now, now)
+        for (user_id, lesson_id), seconds in pending.items()
+    ]
+
+    table = connection.ops.quote_name(UserProgress._meta.db_table)
+    return _execute(values, (
+        f"video_progress = {_greatest(f'{table}.video_progress', 'EXCLUDED.video_progress')}, "
+        f"updated_at = CASE WHEN EXCLUDED.video_progress > {table}.video_progress "
+        f"THEN EXCLUDED.updated_at ELSE {table}.updated_at END"
+    ))
+
+
+def upsert_lesson_completed(user_id: int, lesson_id: int) -> tuple[UserProgress, bool]:
+    """
+    Darsni bitta so'rov bilan tugatilgan deb belgilash (completed_at birinchi marta qo'yiladi)
+    Returns: (progress, shu so'rov bilan tugatildimi)
+
+    Tugatilgan qator yangilanmaydi (DO UPDATE ... WHERE) va RETURNING uni
+    qaytarmaydi - qator qaytgani "shu so'rov tugatdi" degani. Parallel
+    so'rovlarda ham faqat bittasi qator oladi.
+    """
+    now = _now()
+    table = connection.ops.quote_name(UserProgress._meta.db_table)
+
+    rows = _execute(
+        [(user_id, lesson_id, 0, True, now, now, now)],
+        "is_completed = EXCLUDED.is_completed, "
+        "completed_at = EXCLUDED.completed_at, "
+        "updated_at = EXCLUDED.updated_at",
+        where=f"NOT {table}.is_completed"
+    )
+    if rows:
+        return rows[0], True
+
+    # Oldin tugatilgan - qator o'zgarmagan, eski completed_at saqlanadi
+    return UserProgress.objects.get(user_id=user_id, lesson_id=lesson_id), False
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Quiz, Question, Answer, QuizAttempt
+from .models import Quiz, Question, Answer, QuizAttempt, QuizAttemptAnswer, QuizAttemptCounter
 
 
 class AnswerInline(admin.TabularInline):
@@ -8,6 +8,13 @@ class AnswerInline(admin.TabularInline):
     extra = 4
 
 
+class QuizAttemptAnswerInline(admin.TabularInline):
+    model = QuizAttemptAnswer
+    extra = 0
+    readonly_fields = ('question', 'answer', 'is_correct')
+    can_delete = False
+
+
 class QuestionInline(admin.TabularInline):
     model = Question
     extra = 1
@@ -15,8 +22,8 @@ class QuestionInline(admin.TabularInline):
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
-    list_display = ('title', 'lesson', 'passing_score', 'max_attempts', 'is_active')
-    list_filter = ('is_active',)
+    list_display = ('title', 'lesson', 'passing_score', 'max_attempts', 'is_active', 'shuffle_questions', 'questions_per_attempt')
+    list_filter = ('is_active', 'shuffle_questions')
     inlines = [QuestionInline]
 
 
@@ -30,4 +37,11 @@ class QuestionAdmin(admin.ModelAdmin):
 @admin.register(QuizAttempt)
 class QuizAttemptAdmin(admin.ModelAdmin):
     list_display = ('user', 'quiz', 'score', 'is_passed', 'created_at')
-    list_filter = ('is_passed', 'quiz')
\ No newline at end of file
+    list_filter = ('is_passed', 'quiz')
+    inlines = [QuizAttemptAnswerInline]
+
+
+@admin.register(QuizAttemptCounter)
+class QuizAttemptCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'quiz', 'attempts_count', 'updated_at')
+    list_filter = ('quiz',)
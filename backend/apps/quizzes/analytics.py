@@ -0,0 +1,293 @@
+"""
+Quiz savollari tahlili (item analysis)
+
+Quizning barcha QuizAttemptAnswer yozuvlari bitta so'rov bilan olinadi va
+(urinishlar x savollar) javob matritsasiga joylanadi. Qiyinlik,
+ajratuvchanlik indeksi, distraktorlar tanlanish ulushi va Kronbax alfasi
+NumPy bilan vektorlashtirilgan holda hisoblanadi. Natija oxirgi urinish
+ID si va quiz mazmuni versiyasi bo'yicha keshlanadi - yangi urinish yoki
+tahrir bo'lmaguncha qayta hisoblanmaydi.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max
+
+from .models import Answer, Question, Quiz, QuizAttemptAnswer
+
+ITEM_ANALYSIS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Ajratuvchanlik indeksi uchun yuqori/quyi guruh ulushi (klassik 27%)
+DISCRIMINATION_GROUP_SHARE = 0.27
+
+
+@dataclass
+class QuizItemAnalysis:
+    """Quiz savollari statistikasi"""
+    question_ids: list
+    option_ids: list  # har bir savol uchun javob ID lari (ustunlar tartibi)
+    attempts_count: int
+    difficulty: np.ndarray  # (questions,) to'g'ri javoblar ulushi 0..1
+    discrimination: np.ndarray  # (questions,) -1..1
+    option_rates: np.ndarray  # (questions, options) tanlanish ulushi 0..1
+    no_answer_rates: np.ndarray  # (questions,) javobsiz qoldirilgan ulush
+    cronbach_alpha: float | None
+
+    def rows(self, questions) -> list[dict]:
+        """Template uchun qatorlar (savollar va javoblar joriy holatda)"""
+        index = {question_id: j for j, question_id in enumerate(self.question_ids)}
+        difficulty = (self.difficulty * 100).round().astype(int).tolist()
+        discrimination = self.discrimination.round(2).tolist()
+        option_rates = (self.option_rates * 100).round().astype(int).tolist()
+        no_answer_rates = (self.no_answer_rates * 100).round().astype(int).tolist()
+
+        rows = []
+        for question in questions:
+            j = index.get(question.id)
+
+            # Tahlildan keyin qo'shilgan savol - statistika yo'q
+            if j is None or not self.attempts_count:
+                rows.append({
+                    'question': question,
+                    'has_stats': False,
+                    'options': [(answer, None) for answer in question.answers.all()],
+                })
+                continue
+
+            rates = dict(zip(self.option_ids[j], option_rates[j]))
+            rows.append({
+                'question': question,
+                'has_stats': True,
+                'difficulty': difficulty[j],
+                'discrimination': discrimination[j],
+                'options': [(answer, rates.get(answer.id, 0)) for answer in question.answers.all()],
+                'no_answer_rate': no_answer_rates[j],
+            })
+        return rows
+
+
+def build_response_matrices(
+        attempt_ids: np.ndarray,
+        question_cols: np.ndarray,
+        option_cols: np.ndarray,
+        is_correct: np.ndarray,
+        questions_count: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tekis (attempt, savol, variant, to'g'ri) yozuvlardan matritsalar qurish
+    Returns: (correct float, choices int (-1 = javobsiz), presented bool) - barchasi (attempts, questions)
+    presented - savol urinishga berilganmi (savollar banki rejimida hammasi emas)
+    """
+    attempts, row_index = np.unique(attempt_ids, return_inverse=True)
+    shape = (len(attempts), questions_count)
+
+    correct = np.zeros(shape, dtype=np.float64)
+    choices = np.full(shape, -1, dtype=np.int64)
+    presented = np.zeros(shape, dtype=bool)
+    correct[row_index, question_cols] = is_correct
+    choices[row_index, question_cols] = option_cols
+    presented[row_index, question_cols] = True
+
+    return correct, choices, presented
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Ustunlar bo'yicha faqat mask dagi qiymatlar o'rtachasi (bo'sh ustun - 0)"""
+    counts = mask.sum(axis=0)
+    return np.divide((values * mask).sum(axis=0), counts, out=np.zeros(values.shape[1]), where=counts > 0)
+
+
+def compute_item_statistics(
+        correct: np.ndarray,
+        choices: np.ndarray,
+        options_count: int,
+        presented: np.ndarray | None = None
+) -> dict:
+    """
+    Javob matritsasi bo'yicha savollar statistikasi
+    Har bir savol statistikasi faqat shu savol berilgan urinishlar bo'yicha hisoblanadi
+    """
+    attempts_count, questions_count = correct.shape
+    if presented is None:
+        presented = np.ones(correct.shape, dtype=bool)
+
+    if attempts_count == 0:
+        return {
+            'difficulty': np.zeros(questions_count),
+            'discrimination': np.zeros(questions_count),
+            'option_rates': np.zeros((questions_count, options_count)),
+            'no_answer_rates': np.zeros(questions_count),
+            'cronbach_alpha': None,
+        }
+
+    shown = presented.sum(axis=0)
+    difficulty = _masked_mean(correct, presented)
+
+    # Urinish natijasi - berilgan savollar bo'yicha to'g'ri javoblar ulushi
+    scores = correct.sum(axis=1) / np.maximum(presented.sum(axis=1), 1)
+
+    # Umumiy natija bo'yicha eng kuchli va eng kuchsiz 27% o'rtasidagi farq
+    group_size = max(1, int(round(attempts_count * DISCRIMINATION_GROUP_SHARE)))
+    order = np.argsort(scores, kind='stable')
+    lower, upper = order[:group_size], order[-group_size:]
+    discrimination = (
+        _masked_mean(correct[upper], presented[upper]) - _masked_mean(correct[lower], presented[lower])
+    )
+
+    # Har bir (savol, variant) juftligi sonini bitta bincount bilan hisoblash
+    answered = choices >= 0
+    question_cols = np.broadcast_to(np.arange(questions_count), choices.shape)[answered]
+    counts = np.bincount(
+        question_cols * options_count + choices[answered],
+        minlength=questions_count * options_count
+    ).reshape(questions_count, options_count)
+    safe_shown = np.maximum(shown, 1)
+    option_rates = counts / safe_shown[:, None]
+    no_answer_rates = np.where(shown > 0, 1 - answered.sum(axis=0) / safe_shown, 0)
+
+    # Kronbax alfasi barcha savollar berilgan urinishlar bo'yicha (bank rejimida bo'lmasligi mumkin)
+    cronbach_alpha = None
+    complete = correct[presented.all(axis=1)]
+    if questions_count > 1 and len(complete) > 1:
+        total_variance = complete.sum(axis=1).var(ddof=1)
+        if total_variance > 0:
+            item_variance = complete.var(axis=0, ddof=1).sum()
+            cronbach_alpha = float(
+                questions_count / (questions_count - 1) * (1 - item_variance / total_variance)
+            )
+
+    return {
+        'difficulty': difficulty,
+        'discrimination': discrimination,
+        'option_rates': option_rates,
+        'no_answer_rates': no_answer_rates,
+        'cronbach_alpha': cronbach_alpha,
+    }
+
+
+@dataclass
+class ItemAnalysisRecords:
+    """Bazadan olingan tekis javob yozuvlari (matritsa qurishdan oldin)"""
+    question_ids: list
+    option_ids: list
+    options_count: int
+    attempt_ids: np.ndarray
+    question_cols: np.ndarray
+    option_cols: np.ndarray
+    is_correct: np.ndarray
+
+
+def fetch_item_analysis_records(quiz_id: int) -> ItemAnalysisRecords:
+    """
+    Quiz savollari, javob variantlari va urinish javoblarini olish
+    So'rovlar: savollar (1), javob variantlari (1), urinish javoblari (1)
+    ID -> ustun moslash har bir qator uchun Python lug'ati o'rniga np.searchsorted bilan
+    """
+    question_ids = list(
+        Question.objects.filter(quiz_id=quiz_id).order_by('order', 'id').values_list('id', flat=True)
+    )
+    question_index = {question_id: j for j, question_id in enumerate(question_ids)}
+
+    option_ids = [[] for _ in question_ids]
+    answer_ids, answer_positions = [], []
+    for answer_id, question_id in Answer.objects.filter(
+            question__quiz_id=quiz_id
+    ).order_by('id').values_list('id', 'question_id'):
+        options = option_ids[question_index[question_id]]
+        answer_ids.append(answer_id)
+        answer_positions.append(len(options))
+        options.append(answer_id)
+
+    options_count = max((len(options) for options in option_ids), default=0)
+
+    rows = list(
+        QuizAttemptAnswer.objects.filter(
+            attempt__quiz_id=quiz_id
+        ).values_list('attempt_id', 'question_id', 'answer_id', 'is_correct')
+    )
+    records = np.array(
+        [(attempt_id, question_id, answer_id or 0, is_correct)
+         for attempt_id, question_id, answer_id, is_correct in rows],
+        dtype=np.int64
+    ).reshape(-1, 4)
+    row_attempts, row_questions, row_answers, row_correct = records.T
+
+    # Savol ID -> ustun: savollar ID bo'yicha saralanadi, ustun tartibi esa (order, id)
+    question_order = np.argsort(np.array(question_ids, dtype=np.int64), kind='stable')
+    sorted_questions = np.array(question_ids, dtype=np.int64)[question_order]
+    known = np.zeros(len(records), dtype=bool)
+    question_cols = np.zeros(len(records), dtype=np.int64)
+    if len(sorted_questions):
+        position = np.minimum(np.searchsorted(sorted_questions, row_questions), len(sorted_questions) - 1)
+        known = sorted_questions[position] == row_questions
+        question_cols = question_order[position]
+
+    # Javob ID -> savol ichidagi variant o'rni (o'chirilgan yoki javobsiz - -1)
+    option_cols = np.full(len(records), -1, dtype=np.int64)
+    if answer_ids:
+        sorted_answers = np.array(answer_ids, dtype=np.int64)
+        position = np.minimum(np.searchsorted(sorted_answers, row_answers), len(sorted_answers) - 1)
+        option_cols = np.where(
+            sorted_answers[position] == row_answers,
+            np.array(answer_positions, dtype=np.int64)[position],
+            -1
+        )
+
+    return ItemAnalysisRecords(
+        question_ids=question_ids,
+        option_ids=option_ids,
+        options_count=options_count,
+        attempt_ids=row_attempts[known],
+        question_cols=question_cols[known],
+        option_cols=option_cols[known],
+        is_correct=row_correct[known],
+    )
+
+
+def analyse_item_records(records: ItemAnalysisRecords) -> QuizItemAnalysis:
+    """Tekis yozuvlardan savollar tahlilini hisoblash (baza ishlatilmaydi)"""
+    correct, choices, presented = build_response_matrices(
+        records.attempt_ids, records.question_cols, records.option_cols, records.is_correct,
+        len(records.question_ids)
+    )
+    stats = compute_item_statistics(correct, choices, records.options_count, presented)
+
+    return QuizItemAnalysis(
+        question_ids=records.question_ids,
+        option_ids=records.option_ids,
+        attempts_count=len(correct),
+        **stats,
+    )
+
+
+def build_quiz_item_analysis(quiz_id: int) -> QuizItemAnalysis:
+    """Quiz uchun savollar tahlilini qurish"""
+    return analyse_item_records(fetch_item_analysis_records(quiz_id))
+
+
+def get_quiz_item_analysis_cache_key(quiz_id: int) -> str:
+    """Oxirgi urinish ID si va quiz mazmuni versiyasi bo'yicha kalit (tahrir ham eskirtiradi)"""
+    # Ikkalasi bitta so'rovda: oxirgi urinish ID si va bazadagi content_version
+    latest_attempt_id, version = Quiz.objects.filter(id=quiz_id).annotate(
+        latest_attempt_id=Max('attempts__id')
+    ).values_list('latest_attempt_id', 'content_version').first() or (None, 0)
+    return f"quiz_item_analysis_{quiz_id}_{latest_attempt_id or 0}_v{version}"
+
+
+def clear_quiz_item_analysis(quiz_id: int) -> None:
+    """Savollar tahlili keshini tozalash (masalan qayta baholashdan keyin)"""
+    cache.delete(get_quiz_item_analysis_cache_key(quiz_id))
+
+
+def get_quiz_item_analysis(quiz_id: int) -> QuizItemAnalysis:
+    """Savollar tahlili (oxirgi urinish ID si va quiz versiyasi bo'yicha keshlangan)"""
+    cache_key = get_quiz_item_analysis_cache_key(quiz_id)
+
+    analysis = cache.get(cache_key)
+    if analysis is None:
+        analysis = build_quiz_item_analysis(quiz_id)
+        cache.set(cache_key, analysis, ITEM_ANALYSIS_CACHE_TIMEOUT)
+
+    return analysis
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class QuizzesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.quizzes'
-    verbose_name = 'Testlar'
\ No newline at end of file
+    verbose_name = 'Testlar'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizzes.analytics import (
+    analyse_item_records,
+    build_response_matrices,
+    compute_item_statistics,
+    fetch_item_analysis_records,
+)
+from apps.quizzes.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (
+        "Savollar tahlilini o'lchash. --quiz berilsa build_quiz_item_analysis bazadan "
+        "o'qish bilan to'liq o'lchanadi, aks holda sintetik urinishlar ustida faqat "
+        "javob matritsasi va NumPy statistikasi (baza ishlatilmaydi)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=100_000, help="Urinishlar soni")
+        parser.add_argument('--questions', type=int, default=20, help="Savollar soni")
+        parser.add_argument('--options', type=int, default=4, help="Har bir savoldagi variantlar soni")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--quiz', type=int, help="Bazadagi quiz ID si (to'liq o'lchash)")
+        parser.add_argument('--repeat', type=int, default=5, help="--quiz bilan takrorlashlar soni")
+
+    def handle(self, *args, **options):
+        if options['quiz'] is not None:
+            return self.bench_quiz(options['quiz'], options['repeat'])
+
+        attempts_count = options['attempts']
+        questions_count = options['questions']
+        options_count = options['options']
+        rng = np.random.default_rng(options['seed'])
+
+        # 2PL modeli: o'quvchi qobiliyati va savol qiyinligi bo'yicha to'g'ri javob ehtimoli
+        ability = rng.normal(size=(attempts_count, 1))
+        difficulty = rng.normal(size=questions_count)
+        slope = rng.uniform(0.5, 2.0, size=questions_count)
+        is_correct = rng.random((attempts_count, questions_count)) < 1 / (1 + np.exp(-slope * (ability - difficulty)))
+
+        # 0-variant to'g'ri, noto'g'ri javoblar distraktorlar orasida tasodifiy
+        choices = np.where(is_correct, 0, rng.integers(1, options_count, size=is_correct.shape))
+        # ~2% javobsiz qoldirilgan
+        choices[rng.random(choices.shape) < 0.02] = -1
+        is_correct &= choices >= 0
+
+        # QuizAttemptAnswer qatorlari kabi tekis yozuvlar (tasodifiy tartibda)
+        order = rng.permutation(attempts_count * questions_count)
+        attempt_ids = np.repeat(np.arange(attempts_count) + 1, questions_count)[order]
+        question_cols = np.tile(np.arange(questions_count), attempts_count)[order]
+        option_cols = choices.ravel()[order]
+        correct_flags = is_correct.ravel()[order]
+
+        started = time.perf_counter()
+        correct, choice_matrix, presented = build_response_matrices(
+            attempt_ids, question_cols, option_cols, correct_flags, questions_count
+        )
+        built = time.perf_counter()
+        stats = compute_item_statistics(correct, choice_matrix, options_count, presented)
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            f"{attempts_count} urinish x {questions_count} savol ({len(attempt_ids)} javob)\n"
+            f"matritsa qurish   {(built - started) * 1000:8.1f} ms\n"
+            f"statistika        {(finished - built) * 1000:8.1f} ms\n"
+            f"Kronbax alfasi    {stats['cronbach_alpha']:.3f}\n"
+            f"qiyinlik          {stats['difficulty'].min():.2f}..{stats['difficulty'].max():.2f}\n"
+            f"ajratuvchanlik    {stats['discrimination'].min():.2f}..{stats['discrimination'].max():.2f}"
+        )
+
+    def bench_quiz(self, quiz_id: int, repeat: int):
+        """Bazadan o'qish + matritsa + statistika (kesh chetlab o'tiladi)"""
+        if not Quiz.objects.filter(id=quiz_id).exists():
+            raise CommandError(f"Quiz topilmadi: {quiz_id}")
+
+        fetch_times, analyse_times = [], []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            records = fetch_item_analysis_records(quiz_id)
+            fetched = time.perf_counter()
+            analysis = analyse_item_records(records)
+            finished = time.perf_counter()
+            fetch_times.append(fetched - started)
+            analyse_times.append(finished - fetched)
+
+        fetch_ms = np.median(fetch_times) * 1000
+        analyse_ms = np.median(analyse_times) * 1000
+        self.stdout.write(
+            f"quiz {quiz_id}: {analysis.attempts_count} urinish x {len(analysis.question_ids)} savol "
+            f"({len(records.attempt_ids)} javob), mediana {len(fetch_times)} ta o'lchov"
+        )
+        for label, elapsed in (
+                ("bazadan o'qish", fetch_ms),
+                ('matritsa+statistika', analyse_ms),
+                ('jami', fetch_ms + analyse_ms),
+        ):
+            self.stdout.write(f"{label:<20}{elapsed:8.1f} ms")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizzes.models import Quiz
+from apps.quizzes.transfer import FORMATS, detect_format, export_quiz_questions
+
+
+class Command(BaseCommand):
+    help = "Quiz savollarini JSON yoki CSV ga eksport qilish (default: stdout)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--output', '-o', help="Fayl yo'li")
+        parser.add_argument('--format', choices=FORMATS, help="Default: fayl kengaytmasi bo'yicha yoki json")
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(id=options['quiz_id']).exists():
+            raise CommandError(f"Quiz topilmadi: {options['quiz_id']}")
+
+        output = options['output']
+        file_format = options['format'] or (detect_format(output) if output else None) or 'json'
+        chunks = export_quiz_questions(options['quiz_id'], file_format)
+
+        if not output:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(output, 'w', encoding='utf-8', newline='') as stream:
+            stream.writelines(chunks)
+
+        self.stdout.write(self.style.SUCCESS(f"Eksport qilindi: {output}"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizzes.models import Quiz
+from apps.quizzes.transfer import FORMATS, detect_format, import_quiz_questions
+from core.exceptions import QuizImportError
+
+
+class Command(BaseCommand):
+    help = "Quizga savollarni JSON yoki CSV fayldan import qilish (mavjud savollarga qo'shiladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('path', help="Fayl yo'li")
+        parser.add_argument('--format', choices=FORMATS, help="Default: fayl kengaytmasi bo'yicha")
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(id=options['quiz_id']).exists():
+            raise CommandError(f"Quiz topilmadi: {options['quiz_id']}")
+
+        file_format = options['format'] or detect_format(options['path'])
+        if not file_format:
+            raise CommandError("Formatni aniqlab bo'lmadi, --format bering")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                created = import_quiz_questions(options['quiz_id'], stream, file_format)
+        except OSError as e:
+            raise CommandError(str(e))
+        except QuizImportError as e:
+            raise CommandError("Import bekor qilindi:\n" + '\n'.join(e.errors))
+
+        self.stdout.write(self.style.SUCCESS(f"{created} ta savol import qilindi"))
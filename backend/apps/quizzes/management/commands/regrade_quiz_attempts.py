@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.quizzes.models import Quiz
+from apps.quizzes.regrade import REGRADE_CHUNK_SIZE, regrade_quiz_attempts
+
+
+class Command(BaseCommand):
+    help = "Test urinishlarini saqlangan javoblardan joriy kalit bo'yicha qayta baholash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', dest='quiz_ids', help="Quiz ID (bir necha marta berish mumkin)")
+        parser.add_argument('--chunk-size', type=int, default=REGRADE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz_ids'] or list(Quiz.objects.order_by('id').values_list('id', flat=True))
+
+        total = 0
+        for quiz_id in quiz_ids:
+            changed = regrade_quiz_attempts(quiz_id, chunk_size=options['chunk_size'])
+            total += changed
+            self.stdout.write(f"Quiz {quiz_id}: {changed} ta urinish o'zgardi")
+
+        self.stdout.write(self.style.SUCCESS(f"Jami {total} ta urinish qayta baholandi"))
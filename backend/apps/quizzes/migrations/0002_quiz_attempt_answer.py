@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttemptAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_correct', models.BooleanField(default=False, verbose_name="To'g'ri")),
+                ('answer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempt_answers', to='quizzes.answer', verbose_name='Tanlangan javob')),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quizzes.quizattempt', verbose_name='Urinish')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_answers', to='quizzes.question', verbose_name='Savol')),
+            ],
+            options={
+                'verbose_name': 'Urinish javobi',
+                'verbose_name_plural': 'Urinish javoblari',
+                'constraints': [models.UniqueConstraint(fields=('attempt', 'question'), name='unique_attempt_question')],
+            },
+        ),
+    ]
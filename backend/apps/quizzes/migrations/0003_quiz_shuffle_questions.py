@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_quiz_attempt_answer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='shuffle_questions',
+            field=models.BooleanField(default=False, help_text='Har bir urinishda savollar va javoblar tartibi aralashtiriladi', verbose_name='Aralashtirish'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_counters(apps, schema_editor):
+    """Mavjud urinishlar bo'yicha hisoblagichlarni yaratish"""
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    QuizAttemptCounter = apps.get_model('quizzes', 'QuizAttemptCounter')
+
+    counts = QuizAttempt.objects.values('user_id', 'quiz_id').annotate(total=Count('id')).order_by()
+
+    QuizAttemptCounter.objects.bulk_create([
+        QuizAttemptCounter(user_id=row['user_id'], quiz_id=row['quiz_id'], attempts_count=row['total'])
+        for row in counts.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0003_quiz_shuffle_questions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttemptCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('attempts_count', models.PositiveIntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_counters', to='quizzes.quiz', verbose_name='Test')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempt_counters', to=settings.AUTH_USER_MODEL, verbose_name="O'quvchi")),
+            ],
+            options={
+                'verbose_name': 'Urinishlar hisoblagichi',
+                'verbose_name_plural': 'Urinishlar hisoblagichlari',
+                'constraints': [models.UniqueConstraint(fields=('user', 'quiz'), name='unique_user_quiz_counter')],
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
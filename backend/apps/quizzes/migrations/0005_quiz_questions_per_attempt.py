@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_quiz_attempt_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='questions_per_attempt',
+            field=models.PositiveIntegerField(blank=True, help_text="Savollar bankidan har bir urinish uchun tasodifiy tanlanadigan savollar soni (bo'sh - barchasi)", null=True, verbose_name='Urinishdagi savollar soni'),
+        ),
+    ]
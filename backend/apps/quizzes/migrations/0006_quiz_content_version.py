@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0005_quiz_questions_per_attempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Savol/javob o'zgarganda oshadi - keshlar shu versiya bo'yicha", verbose_name='Mazmun versiyasi'),
+        ),
+    ]
@@ -30,6 +30,23 @@ class Quiz(TimeStampMixin):
         default=True,
         verbose_name="Faol"
     )
+    shuffle_questions = models.BooleanField(
+        default=False,
+        help_text="Har bir urinishda savollar va javoblar tartibi aralashtiriladi",
+        verbose_name="Aralashtirish"
+    )
+    questions_per_attempt = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Savollar bankidan har bir urinish uchun tasodifiy tanlanadigan savollar soni (bo'sh - barchasi)",
+        verbose_name="Urinishdagi savollar soni"
+    )
+    content_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Savol/javob o'zgarganda oshadi - keshlar shu versiya bo'yicha",
+        verbose_name="Mazmun versiyasi"
+    )
 
     class Meta:
         verbose_name = "Test"
@@ -38,6 +55,22 @@ class Quiz(TimeStampMixin):
     def __str__(self):
         return f"Test: {self.lesson.title}"
 
+    def save(self, *args, **kwargs):
+        # content_version faqat F() bilan oshiriladi - eski nusxa saqlanganda
+        # parallel tahrir oshirgan versiya orqaga qaytmasin
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'content_version'
+            ]
+        super().save(*args, **kwargs)
+
+    def get_attempt_questions_count(self, bank_size: int) -> int:
+        """Bitta urinishda beriladigan savollar soni"""
+        if self.questions_per_attempt:
+            return min(self.questions_per_attempt, bank_size)
+        return bank_size
+
 
 class Question(TimeStampMixin):
     """Test savoli"""
@@ -121,4 +154,79 @@ class QuizAttempt(TimeStampMixin):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.user.full_name} - {self.quiz.title} - {self.score}%"
\ No newline at end of file
+        return f"{self.user.full_name} - {self.quiz.title} - {self.score}%"
+
+
+class QuizAttemptAnswer(models.Model):
+    """Urinishdagi savolga berilgan javob (savollar tahlili uchun)"""
+
+    attempt = models.ForeignKey(
+        QuizAttempt,
+        on_delete=models.CASCADE,
+        related_name='answers',
+        verbose_name="Urinish"
+    )
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.CASCADE,
+        related_name='attempt_answers',
+        verbose_name="Savol"
+    )
+    answer = models.ForeignKey(
+        Answer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attempt_answers',
+        verbose_name="Tanlangan javob"
+    )
+    is_correct = models.BooleanField(
+        default=False,
+        verbose_name="To'g'ri"
+    )
+
+    class Meta:
+        verbose_name = "Urinish javobi"
+        verbose_name_plural = "Urinish javoblari"
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'question'], name='unique_attempt_question'),
+        ]
+
+    def __str__(self):
+        return f"{self.attempt_id} - {self.question_id}: {self.answer_id}"
+
+
+class QuizAttemptCounter(TimeStampMixin):
+    """
+    Foydalanuvchining quiz bo'yicha urinishlar hisoblagichi
+
+    submit_quiz_attempt tranzaksiyasida shartli UPDATE bilan oshiriladi -
+    parallel topshirishlar max_attempts dan oshib keta olmaydi
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='quiz_attempt_counters',
+        verbose_name="O'quvchi"
+    )
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='attempt_counters',
+        verbose_name="Test"
+    )
+    attempts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Urinishlar soni"
+    )
+
+    class Meta:
+        verbose_name = "Urinishlar hisoblagichi"
+        verbose_name_plural = "Urinishlar hisoblagichlari"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'quiz'], name='unique_user_quiz_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.quiz_id}: {self.attempts_count}"
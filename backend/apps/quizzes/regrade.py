@@ -0,0 +1,140 @@
+"""
+Quiz urinishlarini qayta baholash
+
+Javoblar kaliti o'zgarganda (set_correct_answer, update_answer) eski
+QuizAttempt.score/is_passed qiymatlari eskiradi. Qayta baholash saqlangan
+QuizAttemptAnswer yozuvlaridan joriy kalit bo'yicha bo'laklab hisoblanadi:
+har bir bo'lak uchun javoblar bitta so'rov bilan olinadi, ball NumPy bilan
+hisoblanadi va faqat o'zgargan qatorlar bulk_update bilan yoziladi.
+
+Ball urinishda berilgan savollar bo'yicha hisoblanadi (savol keyinroq
+qo'shilsa eski urinishlar ballini tushirmaydi). Javoblari saqlanmagan
+eski urinishlar o'zgarishsiz qoladi.
+"""
+
+import logging
+
+import numpy as np
+from django.db import transaction
+
+from core.background import is_background_task_running, run_in_background
+
+from .analytics import clear_quiz_item_analysis
+from .models import Quiz, QuizAttempt, QuizAttemptAnswer
+from .selectors import get_quiz_answer_key
+
+logger = logging.getLogger(__name__)
+
+REGRADE_CHUNK_SIZE = 1000
+
+
+def get_regrade_lock_key(quiz_id: int) -> str:
+    return f"quiz_regrade_lock_{quiz_id}"
+
+
+def is_regrade_running(quiz_id: int) -> bool:
+    """Quiz uchun qayta baholash ishlayaptimi?"""
+    return is_background_task_running(get_regrade_lock_key(quiz_id))
+
+
+def _regrade_chunk(attempt_ids: list[int], answer_key: dict[int, int | None], passing_score: int) -> int:
+    """Bitta bo'lakni qayta baholash. Returns: o'zgargan urinishlar soni"""
+    rows = list(
+        QuizAttemptAnswer.objects.filter(
+            attempt_id__in=attempt_ids
+        ).values_list('id', 'attempt_id', 'question_id', 'answer_id', 'is_correct')
+    )
+    if not rows:
+        return 0
+
+    records = np.array(
+        [(row_id, attempt_id, question_id, answer_id or 0, stored)
+         for row_id, attempt_id, question_id, answer_id, stored in rows],
+        dtype=np.int64
+    )
+    row_ids, row_attempts, row_questions, row_answers, row_stored = records.T
+
+    # Kalit bo'yicha tekshirish: savol ID -> to'g'ri javob ID (yo'q bo'lsa -1)
+    is_correct = np.zeros(len(records), dtype=bool)
+    if answer_key:
+        key_questions = np.array(sorted(answer_key), dtype=np.int64)
+        key_answers = np.array([answer_key[q] or -1 for q in key_questions.tolist()], dtype=np.int64)
+        position = np.minimum(np.searchsorted(key_questions, row_questions), len(key_questions) - 1)
+        is_correct = (key_questions[position] == row_questions) & (key_answers[position] == row_answers)
+
+    attempts, attempt_index = np.unique(row_attempts, return_inverse=True)
+    correct_counts = np.bincount(attempt_index, weights=is_correct, minlength=len(attempts))
+    totals = np.bincount(attempt_index, minlength=len(attempts))
+    # submit_quiz_attempt dagi int((correct / total) * 100) bilan bir xil
+    scores = (correct_counts / totals * 100).astype(np.int64)
+    passed = scores >= passing_score
+
+    new_grades = dict(zip(attempts.tolist(), zip(scores.tolist(), passed.tolist())))
+
+    changed_mask = is_correct != row_stored.astype(bool)
+    changed_rows = [
+        QuizAttemptAnswer(id=row_id, is_correct=correct)
+        for row_id, correct in zip(row_ids[changed_mask].tolist(), is_correct[changed_mask].tolist())
+    ]
+
+    changed_attempts = []
+    for attempt in QuizAttempt.objects.filter(id__in=new_grades.keys()).only('id', 'score', 'is_passed'):
+        score, is_passed = new_grades[attempt.id]
+        if attempt.score != score or attempt.is_passed != is_passed:
+            attempt.score = score
+            attempt.is_passed = is_passed
+            changed_attempts.append(attempt)
+
+    with transaction.atomic():
+        QuizAttemptAnswer.objects.bulk_update(changed_rows, ['is_correct'], batch_size=REGRADE_CHUNK_SIZE)
+        QuizAttempt.objects.bulk_update(changed_attempts, ['score', 'is_passed'], batch_size=REGRADE_CHUNK_SIZE)
+
+    return len(changed_attempts)
+
+
+def regrade_quiz_attempts(quiz_id: int, chunk_size: int = REGRADE_CHUNK_SIZE) -> int:
+    """
+    Quizning barcha urinishlarini joriy kalit bo'yicha qayta baholash
+    Returns: bali yoki holati o'zgargan urinishlar soni
+    """
+    quiz = Quiz.objects.filter(id=quiz_id).only('id', 'passing_score', 'content_version').first()
+    if not quiz:
+        return 0
+
+    answer_key = get_quiz_answer_key(quiz_id, quiz.content_version)
+    changed = 0
+    last_id = 0
+
+    # Keyset pagination - OFFSET siz, katta jadvallarda ham barqaror
+    while True:
+        attempt_ids = list(
+            QuizAttempt.objects.filter(
+                quiz_id=quiz_id,
+                id__gt=last_id
+            ).order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not attempt_ids:
+            break
+
+        changed += _regrade_chunk(attempt_ids, answer_key, quiz.passing_score)
+        last_id = attempt_ids[-1]
+
+    clear_quiz_item_analysis(quiz_id)
+    return changed
+
+
+def _run_regrade(quiz_id: int) -> None:
+    try:
+        changed = regrade_quiz_attempts(quiz_id)
+        logger.info("Quiz %s: %s ta urinish qayta baholandi", quiz_id, changed)
+    except Exception:
+        logger.exception("Quiz %s ni qayta baholashda xatolik", quiz_id)
+
+
+def start_regrade(quiz_id: int) -> bool:
+    """
+    Qayta baholashni fon oqimida boshlash (so'rovni bloklamaydi)
+    Qayta baholash paytida kalit yana o'zgarsa, joriy ish tugagach quiz yana baholanadi
+    Returns: False - shu quiz uchun qayta baholash allaqachon ishlayapti
+    """
+    return run_in_background(get_regrade_lock_key(quiz_id), _run_regrade, quiz_id)
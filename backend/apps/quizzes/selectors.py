@@ -1,6 +1,49 @@
-from django.db.models import QuerySet, Count, Prefetch
+import random
+from dataclasses import dataclass
 
-from .models import Quiz, Question, Answer, QuizAttempt
+from django.core.cache import cache
+from django.db.models import QuerySet, Count, Prefetch, OuterRef, Subquery
+
+from .models import Quiz, Question, Answer, QuizAttempt, QuizAttemptCounter
+
+
+@dataclass
+class QuizAttemptStats:
+    """Foydalanuvchining quiz bo'yicha urinishlari jamlanmasi"""
+    quiz: Quiz
+    attempts: list[QuizAttempt]
+    attempts_count: int
+    best_attempt: QuizAttempt | None
+    has_passed: bool
+
+    @property
+    def best_score(self) -> int:
+        return self.best_attempt.score if self.best_attempt else 0
+
+    @property
+    def remaining_attempts(self) -> int:
+        return self.quiz.max_attempts - self.attempts_count
+
+    @property
+    def eligibility(self) -> tuple[bool, str]:
+        """(can_attempt, reason) - can_user_attempt_quiz bilan bir xil qoidalar"""
+        if not self.quiz.is_active:
+            return False, "Test hozirda faol emas"
+
+        # Allaqachon o'tganmi?
+        if self.has_passed:
+            return False, "Siz bu testdan allaqachon o'tgansiz"
+
+        # Urinishlar soni
+        if self.attempts_count >= self.quiz.max_attempts:
+            return False, f"Maksimal urinishlar soni ({self.quiz.max_attempts}) tugadi"
+
+        return True, ""
+
+
+# Javoblar kaliti va payload savol/javob o'zgarganda versiya bilan eskiradi
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+QUIZ_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
 
 
 def get_quiz_by_id(quiz_id: int) -> Quiz | None:
@@ -32,6 +75,113 @@ def get_quiz_with_questions(quiz_id: int) -> Quiz | None:
         return None
 
 
+def get_quiz_version(quiz_id: int) -> int:
+    """
+    Quiz savollari versiyasi (savol/javob o'zgarganda bazada oshadi)
+    Bazadan o'qiladi - har bir worker jarayoni tahrirni darhol ko'radi
+    """
+    version = Quiz.objects.filter(id=quiz_id).values_list('content_version', flat=True).first()
+    return version or 0
+
+
+def get_quiz_payload(quiz_id: int, version: int | None = None) -> list[dict]:
+    """
+    Quiz savollari va javoblari (versiya bo'yicha cache bilan)
+    version - quiz bilan birga o'qilgan content_version (berilmasa bazadan olinadi)
+    Returns: [{'id', 'text', 'answers': [{'id', 'text'}, ...]}, ...]
+    To'g'ri javob belgisi payloadga kirmaydi
+    """
+    if version is None:
+        version = get_quiz_version(quiz_id)
+
+    cache_key = f"quiz_payload_{quiz_id}_v{version}"
+    payload = cache.get(cache_key)
+
+    if payload is not None:
+        return payload
+
+    quiz = get_quiz_with_questions(quiz_id)
+    payload = [
+        {
+            'id': question.id,
+            'text': question.text,
+            'answers': [
+                {'id': answer.id, 'text': answer.text}
+                for answer in sorted(question.answers.all(), key=lambda answer: answer.id)
+            ],
+        }
+        for question in (quiz.questions.all() if quiz else [])
+    ]
+
+    cache.set(cache_key, payload, QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return payload
+
+
+def sample_quiz_payload(payload: list[dict], count: int, seed: str) -> list[dict]:
+    """
+    Savollar bankidan urinish uchun count ta savol tanlash
+    Keshlangan payload indekslari bo'yicha O(count) - ORDER BY RANDOM() siz
+    Tanlangan savollar bankdagi tartibida qaytadi
+    """
+    if count >= len(payload):
+        return payload
+
+    indexes = random.Random(seed).sample(range(len(payload)), count)
+    return [payload[index] for index in sorted(indexes)]
+
+
+def shuffle_quiz_payload(payload: list[dict], seed: str) -> list[dict]:
+    """
+    Savollar va javoblar tartibini aralashtirish (umumiy cache o'zgarmaydi)
+    Bir xil seed - bir xil tartib, sahifa yangilansa ham tartib saqlanadi
+    """
+    rng = random.Random(seed)
+    questions = [
+        {**question, 'answers': rng.sample(question['answers'], len(question['answers']))}
+        for question in payload
+    ]
+    rng.shuffle(questions)
+    return questions
+
+
+def get_quiz_answer_key_cache_key(quiz_id: int, version: int) -> str:
+    # Versiya kalitdan oldin o'qiladi: tahrir versiyani o'zi bilan bitta
+    # tranzaksiyada oshiradi, eski ma'lumot faqat eski versiya ostida qoladi
+    return f"quiz_answer_key_{quiz_id}_v{version}"
+
+
+def get_quiz_answer_key(quiz_id: int, version: int | None = None) -> dict[int, int | None]:
+    """
+    Quizning javoblar kaliti (cache bilan)
+    version - quiz bilan birga o'qilgan content_version (berilmasa bazadan olinadi)
+    Returns: {question_id: correct_answer_id} - to'g'ri javobi yo'q savollar uchun None
+    """
+    if version is None:
+        version = get_quiz_version(quiz_id)
+
+    cache_key = get_quiz_answer_key_cache_key(quiz_id, version)
+    answer_key = cache.get(cache_key)
+
+    if answer_key is not None:
+        return answer_key
+
+    correct_answer = Answer.objects.filter(
+        question_id=OuterRef('pk'),
+        is_correct=True
+    ).order_by('id').values('id')[:1]
+
+    answer_key = dict(
+        Question.objects.filter(
+            quiz_id=quiz_id
+        ).annotate(
+            correct_answer_id=Subquery(correct_answer)
+        ).values_list('id', 'correct_answer_id')
+    )
+
+    cache.set(cache_key, answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+    return answer_key
+
+
 def get_all_quizzes() -> QuerySet[Quiz]:
     """Barcha quizlar"""
     return Quiz.objects.select_related('lesson').annotate(
@@ -63,11 +213,11 @@ def get_user_quiz_attempts(user_id: int, quiz_id: int) -> QuerySet[QuizAttempt]:
 
 
 def get_user_attempt_count(user_id: int, quiz_id: int) -> int:
-    """Foydalanuvchining urinishlar soni"""
-    return QuizAttempt.objects.filter(
+    """Foydalanuvchining urinishlar soni (hisoblagich qatoridan, COUNT(*) siz)"""
+    return QuizAttemptCounter.objects.filter(
         user_id=user_id,
         quiz_id=quiz_id
-    ).count()
+    ).values_list('attempts_count', flat=True).first() or 0
 
 
 def has_user_passed_quiz(user_id: int, quiz_id: int) -> bool:
@@ -87,6 +237,30 @@ def get_best_attempt(user_id: int, quiz_id: int) -> QuizAttempt | None:
     ).order_by('-score').first()
 
 
+def get_user_quiz_stats(user_id: int, quiz: Quiz) -> QuizAttemptStats:
+    """
+    Urinishlar soni, eng yaxshi natija, o'tganlik va urinishlar ro'yxati
+    bitta so'rov bilan (urinishlar soni max_attempts bilan cheklangan)
+
+    Urinishlar soni - QuizAttemptCounter dan (limitni submit_quiz_attempt
+    ham shu hisoblagich bo'yicha tekshiradi). Hisoblagich har bir urinish
+    qatoriga subquery bilan qo'shiladi; urinish yo'q bo'lsa, hisoblagich ham 0.
+    """
+    counter = QuizAttemptCounter.objects.filter(
+        user_id=user_id,
+        quiz_id=quiz.id
+    ).values('attempts_count')[:1]
+    attempts = list(get_user_quiz_attempts(user_id, quiz.id).annotate(counter_value=Subquery(counter)))
+
+    return QuizAttemptStats(
+        quiz=quiz,
+        attempts=attempts,
+        attempts_count=attempts[0].counter_value or 0 if attempts else 0,
+        best_attempt=max(attempts, key=lambda attempt: attempt.score, default=None),
+        has_passed=any(attempt.is_passed for attempt in attempts),
+    )
+
+
 def can_user_attempt_quiz(user_id: int, quiz_id: int) -> tuple[bool, str]:
     """
     Foydalanuvchi quiz yecha oladimi?
@@ -97,16 +271,4 @@ def can_user_attempt_quiz(user_id: int, quiz_id: int) -> tuple[bool, str]:
     if not quiz:
         return False, "Test topilmadi"
 
-    if not quiz.is_active:
-        return False, "Test hozirda faol emas"
-
-    # Allaqachon o'tganmi?
-    if has_user_passed_quiz(user_id, quiz_id):
-        return False, "Siz bu testdan allaqachon o'tgansiz"
-
-    # Urinishlar soni
-    attempts_count = get_user_attempt_count(user_id, quiz_id)
-    if attempts_count >= quiz.max_attempts:
-        return False, f"Maksimal urinishlar soni ({quiz.max_attempts}) tugadi"
-
-    return True, ""
\ No newline at end of file
+    return get_user_quiz_stats(user_id, quiz).eligibility
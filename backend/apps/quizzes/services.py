@@ -1,21 +1,41 @@
 from django.db import transaction
+from django.db.models import F
 
-from .models import Quiz, Question, Answer, QuizAttempt
-from .selectors import get_quiz_by_id, get_quiz_questions
+from core.exceptions import QuizAttemptLimitError
+from .models import Quiz, Question, Answer, QuizAttempt, QuizAttemptAnswer, QuizAttemptCounter
+from .selectors import (
+    get_quiz_by_id,
+    get_quiz_answer_key
+)
+
+
+def invalidate_quiz_content(quiz_id: int) -> None:
+    """
+    Savol/javob o'zgarganda: quiz versiyasini oshirish (javoblar kaliti va payload eskiradi)
+
+    Versiya bazada va tahrir bilan bitta tranzaksiyada oshadi - barcha worker
+    jarayonlari yangi versiyani commit bilan bir vaqtda ko'radi, boshqa
+    so'rovlar esa commitgacha eski versiya va eski ma'lumotni o'qiydi.
+    """
+    Quiz.objects.filter(id=quiz_id).update(content_version=F('content_version') + 1)
 
 
 def create_quiz(
         lesson_id: int,
         title: str,
         passing_score: int = 70,
-        max_attempts: int = 3
+        max_attempts: int = 3,
+        shuffle_questions: bool = False,
+        questions_per_attempt: int | None = None
 ) -> Quiz:
     """Yangi quiz yaratish"""
     return Quiz.objects.create(
         lesson_id=lesson_id,
         title=title,
         passing_score=passing_score,
-        max_attempts=max_attempts
+        max_attempts=max_attempts,
+        shuffle_questions=shuffle_questions,
+        questions_per_attempt=questions_per_attempt
     )
 
 
@@ -25,7 +45,7 @@ def update_quiz(quiz_id: int, **kwargs) -> Quiz | None:
     if not quiz:
         return None
 
-    allowed_fields = ['title', 'passing_score', 'max_attempts', 'is_active']
+    allowed_fields = ['title', 'passing_score', 'max_attempts', 'is_active', 'shuffle_questions', 'questions_per_attempt']
 
     for field, value in kwargs.items():
         if field in allowed_fields:
@@ -132,6 +152,10 @@ def set_correct_answer(question_id: int, answer_id: int) -> bool:
         Answer.objects.filter(question_id=question_id).update(is_correct=False)
         # Tanlangan javobni to'g'ri qilish
         Answer.objects.filter(id=answer_id, question_id=question_id).update(is_correct=True)
+        # update() signal yubormaydi - kalitni shu yerda tozalash
+        quiz_id = Question.objects.filter(id=question_id).values_list('quiz_id', flat=True).first()
+        if quiz_id:
+            invalidate_quiz_content(quiz_id)
         return True
     except Exception:
         return False
@@ -141,7 +165,8 @@ def set_correct_answer(question_id: int, answer_id: int) -> bool:
 def submit_quiz_attempt(
         user_id: int,
         quiz_id: int,
-        answers: dict[int, int]  # {question_id: answer_id}
+        answers: dict[int, int],  # {question_id: answer_id}
+        question_ids: list[int] | None = None
 ) -> QuizAttempt:
     """
     Quiz javoblarini topshirish
@@ -150,24 +175,66 @@ def submit_quiz_attempt(
         user_id: Foydalanuvchi ID
         quiz_id: Quiz ID
         answers: {question_id: answer_id} formatda javoblar
+        question_ids: urinishga berilgan savollar (bank rejimi); None - barcha savollar
 
     Returns:
         QuizAttempt object
+
+    Raises:
+        QuizAttemptLimitError: max_attempts tugagan (parallel so'rovlarda ham)
     """
     quiz = get_quiz_by_id(quiz_id)
-    questions = get_quiz_questions(quiz_id)
 
-    total_questions = questions.count()
-    correct_count = 0
-
-    # Javoblarni tekshirish
-    for question in questions:
-        selected_answer_id = answers.get(question.id)
-        if selected_answer_id:
-            # To'g'ri javobni tekshirish
-            correct_answer = question.answers.filter(is_correct=True).first()
-            if correct_answer and correct_answer.id == selected_answer_id:
-                correct_count += 1
+    # Urinish joyini band qilish: hisoblagich faqat limitdan kichik bo'lsa oshadi.
+    # UPDATE qator qulfini oladi, shuning uchun parallel topshirishlar navbat
+    # bilan shartni qayta tekshiradi. Xatolikda tranzaksiya bilan qaytariladi.
+    QuizAttemptCounter.objects.bulk_create(
+        [QuizAttemptCounter(user_id=user_id, quiz_id=quiz_id)],
+        ignore_conflicts=True
+    )
+    reserved = QuizAttemptCounter.objects.filter(
+        user_id=user_id,
+        quiz_id=quiz_id,
+        attempts_count__lt=quiz.max_attempts
+    ).update(attempts_count=F('attempts_count') + 1)
+
+    if not reserved:
+        raise QuizAttemptLimitError(f"Maksimal urinishlar soni ({quiz.max_attempts}) tugadi")
+
+    answer_key = get_quiz_answer_key(quiz_id, quiz.content_version)
+
+    # Bank rejimida faqat urinishga berilgan savollar baholanadi va saqlanadi
+    if question_ids is not None:
+        answer_key = {
+            question_id: answer_key[question_id]
+            for question_id in question_ids if question_id in answer_key
+        }
+
+    total_questions = len(answer_key)
+
+    # Faqat shu quiz savollariga tegishli javoblarni saqlash (bitta so'rov)
+    submitted = {
+        question_id: answer_id for question_id, answer_id in answers.items()
+        if question_id in answer_key
+    }
+    valid_answers = set(
+        Answer.objects.filter(
+            id__in=submitted.values(),
+            question_id__in=submitted.keys()
+        ).values_list('question_id', 'id')
+    ) if submitted else set()
+
+    chosen = {
+        question_id: answer_id if (question_id, answer_id) in valid_answers else None
+        for question_id, answer_id in submitted.items()
+    }
+
+    # Javoblarni tekshirish (kalit bo'yicha, savol uchun alohida so'rovsiz)
+    results = {
+        question_id: correct_answer_id is not None and chosen.get(question_id) == correct_answer_id
+        for question_id, correct_answer_id in answer_key.items()
+    }
+    correct_count = sum(results.values())
 
     # Ball hisoblash
     score = int((correct_count / total_questions) * 100) if total_questions > 0 else 0
@@ -181,6 +248,17 @@ def submit_quiz_attempt(
         is_passed=is_passed
     )
 
+    # Har bir savol javobi - savollar sonidan qat'i nazar bitta INSERT
+    QuizAttemptAnswer.objects.bulk_create([
+        QuizAttemptAnswer(
+            attempt=attempt,
+            question_id=question_id,
+            answer_id=chosen.get(question_id),
+            is_correct=is_correct
+        )
+        for question_id, is_correct in results.items()
+    ])
+
     return attempt
 
 
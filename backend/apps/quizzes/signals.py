@@ -0,0 +1,37 @@
+"""
+Savol yoki javob o'zgarganda quiz keshlarini tozalash (javoblar kaliti va payload versiyasi)
+
+Admin panel va dashboard orqali save()/delete() chaqirilganda ishlaydi.
+Versiya bazada, tahrir bilan bitta tranzaksiyada oshadi (invalidate_quiz_content).
+QuerySet.update() signal yubormaydi - bunday joylarda servislar keshni
+o'zi tozalaydi (masalan set_correct_answer).
+"""
+
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Question, Answer, QuizAttempt, QuizAttemptCounter
+from .services import invalidate_quiz_content
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    invalidate_quiz_content(instance.quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    quiz_id = Question.objects.filter(id=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id:
+        invalidate_quiz_content(quiz_id)
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def attempt_deleted(sender, instance, **kwargs):
+    # Admin urinishni o'chirsa, o'quvchiga urinish qaytariladi
+    QuizAttemptCounter.objects.filter(
+        user_id=instance.user_id,
+        quiz_id=instance.quiz_id,
+        attempts_count__gt=0
+    ).update(attempts_count=F('attempts_count') - 1)
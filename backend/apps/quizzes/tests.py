@@ -1,3 +1,668 @@
-from django.test import TestCase
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import OperationalError, connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from core.exceptions import QuizAttemptLimitError, QuizImportError
+from core.utils import create_question_set_token, verify_question_set_token
+from apps.courses.models import Lesson
+
+from .models import Quiz, Question, Answer, QuizAttempt, QuizAttemptAnswer, QuizAttemptCounter
+from .analytics import compute_item_statistics, get_quiz_item_analysis
+from .selectors import (
+    get_user_quiz_stats, can_user_attempt_quiz, get_quiz_payload, sample_quiz_payload, shuffle_quiz_payload,
+    get_quiz_answer_key, get_quiz_version
+)
+from .regrade import is_regrade_running, regrade_quiz_attempts, start_regrade
+from .services import invalidate_quiz_content, set_correct_answer, submit_quiz_attempt
+from .transfer import export_quiz_questions, import_quiz_questions
+
+
+class QuizAttemptStatsTests(TestCase):
+    """get_user_quiz_stats va quiz viewlari uchun so'rovlar soni testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        cls.quiz = Quiz.objects.create(lesson=lesson, title='Test 1', passing_score=70, max_attempts=3)
+        cls.student = User.objects.create_user(phone_number='+998901234567', full_name='Test Student')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_attempts(self, *scores):
+        for score in scores:
+            QuizAttempt.objects.create(
+                user=self.student,
+                quiz=self.quiz,
+                score=score,
+                is_passed=score >= self.quiz.passing_score
+            )
+        # Hisoblagich submit_quiz_attempt dagi kabi
+        QuizAttemptCounter.objects.update_or_create(
+            user=self.student,
+            quiz=self.quiz,
+            defaults={'attempts_count': QuizAttempt.objects.filter(user=self.student, quiz=self.quiz).count()}
+        )
+
+    def test_stats_single_query(self):
+        self.create_attempts(40, 60)
+
+        with self.assertNumQueries(1):
+            stats = get_user_quiz_stats(self.student.id, self.quiz)
+            can_attempt, reason = stats.eligibility
+
+        self.assertEqual(stats.attempts_count, 2)
+        self.assertEqual(stats.best_score, 60)
+        self.assertEqual(stats.remaining_attempts, 1)
+        self.assertFalse(stats.has_passed)
+        self.assertTrue(can_attempt)
+
+    def test_can_user_attempt_quiz_budget(self):
+        with self.assertNumQueries(2):
+            can_attempt, reason = can_user_attempt_quiz(self.student.id, self.quiz.id)
+        self.assertTrue(can_attempt)
+
+    def test_passed(self):
+        self.create_attempts(50, 80)
+        can_attempt, reason = get_user_quiz_stats(self.student.id, self.quiz).eligibility
+
+        self.assertFalse(can_attempt)
+        self.assertEqual(reason, "Siz bu testdan allaqachon o'tgansiz")
+
+    def test_max_attempts(self):
+        self.create_attempts(10, 20, 30)
+        can_attempt, reason = get_user_quiz_stats(self.student.id, self.quiz).eligibility
+
+        self.assertFalse(can_attempt)
+        self.assertEqual(reason, "Maksimal urinishlar soni (3) tugadi")
+
+    def test_count_comes_from_counter(self):
+        # Limit submit_quiz_attempt dagi hisoblagich bo'yicha - statistika ham shundan
+        self.create_attempts(10, 20)
+        QuizAttemptCounter.objects.filter(user=self.student, quiz=self.quiz).update(attempts_count=3)
+
+        stats = get_user_quiz_stats(self.student.id, self.quiz)
+
+        self.assertEqual(stats.attempts_count, 3)
+        self.assertFalse(stats.eligibility[0])
+
+    def test_detail_view_budget(self):
+        self.create_attempts(10, 20)
+        self.client.force_login(self.student)
+
+        # sessiya (1) + user (1) + quiz (1) + urinishlar (1)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('quizzes:detail', kwargs={'quiz_id': self.quiz.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['attempts_count'], 2)
+
+
+class SubmitQuizAttemptTests(TestCase):
+    """submit_quiz_attempt javoblarni saqlashi va so'rovlar soni testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901234568', full_name='Test Student')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_quiz(self, order: int, questions_count: int):
+        lesson = Lesson.objects.create(title=f'Dars {order}', order=order)
+        quiz = Quiz.objects.create(lesson=lesson, title=f'Test {order}')
+        answers = {}
+        for i in range(questions_count):
+            question = Question.objects.create(quiz=quiz, text=f'Savol {i}', order=i)
+            correct = Answer.objects.create(question=question, text='A', is_correct=True)
+            wrong = Answer.objects.create(question=question, text='B')
+            answers[question.id] = (correct.id, wrong.id)
+        return quiz, answers
+
+    def submit_queries(self, quiz, answers) -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            submit_quiz_attempt(self.student.id, quiz.id, answers)
+        return len(ctx.captured_queries)
+
+    def test_constant_statements(self):
+        small_quiz, small = self.create_quiz(1, 3)
+        large_quiz, large = self.create_quiz(2, 40)
+
+        small_queries = self.submit_queries(small_quiz, {q: a[0] for q, a in small.items()})
+        large_queries = self.submit_queries(large_quiz, {q: a[0] for q, a in large.items()})
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(QuizAttemptAnswer.objects.filter(attempt__quiz=large_quiz).count(), 40)
+
+    def test_responses_stored(self):
+        quiz, answers = self.create_quiz(1, 3)
+        (q1, (c1, _)), (q2, (_, w2)), (q3, _) = answers.items()
+        # q3 javobsiz, begona javob ID si saqlanmaydi
+        foreign_answer_id = c1
+
+        attempt = submit_quiz_attempt(self.student.id, quiz.id, {q1: c1, q2: w2, q3: foreign_answer_id})
+
+        stored = {
+            row.question_id: (row.answer_id, row.is_correct)
+            for row in attempt.answers.all()
+        }
+        self.assertEqual(stored, {q1: (c1, True), q2: (w2, False), q3: (None, False)})
+        self.assertEqual(attempt.score, 33)
+
+
+class QuizItemAnalysisTests(TestCase):
+    """Savollar tahlili statistikasi testlari"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_statistics(self):
+        correct = np.array([[1, 1, 1], [1, 1, 0], [1, 0, 0], [0, 0, 0]], dtype=float)
+        choices = np.array([[0, 0, 0], [0, 0, 1], [0, 1, 2], [1, -1, 1]])
+
+        stats = compute_item_statistics(correct, choices, options_count=3)
+
+        np.testing.assert_allclose(stats['difficulty'], [0.75, 0.5, 0.25])
+        np.testing.assert_allclose(stats['discrimination'], [1, 1, 1])
+        np.testing.assert_allclose(stats['option_rates'][2], [0.25, 0.5, 0.25])
+        np.testing.assert_allclose(stats['no_answer_rates'], [0, 0.25, 0])
+        self.assertAlmostEqual(stats['cronbach_alpha'], 0.75)
+
+    def test_cache_follows_latest_attempt(self):
+        student = User.objects.create_user(phone_number='+998901234569', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        quiz = Quiz.objects.create(lesson=lesson, title='Test 1')
+        question = Question.objects.create(quiz=quiz, text='Savol')
+        correct = Answer.objects.create(question=question, text='A', is_correct=True)
+        wrong = Answer.objects.create(question=question, text='B')
+
+        submit_quiz_attempt(student.id, quiz.id, {question.id: correct.id})
+        self.assertEqual(get_quiz_item_analysis(quiz.id).attempts_count, 1)
+
+        # Kesh urilganda faqat oxirgi urinish ID si va versiya (bitta so'rov)
+        with self.assertNumQueries(1):
+            get_quiz_item_analysis(quiz.id)
+
+        submit_quiz_attempt(student.id, quiz.id, {question.id: wrong.id})
+        analysis = get_quiz_item_analysis(quiz.id)
+
+        self.assertEqual(analysis.attempts_count, 2)
+        np.testing.assert_allclose(analysis.option_rates[0], [0.5, 0.5])
+
+    def test_cache_follows_quiz_edits(self):
+        student = User.objects.create_user(phone_number='+998901234569', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        quiz = Quiz.objects.create(lesson=lesson, title='Test 1')
+        first = Question.objects.create(quiz=quiz, text='Savol 1', order=2)
+        second = Question.objects.create(quiz=quiz, text='Savol 2', order=1)
+        first_answer = Answer.objects.create(question=first, text='A', is_correct=True)
+        second_answer = Answer.objects.create(question=second, text='B', is_correct=True)
+        submit_quiz_attempt(student.id, quiz.id, {first.id: first_answer.id, second.id: second_answer.id})
+
+        # Ustunlar (order, id) tartibida, ID tartibida emas
+        self.assertEqual(get_quiz_item_analysis(quiz.id).question_ids, [second.id, first.id])
+
+        # Yangi variant qo'shilishi tahlilni eskirtiradi
+        added = Answer.objects.create(question=first, text='C')
+        analysis = get_quiz_item_analysis(quiz.id)
+
+        self.assertEqual(analysis.option_ids[1], [first_answer.id, added.id])
+        np.testing.assert_allclose(analysis.option_rates[1], [1, 0])
+
+    def test_admin_detail_view(self):
+        admin = User.objects.create_superuser(phone_number='+998901234570', full_name='Admin', password='x')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        quiz = Quiz.objects.create(lesson=lesson, title='Test 1')
+        question = Question.objects.create(quiz=quiz, text='Savol')
+        correct = Answer.objects.create(question=question, text='A', is_correct=True)
+        submit_quiz_attempt(admin.id, quiz.id, {question.id: correct.id})
+
+        self.client.force_login(admin)
+        response = self.client.get(reverse('dashboard:quiz_detail', kwargs={'pk': quiz.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['analysed_attempts'], 1)
+        self.assertTrue(response.context['item_analysis'][0]['has_stats'])
+
+
+class RegradeQuizAttemptsTests(TestCase):
+    """Urinishlarni qayta baholash testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901234571', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        cls.quiz = Quiz.objects.create(lesson=lesson, title='Test 1', passing_score=50)
+        cls.q1 = Question.objects.create(quiz=cls.quiz, text='Savol 1', order=1)
+        cls.q2 = Question.objects.create(quiz=cls.quiz, text='Savol 2', order=2)
+        cls.a1 = Answer.objects.create(question=cls.q1, text='A', is_correct=True)
+        cls.b1 = Answer.objects.create(question=cls.q1, text='B')
+        cls.a2 = Answer.objects.create(question=cls.q2, text='A', is_correct=True)
+        cls.b2 = Answer.objects.create(question=cls.q2, text='B')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_regrade_after_key_change(self):
+        both_a = submit_quiz_attempt(self.student.id, self.quiz.id, {self.q1.id: self.a1.id, self.q2.id: self.a2.id})
+        both_b = submit_quiz_attempt(self.student.id, self.quiz.id, {self.q1.id: self.b1.id, self.q2.id: self.b2.id})
+        mixed = submit_quiz_attempt(self.student.id, self.quiz.id, {self.q1.id: self.b1.id, self.q2.id: self.a2.id})
+        self.assertEqual((both_a.score, both_b.score, mixed.score), (100, 0, 50))
+
+        set_correct_answer(self.q1.id, self.b1.id)
+        changed = regrade_quiz_attempts(self.quiz.id, chunk_size=2)
+
+        for attempt in (both_a, both_b, mixed):
+            attempt.refresh_from_db()
+        self.assertEqual(changed, 3)
+        self.assertEqual((both_a.score, both_b.score, mixed.score), (50, 50, 100))
+        self.assertTrue(all(attempt.is_passed for attempt in (both_a, both_b, mixed)))
+        self.assertTrue(both_b.answers.get(question=self.q1).is_correct)
+
+        # Kalit o'zgarmasa hech narsa yozilmaydi
+        self.assertEqual(regrade_quiz_attempts(self.quiz.id), 0)
+
+    def test_dashboard_trigger_does_not_block(self):
+        admin = User.objects.create_superuser(phone_number='+998901234572', full_name='Admin', password='x')
+        self.client.force_login(admin)
+        url = reverse('dashboard:quiz_regrade', kwargs={'pk': self.quiz.pk})
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(url)
+
+        self.assertRedirects(response, reverse('dashboard:quiz_detail', kwargs={'pk': self.quiz.pk}))
+        # Ish commit dan keyin fon oqimida boshlanadi
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(is_regrade_running(self.quiz.id))
+
+    def test_key_change_during_regrade_is_not_lost(self):
+        runs = []
+        restarted = []
+        finished = threading.Event()
+
+        def fake_regrade(quiz_id):
+            runs.append(quiz_id)
+            if len(runs) == 1:
+                # Birinchi ish davomida kalit yana o'zgardi
+                restarted.append(start_regrade(quiz_id))
+            else:
+                finished.set()
+
+        with mock.patch('apps.quizzes.regrade._run_regrade', fake_regrade):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(start_regrade(self.quiz.id))
+            self.assertTrue(finished.wait(5))
+
+        self.assertEqual(runs, [self.quiz.id, self.quiz.id])
+        self.assertEqual(restarted, [False])
+        for _ in range(100):
+            if not is_regrade_running(self.quiz.id):
+                break
+            time.sleep(0.01)
+        self.assertFalse(is_regrade_running(self.quiz.id))
+
+
+class QuizPayloadCacheTests(TestCase):
+    """Quiz payload keshi va aralashtirish testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901234573', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        cls.quiz = Quiz.objects.create(lesson=lesson, title='Test 1', shuffle_questions=True)
+        for i in range(5):
+            question = Question.objects.create(quiz=cls.quiz, text=f'Savol {i}', order=i)
+            for letter in 'ABCD':
+                Answer.objects.create(question=question, text=letter, is_correct=letter == 'A')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_payload_cached_until_edit(self):
+        payload = get_quiz_payload(self.quiz.id)
+        self.assertEqual(len(payload), 5)
+        self.assertNotIn('is_correct', payload[0]['answers'][0])
+
+        # Quiz bilan birga o'qilgan versiya berilsa - bazaga murojaat yo'q
+        version = get_quiz_version(self.quiz.id)
+        with self.assertNumQueries(0):
+            get_quiz_payload(self.quiz.id, version)
+
+        answer = Answer.objects.get(id=payload[0]['answers'][1]['id'])
+        answer.text = "Yangi matn"
+        answer.save()
+
+        self.assertEqual(get_quiz_payload(self.quiz.id)[0]['answers'][1]['text'], "Yangi matn")
+
+    def test_edit_is_seen_by_other_workers(self):
+        # Boshqa worker jarayoni: o'z keshi, tahrir haqida hech narsa olmaydi
+        other_worker_cache = LocMemCache('other-worker', {})
+        self.addCleanup(other_worker_cache.clear)
+        with mock.patch('apps.quizzes.selectors.cache', other_worker_cache):
+            get_quiz_payload(self.quiz.id)
+            get_quiz_answer_key(self.quiz.id)
+
+        question = Question.objects.get(quiz=self.quiz, order=0)
+        question.text = "Yangi savol"
+        question.save()
+        set_correct_answer(question.id, question.answers.get(text='B').id)
+
+        with mock.patch('apps.quizzes.selectors.cache', other_worker_cache):
+            self.assertEqual(get_quiz_payload(self.quiz.id)[0]['text'], "Yangi savol")
+            answer_key = get_quiz_answer_key(self.quiz.id)
+        self.assertEqual(answer_key[question.id], question.answers.get(text='B').id)
+
+    def test_saving_stale_quiz_keeps_version(self):
+        stale = Quiz.objects.get(id=self.quiz.id)
+        invalidate_quiz_content(self.quiz.id)
+        version = get_quiz_version(self.quiz.id)
+
+        stale.title = "Yangi nom"
+        stale.save()
+
+        self.assertEqual(get_quiz_version(self.quiz.id), version)
+
+    def test_shuffle_is_per_attempt(self):
+        payload = get_quiz_payload(self.quiz.id)
+        original = [question['id'] for question in payload]
+
+        first = shuffle_quiz_payload(payload, 'a')
+        self.assertEqual(first, shuffle_quiz_payload(payload, 'a'))
+        self.assertEqual(sorted(question['id'] for question in first), sorted(original))
+        # Umumiy payload o'zgarmaydi
+        self.assertEqual([question['id'] for question in payload], original)
+
+        orders = {
+            tuple(question['id'] for question in shuffle_quiz_payload(payload, str(seed)))
+            for seed in range(10)
+        }
+        self.assertGreater(len(orders), 1)
+
+    def test_start_view_uses_cache(self):
+        self.client.force_login(self.student)
+        url = reverse('quizzes:start', kwargs={'quiz_id': self.quiz.id})
+        self.client.get(url)
+
+        # sessiya (1) + user (1) + quiz (1) + urinishlar (1), savollar keshdan
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.context['questions']), 5)
+        self.assertContains(response, 'name="question_')
+
+
+class QuizAttemptCounterTests(TestCase):
+    """Urinishlar hisoblagichi testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901234574', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        cls.quiz = Quiz.objects.create(lesson=lesson, title='Test 1', max_attempts=2)
+        question = Question.objects.create(quiz=cls.quiz, text='Savol')
+        cls.answers = {question.id: Answer.objects.create(question=question, text='A').id}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_enforced_in_service(self):
+        first = submit_quiz_attempt(self.student.id, self.quiz.id, self.answers)
+        submit_quiz_attempt(self.student.id, self.quiz.id, self.answers)
+
+        with self.assertRaises(QuizAttemptLimitError):
+            submit_quiz_attempt(self.student.id, self.quiz.id, self.answers)
+        self.assertEqual(QuizAttempt.objects.filter(quiz=self.quiz).count(), 2)
+
+        # O'chirilgan urinish qaytariladi
+        first.delete()
+        self.assertEqual(QuizAttemptCounter.objects.get(user=self.student, quiz=self.quiz).attempts_count, 1)
+        submit_quiz_attempt(self.student.id, self.quiz.id, self.answers)
+
+
+class ConcurrentQuizSubmitTests(TransactionTestCase):
+    """Parallel topshirishlar max_attempts dan oshmasligi"""
+
+    THREADS = 8
+
+    def test_concurrent_submits(self):
+        student = User.objects.create_user(phone_number='+998901234575', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        quiz = Quiz.objects.create(lesson=lesson, title='Test 1', max_attempts=3)
+        question = Question.objects.create(quiz=quiz, text='Savol')
+        answers = {question.id: Answer.objects.create(question=question, text='A').id}
+
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def submit():
+            barrier.wait()
+            try:
+                # SQLite test bazasi (shared cache) qulfda kutmasdan xato beradi -
+                # mijoz kabi qayta urinamiz; PostgreSQL da UPDATE qulfda kutadi
+                for _ in range(200):
+                    try:
+                        submit_quiz_attempt(student.id, quiz.id, answers)
+                        results.append('ok')
+                        return
+                    except QuizAttemptLimitError:
+                        results.append('limit')
+                        return
+                    except OperationalError:
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count('ok'), quiz.max_attempts)
+        self.assertEqual(results.count('limit'), self.THREADS - quiz.max_attempts)
+        self.assertEqual(QuizAttempt.objects.filter(quiz=quiz).count(), quiz.max_attempts)
+        self.assertEqual(QuizAttemptCounter.objects.get(user=student, quiz=quiz).attempts_count, quiz.max_attempts)
+
+
+class QuestionBankTests(TestCase):
+    """Savollar banki rejimi testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(phone_number='+998901234576', full_name='Test Student')
+        lesson = Lesson.objects.create(title='Dars 1', order=1)
+        cls.quiz = Quiz.objects.create(lesson=lesson, title='Test 1', questions_per_attempt=3, passing_score=100)
+        cls.correct = {}
+        for i in range(10):
+            question = Question.objects.create(quiz=cls.quiz, text=f'Savol {i}', order=i)
+            cls.correct[question.id] = Answer.objects.create(question=question, text='A', is_correct=True).id
+            Answer.objects.create(question=question, text='B')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sample(self):
+        payload = get_quiz_payload(self.quiz.id)
+        sample = sample_quiz_payload(payload, 3, 'seed')
+
+        self.assertEqual(len({question['id'] for question in sample}), 3)
+        self.assertEqual(sample, sample_quiz_payload(payload, 3, 'seed'))
+        self.assertEqual(sample_quiz_payload(payload, 50, 'seed'), payload)
+
+    def test_grading_uses_presented_questions(self):
+        question_ids = list(self.correct)[:3]
+        attempt = submit_quiz_attempt(
+            self.student.id, self.quiz.id,
+            {question_id: self.correct[question_id] for question_id in question_ids},
+            question_ids=question_ids
+        )
+
+        self.assertEqual(attempt.score, 100)
+        self.assertTrue(attempt.is_passed)
+        self.assertEqual(set(attempt.answers.values_list('question_id', flat=True)), set(question_ids))
+
+    def test_start_and_submit(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('quizzes:start', kwargs={'quiz_id': self.quiz.id}))
+        questions = response.context['questions']
+        self.assertEqual(len(questions), 3)
+
+        data = {f"question_{question['id']}": self.correct[question['id']] for question in questions}
+        submit_url = reverse('quizzes:submit', kwargs={'quiz_id': self.quiz.id})
+
+        # Imzosiz yoki o'zgartirilgan to'plam qabul qilinmaydi
+        tampered = response.context['question_set_token'].replace(str(questions[0]['id']), '0', 1)
+        self.client.post(submit_url, {**data, 'questions_token': tampered})
+        self.assertFalse(QuizAttempt.objects.filter(quiz=self.quiz).exists())
+
+        self.client.post(submit_url, {**data, 'questions_token': response.context['question_set_token']})
+        attempt = QuizAttempt.objects.get(quiz=self.quiz)
+        self.assertEqual(attempt.score, 100)
+        self.assertEqual(attempt.answers.count(), 3)
+
+    def test_previous_attempt_token_is_rejected(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('quizzes:start', kwargs={'quiz_id': self.quiz.id}))
+        token = response.context['question_set_token']
+        questions = response.context['questions']
+        submit_url = reverse('quizzes:submit', kwargs={'quiz_id': self.quiz.id})
+
+        wrong = {f"question_{question['id']}": self.correct[question['id']] + 1 for question in questions}
+        self.client.post(submit_url, {**wrong, 'questions_token': token})
+        self.assertEqual(QuizAttempt.objects.get(quiz=self.quiz).score, 0)
+
+        # Ko'rilgan to'plam javoblari bilan keyingi urinishni topshirish
+        right = {f"question_{question['id']}": self.correct[question['id']] for question in questions}
+        self.client.post(submit_url, {**right, 'questions_token': token})
+        self.assertEqual(QuizAttempt.objects.filter(quiz=self.quiz).count(), 1)
+
+    def test_expired_question_set_token(self):
+        token = create_question_set_token(self.student.id, self.quiz.id, 1, list(self.correct)[:3])
+        later = timezone.now() + timedelta(seconds=settings.QUESTION_SET_TOKEN_MAX_AGE + 1)
+
+        self.assertEqual(
+            verify_question_set_token(token, self.student.id, self.quiz.id, 1, settings.QUESTION_SET_TOKEN_MAX_AGE),
+            list(self.correct)[:3]
+        )
+        with mock.patch('core.utils.timezone.now', return_value=later):
+            self.assertIsNone(
+                verify_question_set_token(token, self.student.id, self.quiz.id, 1, settings.QUESTION_SET_TOKEN_MAX_AGE)
+            )
+        self.assertIsNone(
+            verify_question_set_token(token, self.student.id, self.quiz.id, 2, settings.QUESTION_SET_TOKEN_MAX_AGE)
+        )
+
+    def test_item_statistics_ignore_unpresented(self):
+        correct = np.array([[1, 0], [0, 1]], dtype=float)
+        choices = np.array([[0, -1], [-1, 0]])
+        presented = np.array([[True, False], [False, True]])
+
+        stats = compute_item_statistics(correct, choices, 2, presented)
+
+        np.testing.assert_allclose(stats['difficulty'], [1, 1])
+        np.testing.assert_allclose(stats['no_answer_rates'], [0, 0])
+        self.assertIsNone(stats['cronbach_alpha'])
+
+
+class TrickleStream(io.StringIO):
+    """Har safar bir necha belgidan qaytaradigan oqim (bo'lib o'qishni tekshirish uchun)"""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+class QuizTransferTests(TestCase):
+    """Savollarni import/eksport qilish testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quiz = Quiz.objects.create(lesson=Lesson.objects.create(title='Dars 1', order=1), title='Test 1')
+        cls.target = Quiz.objects.create(lesson=Lesson.objects.create(title='Dars 2', order=2), title='Test 2')
+
+    def setUp(self):
+        cache.clear()
+
+    def bank(self, count: int) -> list[dict]:
+        return [
+            {
+                'text': f'Savol {i} "qo\'shtirnoq", vergul',
+                'order': i,
+                'answers': [{'text': f'Javob {j}', 'is_correct': j == i % 4} for j in range(4)],
+            }
+            for i in range(1, count + 1)
+        ]
+
+    def test_bulk_import_query_budget(self):
+        stream = io.StringIO(json.dumps(self.bank(200)))
+
+        # max(order) + savollar va javoblar INSERT lari (baza parametr limiti bo'yicha
+        # bo'linishi mumkin) - savollar soniga proporsional emas
+        with CaptureQueriesContext(connection) as ctx:
+            created = import_quiz_questions(self.quiz.id, stream, 'json')
+
+        self.assertLess(len(ctx.captured_queries), 15)
+
+        self.assertEqual(created, 200)
+        self.assertEqual(Answer.objects.filter(question__quiz=self.quiz).count(), 800)
+
+    def test_round_trip(self):
+        import_quiz_questions(self.quiz.id, TrickleStream(json.dumps(self.bank(5))), 'json')
+
+        for file_format in ('json', 'csv'):
+            exported = ''.join(export_quiz_questions(self.quiz.id, file_format))
+            Question.objects.filter(quiz=self.target).delete()
+            import_quiz_questions(self.target.id, io.StringIO(exported, newline=''), file_format)
+
+            self.assertEqual(
+                list(Question.objects.filter(quiz=self.target).values_list('text', 'order')),
+                list(Question.objects.filter(quiz=self.quiz).values_list('text', 'order'))
+            )
+            self.assertEqual(
+                list(Answer.objects.filter(question__quiz=self.target, is_correct=True).values_list('text', flat=True)),
+                list(Answer.objects.filter(question__quiz=self.quiz, is_correct=True).values_list('text', flat=True))
+            )
+
+    def test_invalid_file_creates_nothing(self):
+        bank = self.bank(600)
+        bank[550]['answers'][0]['is_correct'] = True
+        bank[550]['answers'][1]['is_correct'] = True
+        bank[599]['text'] = ''
+
+        with self.assertRaises(QuizImportError) as ctx:
+            import_quiz_questions(self.quiz.id, io.StringIO(json.dumps(bank)), 'json')
+
+        self.assertEqual(len(ctx.exception.errors), 2)
+        self.assertTrue(ctx.exception.errors[0].startswith('551-savol'))
+        self.assertFalse(Question.objects.filter(quiz=self.quiz).exists())
+
+    def test_dashboard_import_and_export(self):
+        admin = User.objects.create_superuser(phone_number='+998901234577', full_name='Admin', password='x')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile(
+            'bank.csv',
+            "question,order,correct,answer_1,answer_2\nIkki plus ikki?,1,2,3,4\n".encode('utf-8-sig')
+        )
+
+        self.client.post(reverse('dashboard:quiz_import', kwargs={'pk': self.quiz.pk}), {'file': csv_file})
+        question = Question.objects.get(quiz=self.quiz)
+        self.assertEqual(question.answers.get(is_correct=True).text, '4')
+
+        response = self.client.get(reverse('dashboard:quiz_export', kwargs={'pk': self.quiz.pk}) + '?format=json')
+        self.assertTrue(response.streaming)
+        exported = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(exported[0]['text'], 'Ikki plus ikki?')
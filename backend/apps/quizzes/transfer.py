@@ -0,0 +1,289 @@
+"""
+Quiz savollarini import/eksport qilish (JSON va CSV)
+
+Fayl oqim bilan o'qiladi: savollar birma-bir tekshiriladi va
+IMPORT_BATCH_SIZE tadan bulk_create bilan yoziladi. Hammasi bitta
+tranzaksiyada - bironta xato bo'lsa hech narsa saqlanmaydi. Eksport
+generator qaytaradi (StreamingHttpResponse va manage.py uchun).
+
+JSON - savollar massivi:
+    [{"text": "...", "order": 1, "answers": [{"text": "...", "is_correct": true}, ...]}, ...]
+
+CSV - har bir qator bitta savol, correct - to'g'ri javob raqami (1 dan):
+    question,order,correct,answer_1,answer_2,answer_3,answer_4
+"""
+
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+
+from core.exceptions import QuizImportError
+from .models import Question, Answer
+from .services import invalidate_quiz_content
+
+FORMATS = ('json', 'csv')
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 20
+JSON_READ_SIZE = 64 * 1024
+
+CSV_FIXED_COLUMNS = ['question', 'order', 'correct']
+
+
+def detect_format(filename: str) -> str | None:
+    """Fayl kengaytmasi bo'yicha format"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in FORMATS else None
+
+
+# ============== IMPORT ==============
+
+def _iter_json_array(stream):
+    """JSON massiv elementlarini faylni to'liq o'qimasdan ketma-ket qaytarish"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Bo'shliq va ajratuvchilarni o'tkazib yuborish
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("JSON massiv ([...]) bo'lishi kerak")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Obyekt bufer oxirida tugasa, davomi bo'lishi mumkin (masalan son)
+                if end < len(buffer) or eof:
+                    yield item
+                    position = end
+                    continue
+
+        if eof:
+            raise ValueError("JSON massiv yopilmagan")
+
+        chunk = stream.read(JSON_READ_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def _iter_json_questions(stream):
+    """(joy, matn, order, [(javob, to'g'ri)], xatolar) ketma-ketligi"""
+    for index, item in enumerate(_iter_json_array(stream), start=1):
+        position = f"{index}-savol"
+
+        if not isinstance(item, dict):
+            yield position, None, None, [], ["obyekt bo'lishi kerak"]
+            continue
+
+        answers = item.get('answers')
+        if not isinstance(answers, list) or not all(isinstance(answer, dict) for answer in answers):
+            yield position, item.get('text'), item.get('order'), [], ["answers obyektlar ro'yxati bo'lishi kerak"]
+            continue
+
+        yield position, item.get('text'), item.get('order'), [
+            (answer.get('text'), answer.get('is_correct') is True) for answer in answers
+        ], []
+
+
+def _iter_csv_questions(stream):
+    """(joy, matn, order, [(javob, to'g'ri)], xatolar) ketma-ketligi"""
+    reader = csv.DictReader(stream)
+    missing = [column for column in CSV_FIXED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV sarlavhasida ustunlar yo'q: {', '.join(missing)}")
+
+    answer_columns = [column for column in reader.fieldnames if column.startswith('answer_')]
+
+    for row in reader:
+        position = f"{reader.line_num}-qator"
+        answers = [
+            (row[column], number)
+            for number, column in enumerate(answer_columns, start=1)
+            if (row[column] or '').strip()
+        ]
+
+        try:
+            correct = int(row['correct'])
+        except (TypeError, ValueError):
+            yield position, row['question'], row['order'], [], ["correct javob raqami bo'lishi kerak"]
+            continue
+
+        yield position, row['question'], row['order'], [
+            (answer_text, number == correct) for answer_text, number in answers
+        ], []
+
+
+def _validate_question(text, order, answers) -> list[str]:
+    errors = []
+    if not isinstance(text, str) or not text.strip():
+        errors.append("savol matni bo'sh")
+
+    if order not in (None, ''):
+        try:
+            if int(order) < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors.append("order manfiy bo'lmagan butun son bo'lishi kerak")
+
+    if len(answers) < 2:
+        errors.append("kamida 2 ta javob kerak")
+    if any(not isinstance(answer_text, str) or not answer_text.strip() for answer_text, _ in answers):
+        errors.append("javob matni bo'sh")
+    elif any(len(answer_text.strip()) > 500 for answer_text, _ in answers):
+        errors.append("javob matni 500 belgidan uzun")
+    if sum(is_correct for _, is_correct in answers) != 1:
+        errors.append("aynan bitta to'g'ri javob bo'lishi kerak")
+
+    return errors
+
+
+def _write_batch(quiz_id: int, batch: list) -> None:
+    questions = Question.objects.bulk_create([
+        Question(quiz_id=quiz_id, text=text, order=order)
+        for text, order, _ in batch
+    ])
+    Answer.objects.bulk_create([
+        Answer(question=question, text=answer_text.strip(), is_correct=is_correct)
+        for question, (_, _, answers) in zip(questions, batch)
+        for answer_text, is_correct in answers
+    ])
+
+
+def import_quiz_questions(quiz_id: int, stream, file_format: str) -> int:
+    """
+    Savollar va javoblarni fayldan import qilish (mavjud savollarga qo'shiladi)
+
+    Args:
+        stream: matnli fayl obyekti
+        file_format: 'json' yoki 'csv'
+
+    Returns: qo'shilgan savollar soni
+    Raises: QuizImportError - fayl yaroqsiz (hech narsa saqlanmaydi)
+    """
+    if file_format not in FORMATS:
+        raise QuizImportError(errors=[f"Noma'lum format: {file_format}"])
+
+    items = _iter_json_questions(stream) if file_format == 'json' else _iter_csv_questions(stream)
+
+    errors = []
+    created = 0
+    batch = []
+
+    with transaction.atomic():
+        # order berilmagan savollar mavjudlaridan keyin qo'yiladi
+        next_order = (Question.objects.filter(quiz_id=quiz_id).aggregate(last=Max('order'))['last'] or 0) + 1
+
+        try:
+            for position, text, order, answers, item_errors in items:
+                item_errors = item_errors or _validate_question(text, order, answers)
+                if item_errors:
+                    errors.extend(f"{position}: {error}" for error in item_errors)
+                    continue
+
+                if order in (None, ''):
+                    order = next_order
+                order = int(order)
+                next_order = max(next_order, order + 1)
+
+                # Xato topilgandan keyin faqat tekshirishda davom etamiz
+                if not errors:
+                    batch.append((text.strip(), order, answers))
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        _write_batch(quiz_id, batch)
+                        created += len(batch)
+                        batch = []
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            errors.append(f"Faylni o'qib bo'lmadi: {e}")
+
+        if not errors and not created and not batch:
+            errors.append("Faylda savollar yo'q")
+
+        # Istisno tranzaksiyani bekor qiladi - yozilgan bo'laklar ham qaytariladi
+        if errors:
+            raise QuizImportError(errors=errors[:MAX_REPORTED_ERRORS])
+
+        if batch:
+            _write_batch(quiz_id, batch)
+            created += len(batch)
+
+        # bulk_create signal yubormaydi - versiyani shu tranzaksiyada oshirish
+        invalidate_quiz_content(quiz_id)
+
+    return created
+
+
+# ============== EXPORT ==============
+
+def _iter_questions(quiz_id: int):
+    return Question.objects.filter(
+        quiz_id=quiz_id
+    ).order_by('order', 'id').prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.order_by('id'))
+    ).iterator(chunk_size=IMPORT_BATCH_SIZE)
+
+
+def _export_json(quiz_id: int):
+    yield '['
+    separator = '\n'
+    for question in _iter_questions(quiz_id):
+        item = {
+            'text': question.text,
+            'order': question.order,
+            'answers': [
+                {'text': answer.text, 'is_correct': answer.is_correct}
+                for answer in question.answers.all()
+            ],
+        }
+        yield separator + json.dumps(item, ensure_ascii=False)
+        separator = ',\n'
+    yield '\n]\n'
+
+
+def _export_csv(quiz_id: int):
+    answers_count = Question.objects.filter(quiz_id=quiz_id).annotate(
+        answers_count=Count('answers')
+    ).aggregate(most=Max('answers_count'))['most'] or 0
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_FIXED_COLUMNS + [f'answer_{number}' for number in range(1, answers_count + 1)])
+    yield flush()
+
+    for question in _iter_questions(quiz_id):
+        answers = list(question.answers.all())
+        correct = next((number for number, answer in enumerate(answers, start=1) if answer.is_correct), '')
+        writer.writerow([question.text, question.order, correct] + [answer.text for answer in answers])
+        yield flush()
+
+
+def export_quiz_questions(quiz_id: int, file_format: str):
+    """Savollarni eksport qilish - matn bo'laklari generatori"""
+    if file_format == 'csv':
+        return _export_csv(quiz_id)
+    return _export_json(quiz_id)
@@ -1,17 +1,19 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count
 
+from core.exceptions import QuizAttemptLimitError
+from core.utils import create_question_set_token, verify_question_set_token
 from .models import Quiz, QuizAttempt
 from .selectors import (
     get_quiz_by_id,
-    get_quiz_with_questions,
-    get_user_quiz_attempts,
-    can_user_attempt_quiz,
-    get_user_attempt_count,
-    has_user_passed_quiz,
-    get_best_attempt
+    get_quiz_payload,
+    get_user_quiz_stats,
+    sample_quiz_payload,
+    shuffle_quiz_payload
 )
 from .services import submit_quiz_attempt
 
@@ -34,26 +36,25 @@ class QuizDetailView(StudentRequiredMixin, View):
     template_name = 'student/quizzes/detail.html'
 
     def get(self, request, quiz_id):
-        quiz = get_object_or_404(Quiz.objects.select_related('lesson'), id=quiz_id)
-
-        # User urinishlari
-        attempts = get_user_quiz_attempts(request.user.id, quiz_id)
-        attempts_count = attempts.count()
-        best_attempt = get_best_attempt(request.user.id, quiz_id)
-        has_passed = has_user_passed_quiz(request.user.id, quiz_id)
+        quiz = get_object_or_404(
+            Quiz.objects.select_related('lesson').annotate(questions_count=Count('questions')),
+            id=quiz_id
+        )
 
-        # Test boshlash mumkinmi
-        can_attempt, reason = can_user_attempt_quiz(request.user.id, quiz_id)
+        # User urinishlari va test boshlash mumkinmi (bitta so'rov)
+        stats = get_user_quiz_stats(request.user.id, quiz)
+        can_attempt, reason = stats.eligibility
 
         context = {
             'quiz': quiz,
-            'attempts': attempts,
-            'attempts_count': attempts_count,
-            'best_attempt': best_attempt,
-            'has_passed': has_passed,
+            'questions_count': quiz.get_attempt_questions_count(quiz.questions_count),
+            'attempts': stats.attempts,
+            'attempts_count': stats.attempts_count,
+            'best_attempt': stats.best_attempt,
+            'has_passed': stats.has_passed,
             'can_attempt': can_attempt,
             'attempt_reason': reason,
-            'remaining_attempts': quiz.max_attempts - attempts_count
+            'remaining_attempts': stats.remaining_attempts
         }
 
         return render(request, self.template_name, context)
@@ -64,25 +65,42 @@ class QuizStartView(StudentRequiredMixin, View):
     template_name = 'student/quizzes/start.html'
 
     def get(self, request, quiz_id):
-        quiz = get_quiz_with_questions(quiz_id)
+        quiz = get_quiz_by_id(quiz_id)
 
         if not quiz:
             messages.error(request, "Test topilmadi")
             return redirect('student:dashboard')
 
         # Tekshirish
-        can_attempt, reason = can_user_attempt_quiz(request.user.id, quiz_id)
+        stats = get_user_quiz_stats(request.user.id, quiz)
+        can_attempt, reason = stats.eligibility
 
         if not can_attempt:
             messages.error(request, reason)
             return redirect('quizzes:detail', quiz_id=quiz_id)
 
-        attempts_count = get_user_attempt_count(request.user.id, quiz_id)
+        attempt_number = stats.attempts_count + 1
+
+        # Savollar versiya bo'yicha keshdan; bankdan tanlash va aralashtirish
+        # har bir urinish uchun alohida (sahifa yangilansa ham bir xil)
+        seed = f"{quiz.id}:{request.user.id}:{attempt_number}"
+        questions = get_quiz_payload(quiz.id, quiz.content_version)
+        question_set_token = None
+
+        if quiz.questions_per_attempt:
+            questions = sample_quiz_payload(questions, quiz.questions_per_attempt, seed)
+            question_set_token = create_question_set_token(
+                request.user.id, quiz.id, attempt_number, [question['id'] for question in questions]
+            )
+
+        if quiz.shuffle_questions:
+            questions = shuffle_quiz_payload(questions, seed)
 
         context = {
             'quiz': quiz,
-            'questions': quiz.questions.all(),
-            'attempt_number': attempts_count + 1
+            'questions': questions,
+            'question_set_token': question_set_token,
+            'attempt_number': attempt_number
         }
 
         return render(request, self.template_name, context)
@@ -99,7 +117,8 @@ class QuizSubmitView(StudentRequiredMixin, View):
             return redirect('student:dashboard')
 
         # Tekshirish
-        can_attempt, reason = can_user_attempt_quiz(request.user.id, quiz_id)
+        stats = get_user_quiz_stats(request.user.id, quiz)
+        can_attempt, reason = stats.eligibility
 
         if not can_attempt:
             messages.error(request, reason)
@@ -116,12 +135,32 @@ class QuizSubmitView(StudentRequiredMixin, View):
             messages.error(request, "Kamida bitta savolga javob bering")
             return redirect('quizzes:start', quiz_id=quiz_id)
 
-        # Topshirish
-        attempt = submit_quiz_attempt(
-            user_id=request.user.id,
-            quiz_id=quiz_id,
-            answers=answers
-        )
+        # Bank rejimi: urinishga berilgan savollar imzolangan tokendan olinadi.
+        # Token shu urinish raqamiga bog'langan - oldingi urinish to'plami qayta ishlatilmaydi
+        question_ids = None
+        if quiz.questions_per_attempt:
+            question_ids = verify_question_set_token(
+                request.POST.get('questions_token', ''),
+                request.user.id,
+                quiz.id,
+                stats.attempts_count + 1,
+                settings.QUESTION_SET_TOKEN_MAX_AGE
+            )
+            if question_ids is None:
+                messages.error(request, "Savollar to'plami yaroqsiz, testni qaytadan boshlang")
+                return redirect('quizzes:start', quiz_id=quiz_id)
+
+        # Topshirish (limit tranzaksiya ichida hisoblagich bilan qayta tekshiriladi)
+        try:
+            attempt = submit_quiz_attempt(
+                user_id=request.user.id,
+                quiz_id=quiz_id,
+                answers=answers,
+                question_ids=question_ids
+            )
+        except QuizAttemptLimitError as e:
+            messages.error(request, e.message)
+            return redirect('quizzes:detail', quiz_id=quiz_id)
 
         return redirect('quizzes:result', quiz_id=quiz_id, attempt_id=attempt.id)
 
@@ -148,7 +187,7 @@ class QuizResultView(StudentRequiredMixin, View):
             'quiz': quiz,
             'attempt': attempt,
             'can_proceed': can_proceed,
-            'remaining_attempts': quiz.max_attempts - get_user_attempt_count(request.user.id, quiz_id),
+            'remaining_attempts': get_user_quiz_stats(request.user.id, quiz).remaining_attempts,
             'stroke_dasharray': stroke_dasharray
         }
 
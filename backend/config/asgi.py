@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Video heartbeatlar middleware stekini chetlab o'tadi
+from apps.progress.heartbeat import HeartbeatASGIMiddleware  # noqa: E402
+
+application = HeartbeatASGIMiddleware(django_application)
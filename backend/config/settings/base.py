@@ -133,8 +133,32 @@ TELEGRAM_BOT_USERNAME = env('TELEGRAM_BOT_USERNAME', default='your_bot')
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 7  # 1 week
 
+# Progress heartbeat write-behind buferi
+PROGRESS_WRITE_BEHIND = env.bool('PROGRESS_WRITE_BEHIND', default=False)
+PROGRESS_FLUSH_INTERVAL = env.int('PROGRESS_FLUSH_INTERVAL', default=30)  # sekund
+
+# Middleware'siz heartbeat endpointi (config/wsgi.py, config/asgi.py)
+HEARTBEAT_PATH = '/heartbeat/'
+HEARTBEAT_TOKEN_MAX_AGE = 60 * 60 * 4  # 4 soat
+
+# Savollar banki: urinishga berilgan to'plam tokeni (core.utils.create_question_set_token)
+QUESTION_SET_TOKEN_MAX_AGE = 60 * 60 * 3  # 3 soat
+
+# Integratsiyalar HTTP klientlari (integrations/http.py)
+INTEGRATION_HTTP_TIMEOUT = env.float('INTEGRATION_HTTP_TIMEOUT', default=30.0)
+INTEGRATION_HTTP_MAX_CONNECTIONS = env.int('INTEGRATION_HTTP_MAX_CONNECTIONS', default=20)
+INTEGRATION_HTTP_MAX_KEEPALIVE_CONNECTIONS = env.int('INTEGRATION_HTTP_MAX_KEEPALIVE_CONNECTIONS', default=10)
+INTEGRATION_HTTP_KEEPALIVE_EXPIRY = env.float('INTEGRATION_HTTP_KEEPALIVE_EXPIRY', default=30.0)
+INTEGRATION_HTTP2 = env.bool('INTEGRATION_HTTP2', default=True)  # h2 paketi o'rnatilgan bo'lsa
+INTEGRATION_METRICS_TOKEN = env('INTEGRATION_METRICS_TOKEN', default='')  # /dashboard/integrations/metrics/ uchun
+
 # Kinescope
 KINESCOPE_API_KEY = env('KINESCOPE_API_KEY', default='')
 
 # Notion
+# Dars kontenti nusxalari cron orqali sinxronlanadi: */15 * * * * manage.py sync_notion
+# Fon vazifalari qulflari (core.background) cache da - bir nechta worker jarayonida
+# umumiy cache (Redis/Memcached) kerak, LocMemCache faqat bitta jarayon ichida ishlaydi
 NOTION_API_KEY = env('NOTION_API_KEY', default='')
+NOTION_RATE_LIMIT = env.float('NOTION_RATE_LIMIT', default=3)  # so'rov/s, har bir worker uchun (Notion limiti ~3)
+NOTION_FETCH_CONCURRENCY = env.int('NOTION_FETCH_CONCURRENCY', default=4)  # bir vaqtdagi blok so'rovlari
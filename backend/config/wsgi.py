@@ -13,4 +13,9 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_wsgi_application()
+django_application = get_wsgi_application()
+
+# Video heartbeatlar middleware stekini chetlab o'tadi
+from apps.progress.heartbeat import HeartbeatWSGIMiddleware  # noqa: E402
+
+application = HeartbeatWSGIMiddleware(django_application)
@@ -0,0 +1,83 @@
+"""
+Cache qulfi bilan himoyalangan fon oqimi vazifalari
+
+Bir xil qulf kalitli vazifa bir vaqtda faqat bitta oqimda ishlaydi. Vazifa
+ishlayotgan paytda kelgan so'rov yo'qolmaydi: u "kutilmoqda" belgisini
+qo'yadi va ishlayotgan oqim tugagach vazifani yana bir marta bajaradi
+(bir nechta so'rov bitta qayta ishga birlashadi). Belgi commit bo'lgandan
+keyin qo'yiladi, shuning uchun qayta ish o'zgarishlarni albatta ko'radi.
+
+Qulf qisqa muddatli va ishlayotgan oqim uni muntazam yangilab turadi -
+jarayon qulab tushsa qulf BACKGROUND_LOCK_TTL ichida o'zi bo'shaydi.
+
+Qulflar cache orqali: bir nechta worker jarayonlarida umumiy cache
+(Redis/Memcached) bo'lishi kerak, LocMemCache faqat bitta jarayon ichida ishlaydi.
+"""
+
+import logging
+import threading
+from typing import Callable
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_LOCK_TTL = 60
+
+
+def get_pending_key(lock_key: str) -> str:
+    return f"{lock_key}_pending"
+
+
+def is_background_task_running(lock_key: str) -> bool:
+    return cache.get(lock_key) is not None
+
+
+def _keep_lock(lock_key: str, done: threading.Event) -> None:
+    """Vazifa tugaguncha qulf muddatini uzaytirish"""
+    while not done.wait(BACKGROUND_LOCK_TTL / 3):
+        cache.touch(lock_key, BACKGROUND_LOCK_TTL)
+
+
+def _run_locked(lock_key: str, target: Callable, args: tuple) -> None:
+    pending_key = get_pending_key(lock_key)
+    done = threading.Event()
+    threading.Thread(target=_keep_lock, args=(lock_key, done), daemon=True).start()
+
+    try:
+        while True:
+            cache.delete(pending_key)
+            try:
+                target(*args)
+            except Exception:
+                logger.exception("Fon vazifasida xatolik: %s", lock_key)
+
+            if cache.get(pending_key) is not None:
+                continue
+
+            cache.delete(lock_key)
+            # Qulf bo'shagunga qadar kelgan so'rov qulfni ololmagan - uni shu oqim bajaradi
+            if cache.get(pending_key) is None or not cache.add(lock_key, 1, BACKGROUND_LOCK_TTL):
+                break
+    finally:
+        done.set()
+        # Fon oqimining o'z ulanishi - so'rov sikli yopmaydi
+        connection.close()
+
+
+def _request_run(lock_key: str, target: Callable, args: tuple) -> None:
+    # Belgi muddatsiz: uzoq ish davomida yo'qolmasligi kerak
+    cache.set(get_pending_key(lock_key), 1, None)
+    if cache.add(lock_key, 1, BACKGROUND_LOCK_TTL):
+        threading.Thread(target=_run_locked, args=(lock_key, target, args), daemon=True).start()
+
+
+def run_in_background(lock_key: str, target: Callable, *args) -> bool:
+    """
+    target(*args) ni commit dan keyin fon oqimida bajarish (so'rovni bloklamaydi)
+    Returns: False - vazifa allaqachon ishlayapti, u tugagach yana bir marta bajariladi
+    """
+    running = is_background_task_running(lock_key)
+    transaction.on_commit(lambda: _request_run(lock_key, target, args))
+    return not running
@@ -35,3 +35,15 @@ class LessonLockedError(BaseAPIException):
     def __init__(self, message: str = "Bu dars hali sizga ochilmagan"):
         super().__init__(message, code="lesson_locked")
 
+
+class QuizAttemptLimitError(BaseAPIException):
+    """Urinishlar soni tugagan"""
+    def __init__(self, message: str = "Maksimal urinishlar soni tugadi"):
+        super().__init__(message, code="quiz_attempt_limit")
+
+
+class QuizImportError(BaseAPIException):
+    """Import fayli yaroqsiz"""
+    def __init__(self, message: str = "Import fayli yaroqsiz", errors: list[str] | None = None):
+        self.errors = errors or []
+        super().__init__(message, code="quiz_import_invalid")
@@ -68,6 +68,121 @@ def verify_deep_link_token(token: str, max_age_seconds: int = 300) -> int | None
         return None
 
 
+def create_heartbeat_token(user_id: int, lesson_id: int) -> str:
+    """
+    Video heartbeat uchun qisqa muddatli token (sessiyasiz endpoint uchun)
+    Token = user_id + lesson_id + timestamp + signature
+    """
+    timestamp = int(timezone.now().timestamp())
+    data = f"heartbeat:{user_id}:{lesson_id}:{timestamp}"
+
+    signature = hmac.new(
+        settings.SECRET_KEY.encode(),
+        data.encode(),
+        hashlib.sha256
+    ).hexdigest()[:32]
+
+    return f"{user_id}_{lesson_id}_{timestamp}_{signature}"
+
+
+def verify_heartbeat_token(token: str, max_age_seconds: int) -> tuple[int, int] | None:
+    """
+    Heartbeat tokenni tekshirish
+    Returns: (user_id, lesson_id) yoki None
+    """
+    try:
+        parts = token.split('_')
+        if len(parts) != 4:
+            return None
+
+        user_id, lesson_id, timestamp, signature = parts
+        user_id = int(user_id)
+        lesson_id = int(lesson_id)
+        timestamp = int(timestamp)
+
+        # Vaqtni tekshirish
+        current_time = int(timezone.now().timestamp())
+        if current_time - timestamp > max_age_seconds:
+            return None
+
+        # Signature tekshirish
+        data = f"heartbeat:{user_id}:{lesson_id}:{timestamp}"
+        expected_signature = hmac.new(
+            settings.SECRET_KEY.encode(),
+            data.encode(),
+            hashlib.sha256
+        ).hexdigest()[:32]
+
+        if not hmac.compare_digest(signature, expected_signature):
+            return None
+
+        return user_id, lesson_id
+    except (ValueError, AttributeError):
+        return None
+
+
+def create_question_set_token(user_id: int, quiz_id: int, attempt_number: int, question_ids: list[int]) -> str:
+    """
+    Urinish uchun tanlangan savollar to'plami tokeni (quiz formasida yashirin maydon)
+    Token = user_id + quiz_id + urinish raqami + timestamp + savol ID lari + signature
+    """
+    timestamp = int(timezone.now().timestamp())
+    ids = '-'.join(str(question_id) for question_id in question_ids)
+    data = f"question_set:{user_id}:{quiz_id}:{attempt_number}:{timestamp}:{ids}"
+
+    signature = hmac.new(
+        settings.SECRET_KEY.encode(),
+        data.encode(),
+        hashlib.sha256
+    ).hexdigest()[:32]
+
+    return f"{user_id}_{quiz_id}_{attempt_number}_{timestamp}_{ids}_{signature}"
+
+
+def verify_question_set_token(
+        token: str,
+        user_id: int,
+        quiz_id: int,
+        attempt_number: int,
+        max_age_seconds: int
+) -> list[int] | None:
+    """
+    Savollar to'plami tokenini tekshirish
+    Boshqa user, quiz yoki urinish (oldingi urinishda ko'rilgan to'plam) tokeni
+    va muddati o'tgan token qabul qilinmaydi
+    Returns: savol ID lari yoki None
+    """
+    try:
+        parts = token.split('_')
+        if len(parts) != 6:
+            return None
+
+        token_user_id, token_quiz_id, token_attempt, timestamp, ids, signature = parts
+        if (int(token_user_id), int(token_quiz_id), int(token_attempt)) != (user_id, quiz_id, attempt_number):
+            return None
+
+        # Vaqtni tekshirish
+        timestamp = int(timestamp)
+        current_time = int(timezone.now().timestamp())
+        if current_time - timestamp > max_age_seconds:
+            return None
+
+        # Signature tekshirish
+        data = f"question_set:{user_id}:{quiz_id}:{attempt_number}:{timestamp}:{ids}"
+        expected_signature = hmac.new(
+            settings.SECRET_KEY.encode(),
+            data.encode(),
+            hashlib.sha256
+        ).hexdigest()[:32]
+
+        if not hmac.compare_digest(signature, expected_signature):
+            return None
+
+        return [int(question_id) for question_id in ids.split('-')] if ids else []
+    except (ValueError, AttributeError):
+        return None
+
+
 def mask_phone_number(phone: str) -> str:
     """Telefon raqamni maskalash: +998901234567 -> +998***4567"""
     if len(phone) < 8:
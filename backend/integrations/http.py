@@ -0,0 +1,152 @@
+"""
+Integratsiyalar uchun umumiy HTTP klientlar
+
+Har bir integratsiya (Notion, Kinescope) bitta uzoq yashovchi PooledHTTPClient
+oladi: sinxron httpx.Client va asinxron httpx.AsyncClient bitta
+konfiguratsiyadan quriladi, ulanishlar keep-alive bilan qayta ishlatiladi
+(har so'rovda yangi TCP+TLS handshake yo'q). h2 paketi o'rnatilgan bo'lsa
+HTTP/2 yoqiladi.
+
+Asinxron klient ulanishlari event loop ga bog'langan, shuning uchun u
+jarayon bo'yicha bitta fon event loop oqimida yashaydi; sinxron koddan
+PooledHTTPClient.run() orqali chaqiriladi.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from dataclasses import dataclass, field
+
+import httpx
+from django.conf import settings
+
+
+def is_http2_available() -> bool:
+    return importlib.util.find_spec('h2') is not None
+
+
+@dataclass(frozen=True)
+class HTTPClientConfig:
+    """Sinxron va asinxron klient uchun umumiy sozlamalar"""
+    base_url: str
+    headers: dict = field(default_factory=dict)
+    timeout: float = 30.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+    @classmethod
+    def from_settings(cls, base_url: str, headers: dict, **overrides) -> 'HTTPClientConfig':
+        """Pool sozlamalari settings.INTEGRATION_HTTP_* dan"""
+        options = {
+            'timeout': getattr(settings, 'INTEGRATION_HTTP_TIMEOUT', cls.timeout),
+            'max_connections': getattr(settings, 'INTEGRATION_HTTP_MAX_CONNECTIONS', cls.max_connections),
+            'max_keepalive_connections': getattr(
+                settings, 'INTEGRATION_HTTP_MAX_KEEPALIVE_CONNECTIONS', cls.max_keepalive_connections
+            ),
+            'keepalive_expiry': getattr(settings, 'INTEGRATION_HTTP_KEEPALIVE_EXPIRY', cls.keepalive_expiry),
+            'http2': getattr(settings, 'INTEGRATION_HTTP2', cls.http2),
+        }
+        options.update(overrides)
+        return cls(base_url=base_url, headers=headers, **options)
+
+    def client_kwargs(self) -> dict:
+        return {
+            'base_url': self.base_url,
+            'headers': self.headers,
+            'timeout': self.timeout,
+            'limits': httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            'http2': self.http2 and is_http2_available(),
+        }
+
+
+class _BackgroundLoop:
+    """Jarayon uchun bitta fon event loop (asinxron klientlar shu yerda yashaydi)"""
+
+    def __init__(self):
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # fork dan keyin (gunicorn --preload) ota jarayon oqimi bolada yo'q
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(target=self._loop.run_forever, daemon=True, name='integrations-loop').start()
+            return self._loop
+
+
+background_loop = _BackgroundLoop()
+
+
+class PooledHTTPClient:
+    """Bitta konfiguratsiyali sinxron/asinxron httpx klientlar jufti (dangasa yaratiladi)"""
+
+    def __init__(
+            self,
+            config: HTTPClientConfig,
+            transport: httpx.BaseTransport | None = None,
+            async_transport: httpx.AsyncBaseTransport | None = None
+    ):
+        self.config = config
+        self._transport = transport
+        self._async_transport = async_transport
+        self._sync_client = None
+        self._async_client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _check_fork(self) -> None:
+        # Ota jarayondan meros qolgan soketlarni ishlatmaslik
+        if self._pid != os.getpid():
+            self._sync_client = None
+            self._async_client = None
+            self._pid = os.getpid()
+
+    @property
+    def sync(self) -> httpx.Client:
+        """Sinxron klient (oqimlar orasida xavfsiz)"""
+        with self._lock:
+            self._check_fork()
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(transport=self._transport, **self.config.client_kwargs())
+            return self._sync_client
+
+    def get_async(self) -> httpx.AsyncClient:
+        """Asinxron klient - faqat fon event loop ichida (run() orqali) ishlatiladi"""
+        with self._lock:
+            self._check_fork()
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    transport=self._async_transport, **self.config.client_kwargs()
+                )
+            return self._async_client
+
+    def run(self, fn):
+        """
+        async fn(client) ni fon event loop da bajarib, natijasini qaytarish
+        Sinxron koddan (view, management command, fon oqim) chaqiriladi
+        """
+        async def call():
+            return await fn(self.get_async())
+
+        return asyncio.run_coroutine_threadsafe(call(), background_loop.get()).result()
+
+    def close(self) -> None:
+        """Ulanishlarni yopish (testlar va benchmark uchun)"""
+        with self._lock:
+            sync_client, async_client = self._sync_client, self._async_client
+            self._sync_client = self._async_client = None
+
+        if sync_client is not None:
+            sync_client.close()
+        if async_client is not None:
+            asyncio.run_coroutine_threadsafe(async_client.aclose(), background_loop.get()).result()
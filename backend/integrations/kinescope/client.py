@@ -10,11 +10,16 @@ Asosiy funksiyalar:
 - DRM himoyalangan player olish
 """
 
-import httpx
+import logging
 from typing import Optional
 from dataclasses import dataclass
 from django.conf import settings
 
+from integrations.http import HTTPClientConfig, PooledHTTPClient
+from integrations.transport import IntegrationError, IntegrationTransport
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class VideoInfo:
@@ -33,32 +38,28 @@ class KinescopeClient:
 
     BASE_URL = "https://api.kinescope.io/v1"
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Endpoint bo'yicha timeout (sekund)
+    TIMEOUTS = {
+        '/videos/{id}': 5.0,
+        '/videos': 10.0,
+    }
+
+    def __init__(self, api_key: Optional[str] = None, http: Optional[PooledHTTPClient] = None):
         self.api_key = api_key or getattr(settings, 'KINESCOPE_API_KEY', '')
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # Keep-alive ulanishlar pooli
+        self.http = http or PooledHTTPClient(HTTPClientConfig.from_settings(self.BASE_URL, self.headers))
+        self.transport = IntegrationTransport('kinescope', self.http, timeouts=self.TIMEOUTS)
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> dict | None:
         """API ga so'rov yuborish"""
-        url = f"{self.BASE_URL}{endpoint}"
-
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            print(f"Kinescope API error: {e.response.status_code} - {e.response.text}")
-            return None
-        except Exception as e:
-            print(f"Kinescope request error: {e}")
+            return self.transport.request_json(method, endpoint, **kwargs)
+        except IntegrationError as e:
+            logger.warning("Kinescope API error: %s", e)
             return None
 
     def get_video(self, video_id: str) -> Optional[VideoInfo]:
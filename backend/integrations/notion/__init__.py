@@ -1,4 +1,4 @@
-from .client import NotionClient, NotionPage, NotionBlock, notion_client
+from .client import NotionClient, NotionPage, NotionBlock, RenderedPage, notion_client
 from .services import (
     get_lesson_content,
     get_lesson_page_info,
@@ -12,6 +12,7 @@ __all__ = [
     'NotionClient',
     'NotionPage',
     'NotionBlock',
+    'RenderedPage',
     'notion_client',
     'get_lesson_content',
     'get_lesson_page_info',
@@ -0,0 +1,94 @@
+"""
+Notion bloklar daraxtini asinxron yuklash
+
+/blocks/{id}/children sahifalab qaytaradi (start_cursor/next_cursor, har
+safar 100 tagacha blok) va faqat birinchi darajadagi bloklarni beradi.
+Fetcher barcha sahifalarni yuradi, has_children bloklarning bolalarini
+parallel yuklaydi va ularni block['children'] ga joylaydi. Bir vaqtdagi
+so'rovlar semafor bilan, umumiy tezlik transportdagi token bucket bilan
+cheklanadi (Notion ~3 so'rov/s).
+"""
+
+import asyncio
+
+import httpx
+
+from integrations.transport import IntegrationError, IntegrationTransport
+
+PAGE_SIZE = 100
+MAX_DEPTH = 10
+
+# Bolalari alohida sahifa/baza - dars kontentiga kirmaydi
+SKIP_CHILDREN_TYPES = {'child_page', 'child_database'}
+
+
+class BlockFetchError(Exception):
+    """Bloklarni yuklab bo'lmadi (daraxt to'liq emas)"""
+
+
+class BlockTreeFetcher:
+    """Blok va uning barcha ichki bloklarini yuklash"""
+
+    def __init__(
+            self,
+            client: httpx.AsyncClient,
+            transport: IntegrationTransport,
+            concurrency: int = 4,
+            max_depth: int = MAX_DEPTH
+    ):
+        self.client = client
+        self.transport = transport
+        self.max_depth = max_depth
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _request_children(self, block_id: str, cursor: str | None) -> dict:
+        params = {'page_size': PAGE_SIZE}
+        if cursor:
+            params['start_cursor'] = cursor
+
+        # Semafor faqat so'rov davomida - rekursiya ushlab turmaydi
+        async with self._semaphore:
+            try:
+                return await self.transport.arequest_json(
+                    self.client, 'GET', f"/blocks/{block_id}/children", params=params
+                )
+            except IntegrationError as e:
+                raise BlockFetchError(f"{block_id}: {e}") from e
+
+    async def _attach_children(self, block: dict, depth: int) -> None:
+        block['children'] = await self.fetch_children(block['id'], depth)
+
+    async def fetch_children(self, block_id: str, depth: int = 0) -> list[dict]:
+        """
+        Blokning barcha bolalari (ichki bloklari bilan)
+        Bolalar keyingi sahifa kutilayotganda ham yuklanaveradi
+        """
+        blocks = []
+        cursor = None
+
+        # Bitta so'rov xato bo'lsa TaskGroup qolganlarini bekor qiladi
+        try:
+            async with asyncio.TaskGroup() as group:
+                while True:
+                    data = await self._request_children(block_id, cursor)
+
+                    for block in data.get('results', []):
+                        blocks.append(block)
+                        if (
+                            block.get('has_children')
+                            and block.get('type') not in SKIP_CHILDREN_TYPES
+                            and depth < self.max_depth
+                        ):
+                            group.create_task(self._attach_children(block, depth + 1))
+
+                    cursor = data.get('next_cursor')
+                    if not data.get('has_more') or not cursor:
+                        break
+        except ExceptionGroup as group:
+            fetch_errors, other = group.split(BlockFetchError)
+            if other is not None:
+                raise
+            # Ichki darajalar allaqachon yoyilgan - birinchi xatoni uzatamiz
+            raise fetch_errors.exceptions[0] from None
+
+        return blocks
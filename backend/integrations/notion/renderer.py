@@ -0,0 +1,427 @@
+"""
+Notion bloklarini HTML ga aylantirish
+
+Har bir blok turi uchun alohida funksiya NotionRenderer.register() orqali
+ro'yxatga olinadi (if-zanjir o'rniga lug'atdan bitta qidiruv). iter_html()
+yuqori darajadagi bloklarni bo'laklab beradi - StreamingHttpResponse uchun
+butun sahifani xotirada yig'ish shart emas.
+
+Notionda saqlangan fayllar (type='file') vaqtinchalik imzolangan havola
+bilan keladi (~1 soat). get_files_expiry() sahifadagi eng erta muddatni
+beradi - saqlangan HTML shu muddatdan oldin qayta render qilinishi kerak.
+"""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Callable, Iterator
+
+COLOR_CLASSES = {
+    'gray': 'text-gray-500',
+    'brown': 'text-amber-700',
+    'orange': 'text-orange-500',
+    'yellow': 'text-yellow-500',
+    'green': 'text-green-500',
+    'blue': 'text-blue-500',
+    'purple': 'text-purple-500',
+    'pink': 'text-pink-500',
+    'red': 'text-red-500',
+    'gray_background': 'bg-gray-100 dark:bg-gray-800 px-1 rounded',
+    'brown_background': 'bg-amber-100 dark:bg-amber-900/30 px-1 rounded',
+    'orange_background': 'bg-orange-100 dark:bg-orange-900/30 px-1 rounded',
+    'yellow_background': 'bg-yellow-100 dark:bg-yellow-900/30 px-1 rounded',
+    'green_background': 'bg-green-100 dark:bg-green-900/30 px-1 rounded',
+    'blue_background': 'bg-blue-100 dark:bg-blue-900/30 px-1 rounded',
+    'purple_background': 'bg-purple-100 dark:bg-purple-900/30 px-1 rounded',
+    'pink_background': 'bg-pink-100 dark:bg-pink-900/30 px-1 rounded',
+    'red_background': 'bg-red-100 dark:bg-red-900/30 px-1 rounded',
+}
+
+CALLOUT_CLASSES = {
+    'gray_background': 'bg-gray-100 dark:bg-gray-800',
+    'brown_background': 'bg-amber-50 dark:bg-amber-900/20',
+    'orange_background': 'bg-orange-50 dark:bg-orange-900/20',
+    'yellow_background': 'bg-yellow-50 dark:bg-yellow-900/20',
+    'green_background': 'bg-green-50 dark:bg-green-900/20',
+    'blue_background': 'bg-blue-50 dark:bg-blue-900/20',
+    'purple_background': 'bg-purple-50 dark:bg-purple-900/20',
+    'pink_background': 'bg-pink-50 dark:bg-pink-900/20',
+    'red_background': 'bg-red-50 dark:bg-red-900/20',
+}
+
+# Ketma-ket elementlari bitta ro'yxatga yig'iladigan bloklar: (teg, klass)
+LIST_TYPES = {
+    'bulleted_list_item': ('ul', 'list-disc'),
+    'numbered_list_item': ('ol', 'list-decimal'),
+}
+
+# O'z bolalarini o'zi joylaydigan bloklar (qolganlarining bolalari ostiga suriladi)
+CONTAINER_TYPES = {
+    'bulleted_list_item', 'numbered_list_item', 'to_do', 'toggle',
+    'quote', 'callout', 'table', 'column_list', 'column',
+}
+
+
+def escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def extract_text(rich_text: list) -> str:
+    """Rich text dan formatlangan HTML olish"""
+    if not rich_text:
+        return ""
+
+    result = []
+    for t in rich_text:
+        text = escape(t.get('plain_text', ''))
+        annotations = t.get('annotations', {})
+        href = t.get('href')
+
+        # Formatting qo'llash
+        if annotations.get('code'):
+            text = f'<code class="bg-gray-200 dark:bg-dark-600 px-1.5 py-0.5 rounded text-sm font-mono">{text}</code>'
+        if annotations.get('bold'):
+            text = f'<strong class="font-semibold">{text}</strong>'
+        if annotations.get('italic'):
+            text = f'<em>{text}</em>'
+        if annotations.get('strikethrough'):
+            text = f'<del class="text-gray-400">{text}</del>'
+        if annotations.get('underline'):
+            text = f'<u>{text}</u>'
+        if href:
+            text = f'<a href="{href}" class="text-primary-500 hover:text-primary-600 underline" target="_blank" rel="noopener">{text}</a>'
+
+        color_class = COLOR_CLASSES.get(annotations.get('color', 'default'))
+        if color_class:
+            text = f'<span class="{color_class}">{text}</span>'
+
+        result.append(text)
+
+    return "".join(result)
+
+
+def get_file_url(block_data: dict) -> str:
+    """image/pdf/file bloklari uchun URL (external yoki Notion fayli)"""
+    file_type = block_data.get('type')
+    if file_type in ('external', 'file'):
+        return block_data.get(file_type, {}).get('url', '')
+    return ""
+
+
+def get_files_expiry(blocks: list[dict]) -> datetime | None:
+    """Bloklar (ichki bloklar bilan) dagi Notion fayllari havolalarining eng erta muddati"""
+    expiry = None
+    stack = list(blocks)
+    while stack:
+        block = stack.pop()
+        data = block.get(block.get('type', ''), {})
+        if isinstance(data, dict) and data.get('type') == 'file':
+            expiry_time = data.get('file', {}).get('expiry_time')
+            if expiry_time:
+                parsed = datetime.fromisoformat(expiry_time)
+                expiry = parsed if expiry is None else min(expiry, parsed)
+        stack.extend(block.get('children', []))
+    return expiry
+
+
+BlockRenderer = Callable[['NotionRenderer', dict, dict], str]
+
+
+class NotionRenderer:
+    """Blok turi -> render funksiyasi jadvali"""
+
+    def __init__(self):
+        self.renderers: dict[str, BlockRenderer] = {}
+
+    def register(self, *block_types: str):
+        """Dekorator: fn(renderer, block, block_data) -> HTML"""
+        def decorator(fn: BlockRenderer) -> BlockRenderer:
+            for block_type in block_types:
+                self.renderers[block_type] = fn
+            return fn
+        return decorator
+
+    def render_block(self, block: dict) -> str:
+        """Bitta blok (noma'lum turlar - bo'sh satr)"""
+        block_type = block.get('type', '')
+        fn = self.renderers.get(block_type)
+        if fn is None:
+            return ""
+        return fn(self, block, block.get(block_type, {}))
+
+    def render_children(self, block: dict) -> str:
+        return self.render(block.get('children', []))
+
+    def iter_html(self, blocks: list[dict]) -> Iterator[str]:
+        """
+        Bloklar ro'yxatini HTML bo'laklari sifatida berish
+        Ketma-ket list elementlari bitta <ul>/<ol> ga guruhlanadi
+        """
+        separator = ""
+        for block_type, group in groupby(blocks, key=lambda block: block.get('type', '')):
+            if block_type in LIST_TYPES:
+                tag, list_class = LIST_TYPES[block_type]
+                items = "".join(self.render_block(block) for block in group)
+                yield f'{separator}<{tag} class="mb-4 ml-6 space-y-1 {list_class}">{items}</{tag}>'
+                separator = "\n"
+                continue
+
+            for block in group:
+                html = self.render_block(block)
+                if html:
+                    yield separator + html
+                    separator = "\n"
+
+                # Oddiy blok ostidagi bloklar (masalan surilgan paragraflar)
+                if block.get('children') and block_type not in CONTAINER_TYPES:
+                    yield f'{separator}<div class="ml-6">{self.render_children(block)}</div>'
+                    separator = "\n"
+
+    def iter_chunks(self, blocks: list[dict], chunk_size: int = 16 * 1024) -> Iterator[str]:
+        """iter_html bo'laklarini ~chunk_size gacha yig'ib berish (har blok uchun alohida yozuv bo'lmasin)"""
+        buffer = []
+        size = 0
+        for html in self.iter_html(blocks):
+            buffer.append(html)
+            size += len(html)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield "".join(buffer)
+
+    def render(self, blocks: list[dict]) -> str:
+        """Bloklar ro'yxati - bitta HTML satr"""
+        return "".join(self.iter_html(blocks))
+
+
+notion_renderer = NotionRenderer()
+register = notion_renderer.register
+
+
+@register('paragraph')
+def render_paragraph(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    if not text:
+        return '<p class="mb-4">&nbsp;</p>'
+    return f'<p class="mb-4 text-gray-700 dark:text-gray-300 leading-relaxed">{text}</p>'
+
+
+@register('heading_1')
+def render_heading_1(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'<h1 class="text-2xl font-bold text-gray-900 dark:text-white mb-4 mt-8">{text}</h1>'
+
+
+@register('heading_2')
+def render_heading_2(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'<h2 class="text-xl font-bold text-gray-900 dark:text-white mb-3 mt-6">{text}</h2>'
+
+
+@register('heading_3')
+def render_heading_3(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'<h3 class="text-lg font-semibold text-gray-900 dark:text-white mb-2 mt-5">{text}</h3>'
+
+
+@register('bulleted_list_item', 'numbered_list_item')
+def render_list_item(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'<li class="text-gray-700 dark:text-gray-300">{text}{renderer.render_children(block)}</li>'
+
+
+@register('to_do')
+def render_to_do(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    children_html = renderer.render_children(block)
+    nested = f'<div class="ml-7">{children_html}</div>' if children_html else ''
+    if data.get('checked', False):
+        return f'<div class="flex items-start gap-3 mb-2"><span class="text-green-500 mt-0.5">✓</span><span class="line-through text-gray-400">{text}</span></div>{nested}'
+    return f'<div class="flex items-start gap-3 mb-2"><span class="text-gray-400 mt-0.5">☐</span><span class="text-gray-700 dark:text-gray-300">{text}</span></div>{nested}'
+
+
+@register('code')
+def render_code(renderer, block, data):
+    language = data.get('language', 'plain text')
+    caption = extract_text(data.get('caption', []))
+    # Kod annotatsiyasiz, faqat escape qilinadi
+    code_text = escape("".join(t.get('plain_text', '') for t in data.get('rich_text', [])))
+
+    caption_html = f'<div class="text-xs text-gray-400 mt-2">{caption}</div>' if caption else ''
+    return f'''<div class="mb-4">
+    <div class="bg-gray-900 rounded-xl overflow-hidden">
+        <div class="flex items-center justify-between px-4 py-2 bg-gray-800">
+            <span class="text-xs text-gray-400">{language}</span>
+        </div>
+        <pre class="p-4 overflow-x-auto"><code class="text-sm text-gray-100 font-mono">{code_text}</code></pre>
+    </div>
+    {caption_html}
+</div>'''
+
+
+@register('quote')
+def render_quote(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'<blockquote class="border-l-4 border-primary-500 pl-4 py-2 mb-4 text-gray-600 dark:text-gray-400 italic bg-gray-50 dark:bg-dark-700/50 rounded-r-lg">{text}{renderer.render_children(block)}</blockquote>'
+
+
+@register('callout')
+def render_callout(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    icon = ""
+    icon_data = data.get('icon', {})
+    if icon_data.get('type') == 'emoji':
+        icon = icon_data.get('emoji', '💡')
+
+    bg_class = CALLOUT_CLASSES.get(data.get('color', 'gray_background'), 'bg-gray-100 dark:bg-gray-800')
+    return f'''<div class="flex items-start gap-3 p-4 rounded-xl {bg_class} mb-4">
+    <span class="text-xl flex-shrink-0">{icon}</span>
+    <div class="text-gray-700 dark:text-gray-300 flex-1">{text}{renderer.render_children(block)}</div>
+</div>'''
+
+
+@register('divider')
+def render_divider(renderer, block, data):
+    return '<hr class="my-6 border-gray-200 dark:border-gray-700">'
+
+
+@register('image')
+def render_image(renderer, block, data):
+    url = get_file_url(data)
+    if not url:
+        return ""
+    caption = extract_text(data.get('caption', []))
+    caption_html = f'<figcaption class="text-center text-sm text-gray-500 mt-2">{caption}</figcaption>' if caption else ''
+    return f'''<figure class="mb-4">
+    <img src="{url}" alt="{caption}" class="rounded-xl w-full" loading="lazy">
+    {caption_html}
+</figure>'''
+
+
+@register('video')
+def render_video(renderer, block, data):
+    url = data.get('external', {}).get('url', '') if data.get('type') == 'external' else ''
+    if not url:
+        return ""
+
+    # YouTube
+    if 'youtube.com' in url or 'youtu.be' in url:
+        if 'v=' in url:
+            video_id = url.split('v=')[1].split('&')[0]
+        elif 'youtu.be/' in url:
+            video_id = url.split('youtu.be/')[1].split('?')[0]
+        else:
+            video_id = url.split('/')[-1]
+
+        return f'''<div class="aspect-video mb-4 rounded-xl overflow-hidden">
+    <iframe src="https://www.youtube.com/embed/{video_id}" frameborder="0" allowfullscreen class="w-full h-full"></iframe>
+</div>'''
+
+    # Boshqa video
+    return f'''<div class="mb-4">
+    <video src="{url}" controls class="w-full rounded-xl"></video>
+</div>'''
+
+
+@register('bookmark')
+def render_bookmark(renderer, block, data):
+    url = data.get('url', '')
+    caption = extract_text(data.get('caption', []))
+    caption_html = f'<p class="text-sm text-gray-500 mt-1 truncate">{caption}</p>' if caption else ''
+    return f'''<a href="{url}" target="_blank" rel="noopener" class="block p-4 rounded-xl bg-gray-50 dark:bg-dark-700 hover:bg-gray-100 dark:hover:bg-dark-600 mb-4 transition-colors border border-gray-200 dark:border-gray-700">
+    <p class="text-primary-500 truncate text-sm">{url}</p>
+    {caption_html}
+</a>'''
+
+
+@register('toggle')
+def render_toggle(renderer, block, data):
+    text = extract_text(data.get('rich_text', []))
+    return f'''<details class="mb-4 group">
+    <summary class="cursor-pointer p-4 rounded-xl bg-gray-50 dark:bg-dark-700 hover:bg-gray-100 dark:hover:bg-dark-600 transition-colors font-medium text-gray-900 dark:text-white list-none flex items-center gap-2">
+        <svg class="w-4 h-4 transition-transform group-open:rotate-90" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 5l7 7-7 7"/></svg>
+        {text}
+    </summary>
+    <div class="pl-6 pt-2 text-gray-600 dark:text-gray-400">{renderer.render_children(block)}</div>
+</details>'''
+
+
+def render_table_cell(cell: list, is_header: bool) -> str:
+    tag = 'th' if is_header else 'td'
+    weight = ' font-semibold bg-gray-50 dark:bg-dark-700' if is_header else ''
+    return f'<{tag} class="px-4 py-2 border border-gray-200 dark:border-gray-700 text-left{weight}">{extract_text(cell)}</{tag}>'
+
+
+@register('table')
+def render_table(renderer, block, data):
+    # Qatorlar - bolalar
+    column_header = data.get('has_column_header', False)
+    row_header = data.get('has_row_header', False)
+    rows = []
+    for index, row in enumerate(block.get('children', [])):
+        cells = row.get('table_row', {}).get('cells', [])
+        cells_html = "".join(
+            render_table_cell(cell, (index == 0 and column_header) or (column == 0 and row_header))
+            for column, cell in enumerate(cells)
+        )
+        rows.append(f'<tr>{cells_html}</tr>')
+    return f'<div class="overflow-x-auto mb-4"><table class="min-w-full border-collapse text-sm text-gray-700 dark:text-gray-300">{"".join(rows)}</table></div>'
+
+
+@register('table_row')
+def render_table_row(renderer, block, data):
+    cells_html = "".join(render_table_cell(cell, False) for cell in data.get('cells', []))
+    return f'<tr>{cells_html}</tr>'
+
+
+@register('embed')
+def render_embed(renderer, block, data):
+    url = data.get('url', '')
+    return f'''<div class="mb-4 rounded-xl overflow-hidden">
+    <iframe src="{url}" class="w-full h-96 border-0" allowfullscreen></iframe>
+</div>'''
+
+
+@register('pdf')
+def render_pdf(renderer, block, data):
+    url = get_file_url(data)
+    if not url:
+        return ""
+    return f'''<div class="mb-4">
+    <a href="{url}" target="_blank" class="flex items-center gap-3 p-4 rounded-xl bg-red-50 dark:bg-red-900/20 hover:bg-red-100 dark:hover:bg-red-900/30 transition-colors">
+        <svg class="w-8 h-8 text-red-500" fill="currentColor" viewBox="0 0 24 24"><path d="M14 2H6a2 2 0 00-2 2v16a2 2 0 002 2h12a2 2 0 002-2V8l-6-6zm-1 2l5 5h-5V4zM9.5 11c.83 0 1.5.67 1.5 1.5v1c0 .83-.67 1.5-1.5 1.5H9v2H7.5v-6h2zm3.5 0h2c.83 0 1.5.67 1.5 1.5v3c0 .83-.67 1.5-1.5 1.5h-2v-6zm-3 1.5v1h.5v-1H10zm3 0v3h.5v-3H13z"/></svg>
+        <span class="text-red-600 dark:text-red-400 font-medium">PDF faylni ko'rish</span>
+    </a>
+</div>'''
+
+
+@register('file')
+def render_file(renderer, block, data):
+    url = get_file_url(data)
+    if not url:
+        return ""
+    name = data.get('name', 'Fayl')
+    return f'''<div class="mb-4">
+    <a href="{url}" target="_blank" download class="flex items-center gap-3 p-4 rounded-xl bg-gray-50 dark:bg-dark-700 hover:bg-gray-100 dark:hover:bg-dark-600 transition-colors">
+        <svg class="w-6 h-6 text-gray-500" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 10v6m0 0l-3-3m3 3l3-3m2 8H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"/></svg>
+        <span class="text-gray-700 dark:text-gray-300">{name}</span>
+    </a>
+</div>'''
+
+
+@register('equation')
+def render_equation(renderer, block, data):
+    expression = data.get('expression', '')
+    return f'<div class="mb-4 p-4 bg-gray-50 dark:bg-dark-700 rounded-xl text-center font-mono text-gray-700 dark:text-gray-300">{expression}</div>'
+
+
+@register('column_list')
+def render_column_list(renderer, block, data):
+    # Ustunlar - mobil ekranda bir-birining ostida
+    return f'<div class="flex flex-col md:flex-row gap-4 mb-4">{renderer.render_children(block)}</div>'
+
+
+@register('column')
+def render_column(renderer, block, data):
+    return f'<div class="flex-1 min-w-0">{renderer.render_children(block)}</div>'
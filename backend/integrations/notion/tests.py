@@ -0,0 +1,246 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+from django.test import SimpleTestCase
+
+from integrations.http import HTTPClientConfig, PooledHTTPClient
+from integrations.transport import IntegrationTransport, RetryPolicy, TokenBucket
+
+from .client import NotionClient
+from .fetcher import BlockFetchError, BlockTreeFetcher
+from .renderer import NotionRenderer, get_files_expiry, notion_renderer
+
+
+def text(value: str) -> list:
+    return [{'plain_text': value, 'annotations': {}}]
+
+
+def block(block_id: str, block_type: str, has_children: bool = False, **data) -> dict:
+    return {'id': block_id, 'type': block_type, 'has_children': has_children, block_type: data}
+
+
+class FakeNotion:
+    """/blocks/{id}/children ni sahifalab qaytaruvchi soxta API"""
+
+    def __init__(self, children: dict, page_size: int = 2, fail: set = frozenset()):
+        self.children = children
+        self.page_size = page_size
+        self.fail = fail
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        block_id = request.url.path.split('/')[-2]
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if block_id in self.fail:
+                return httpx.Response(500)
+
+            start = int(request.url.params.get('start_cursor', 0))
+            results = self.children.get(block_id, [])
+            end = start + self.page_size
+            return httpx.Response(200, json={
+                'results': results[start:end],
+                'has_more': end < len(results),
+                'next_cursor': str(end) if end < len(results) else None,
+            })
+        finally:
+            self.in_flight -= 1
+
+
+class BlockTreeFetcherTests(SimpleTestCase):
+    """Notion bloklar daraxtini yuklash uchun testlar"""
+
+    def fetch(self, api: FakeNotion, concurrency: int = 4):
+        async def run():
+            mock_transport = httpx.MockTransport(api)
+            async with httpx.AsyncClient(transport=mock_transport, base_url='https://notion.test') as client:
+                transport = IntegrationTransport(
+                    'notion-test', PooledHTTPClient(HTTPClientConfig(base_url='https://notion.test')),
+                    retry=RetryPolicy(max_attempts=1),
+                )
+                fetcher = BlockTreeFetcher(client, transport, concurrency=concurrency)
+                return await fetcher.fetch_children('page')
+
+        return asyncio.run(run())
+
+    def test_follows_cursors_and_children(self):
+        api = FakeNotion({
+            'page': [block(f'p{i}', 'paragraph', rich_text=text(f'{i}')) for i in range(5)] + [
+                block('toggle', 'toggle', has_children=True, rich_text=text('Ochish')),
+            ],
+            'toggle': [block(f't{i}', 'paragraph', rich_text=text(f'ichki {i}')) for i in range(3)],
+        })
+
+        blocks = self.fetch(api)
+
+        self.assertEqual([b['id'] for b in blocks], ['p0', 'p1', 'p2', 'p3', 'p4', 'toggle'])
+        self.assertEqual([b['id'] for b in blocks[-1]['children']], ['t0', 't1', 't2'])
+        # page: 3 sahifa, toggle: 2 sahifa
+        self.assertEqual(api.requests, 5)
+
+    def test_concurrency_limit(self):
+        api = FakeNotion({
+            'page': [block(f'c{i}', 'toggle', has_children=True) for i in range(10)],
+            **{f'c{i}': [block(f'c{i}-x', 'paragraph')] for i in range(10)},
+        }, page_size=100)
+
+        self.fetch(api, concurrency=3)
+
+        self.assertEqual(api.max_in_flight, 3)
+
+    def test_child_pages_are_not_fetched(self):
+        api = FakeNotion({'page': [block('sub', 'child_page', has_children=True, title='Boshqa')]})
+
+        blocks = self.fetch(api)
+
+        self.assertNotIn('children', blocks[0])
+        self.assertEqual(api.requests, 1)
+
+    def test_error_in_subtree(self):
+        api = FakeNotion({
+            'page': [block('toggle', 'toggle', has_children=True)],
+        }, fail={'toggle'})
+
+        with self.assertRaises(BlockFetchError):
+            self.fetch(api)
+
+
+class RenderBlocksTests(SimpleTestCase):
+    """Ichki bloklarni HTML ga aylantirish"""
+
+    def test_toggle_children(self):
+        toggle = block('t', 'toggle', has_children=True, rich_text=text('Savol'))
+        toggle['children'] = [block('a', 'paragraph', rich_text=text('Javob'))]
+
+        html = notion_renderer.render([toggle])
+
+        self.assertIn('<details', html)
+        self.assertRegex(html, r'(?s)<summary.*Savol.*</summary>.*Javob.*</details>')
+
+    def test_table_rows(self):
+        table = block('tbl', 'table', has_children=True, has_column_header=True, has_row_header=False)
+        table['children'] = [
+            block('r1', 'table_row', cells=[text('Soz'), text('Tarjima')]),
+            block('r2', 'table_row', cells=[text('apple'), text('olma')]),
+        ]
+
+        html = notion_renderer.render([table])
+
+        self.assertIn('<table', html)
+        self.assertRegex(html, r'<th[^>]*>Soz</th>')
+        self.assertRegex(html, r'<td[^>]*>olma</td>')
+
+    def test_columns_and_nested_lists(self):
+        columns = block('cl', 'column_list', has_children=True)
+        left = block('c1', 'column', has_children=True)
+        item = block('li', 'bulleted_list_item', has_children=True, rich_text=text('Ota'))
+        item['children'] = [block('li2', 'bulleted_list_item', rich_text=text('Bola'))]
+        left['children'] = [item]
+        right = block('c2', 'column', has_children=True)
+        right['children'] = [block('p', 'paragraph', rich_text=text('Ong'))]
+        columns['children'] = [left, right]
+
+        html = notion_renderer.render([columns])
+
+        self.assertEqual(html.count('class="flex-1 min-w-0"'), 2)
+        self.assertRegex(html, r'(?s)<li[^>]*>Ota<ul[^>]*><li[^>]*>Bola</li></ul></li>')
+        self.assertIn('Ong', html)
+
+    def test_list_grouping_and_streaming(self):
+        blocks = [
+            block('a', 'bulleted_list_item', rich_text=text('Bir')),
+            block('b', 'bulleted_list_item', rich_text=text('Ikki')),
+            block('c', 'numbered_list_item', rich_text=text('Uch')),
+            block('d', 'paragraph', rich_text=text('Matn')),
+            block('e', 'unsupported'),
+        ]
+
+        chunks = list(notion_renderer.iter_html(blocks))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertRegex(chunks[0], r'^<ul[^>]*list-disc[^>]*><li[^>]*>Bir</li><li[^>]*>Ikki</li></ul>$')
+        self.assertRegex(chunks[1], r'^\n<ol[^>]*list-decimal')
+        self.assertEqual(''.join(chunks), notion_renderer.render(blocks))
+        self.assertEqual(list(notion_renderer.iter_chunks(blocks, chunk_size=1 << 20)), [''.join(chunks)])
+
+    def test_register_block_type(self):
+        renderer = NotionRenderer()
+
+        @renderer.register('divider', 'breadcrumb')
+        def render_rule(renderer, block, data):
+            return '<hr>'
+
+        html = renderer.render([block('a', 'divider'), block('b', 'breadcrumb'), block('c', 'paragraph')])
+
+        self.assertEqual(html, '<hr>\n<hr>')
+        self.assertNotIn('breadcrumb', notion_renderer.renderers)
+
+    def test_files_expiry(self):
+        external = block('a', 'image', type='external', external={'url': 'https://example.com/a.png'})
+        late = block('b', 'pdf', type='file', file={'url': 'https://s3/b', 'expiry_time': '2024-05-01T11:00:00.000Z'})
+        early = block('c', 'image', type='file', file={'url': 'https://s3/c', 'expiry_time': '2024-05-01T10:30:00.000Z'})
+        toggle = block('t', 'toggle', has_children=True, rich_text=text('Fayllar'))
+        toggle['children'] = [early]
+
+        self.assertIsNone(get_files_expiry([external]))
+        self.assertEqual(
+            get_files_expiry([external, late, toggle]),
+            datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+        )
+
+
+class NotionClientPoolTests(SimpleTestCase):
+    """Sinxron va asinxron so'rovlar bitta pooldagi klientlar orqali"""
+
+    def setUp(self):
+        self.paths = []
+        self.children_status = 200
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.paths.append((request.url.path, request.headers['Notion-Version']))
+            if request.url.path.endswith('/children'):
+                if self.children_status != 200:
+                    return httpx.Response(self.children_status, json={})
+                return httpx.Response(200, json={
+                    'results': [block('p', 'paragraph', rich_text=text('Salom'))], 'has_more': False,
+                })
+            return httpx.Response(200, json={'id': 'page', 'last_edited_time': '2024-05-01T10:00:00.000Z'})
+
+        client = NotionClient(api_key='test', http=PooledHTTPClient(
+            HTTPClientConfig.from_settings(NotionClient.BASE_URL, {'Notion-Version': NotionClient.NOTION_VERSION}),
+            transport=httpx.MockTransport(handler),
+            async_transport=httpx.MockTransport(handler),
+        ))
+        client.transport.rate_limiter = TokenBucket(rate=1000)
+        self.notion = client
+        self.addCleanup(client.http.close)
+
+    def test_clients_are_reused(self):
+        self.assertIs(self.notion.http.sync, self.notion.http.sync)
+
+        page = self.notion.get_page('a' * 32)
+        html = self.notion.get_page_html('a' * 32)
+        async_client = self.notion.http.get_async()
+        self.notion.get_page_html('a' * 32)
+
+        self.assertEqual(page.last_edited_time, '2024-05-01T10:00:00.000Z')
+        self.assertIn('Salom', html)
+        self.assertIs(self.notion.http.get_async(), async_client)
+        uuid = f"{'a' * 8}-{'a' * 4}-{'a' * 4}-{'a' * 4}-{'a' * 12}"
+        self.assertEqual(self.paths[:2], [
+            (f'/v1/pages/{uuid}', NotionClient.NOTION_VERSION),
+            (f'/v1/blocks/{uuid}/children', NotionClient.NOTION_VERSION),
+        ])
+
+    def test_full_page_without_content_is_none(self):
+        self.assertIn('Salom', self.notion.get_full_page('a' * 32).html_content)
+
+        # Bloklar olinmasa qisman sahifa (bo'sh kontent) keshga tushmaydi
+        self.children_status = 404
+        self.assertIsNone(self.notion.get_full_page('a' * 32))
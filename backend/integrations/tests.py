@@ -0,0 +1,211 @@
+import asyncio
+import os
+import time
+from concurrent.futures import CancelledError
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from .http import HTTPClientConfig, PooledHTTPClient
+from .transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    IntegrationError,
+    IntegrationMetrics,
+    IntegrationTransport,
+    RetryPolicy,
+    TokenBucket,
+    get_endpoint_label,
+    parse_retry_after,
+)
+
+
+class IntegrationTransportTests(SimpleTestCase):
+    """Retry, circuit breaker va metrikalar uchun testlar"""
+
+    def make_transport(self, responses: list, **kwargs):
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            response = responses.pop(0)
+            if isinstance(response, BaseException):
+                raise response
+            return response
+
+        http = PooledHTTPClient(
+            HTTPClientConfig(base_url='https://api.test'),
+            transport=httpx.MockTransport(handler),
+            async_transport=httpx.MockTransport(handler),
+        )
+        self.addCleanup(http.close)
+        self.metrics = IntegrationMetrics()
+        return IntegrationTransport('test', http, metrics=self.metrics, **kwargs)
+
+    @mock.patch('integrations.transport.time.sleep')
+    def test_retries_honour_retry_after(self, sleep):
+        transport = self.make_transport([
+            httpx.Response(429, headers={'Retry-After': '2'}),
+            httpx.Response(503),
+            httpx.Response(200, json={'ok': True}),
+        ])
+
+        self.assertEqual(transport.request_json('GET', '/pages/abc12345-0000'), {'ok': True})
+
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(sleep.call_args_list[0], mock.call(2.0))
+        # Jitterli backoff: 0 .. base * 2 ** attempt
+        self.assertLessEqual(sleep.call_args_list[1].args[0], 1.0)
+        self.assertEqual(self.metrics.retries[('test', '/pages/{id}')], 2)
+
+    @mock.patch('integrations.transport.time.sleep')
+    def test_gives_up_after_max_attempts(self, sleep):
+        transport = self.make_transport([httpx.Response(500)] * 3, retry=RetryPolicy(max_attempts=3))
+
+        with self.assertRaises(IntegrationError) as ctx:
+            transport.request('GET', '/pages/x')
+
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_client_errors_and_post_are_not_retried(self):
+        transport = self.make_transport([httpx.Response(404), httpx.Response(502)])
+
+        with self.assertRaises(IntegrationError):
+            transport.request('GET', '/pages/x')
+        with self.assertRaises(IntegrationError):
+            transport.request('POST', '/search')
+
+        self.assertEqual(len(self.requests), 2)
+
+    def test_long_retry_after_is_not_awaited(self):
+        transport = self.make_transport([httpx.Response(429, headers={'Retry-After': '3600'})])
+
+        with self.assertRaises(IntegrationError):
+            transport.request('GET', '/pages/x')
+        self.assertEqual(len(self.requests), 1)
+
+    def test_circuit_breaker_fails_fast(self):
+        transport = self.make_transport(
+            [httpx.ConnectError('down')] * 2,
+            retry=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+
+        for _ in range(2):
+            with self.assertRaises(IntegrationError):
+                transport.request('GET', '/pages/x')
+
+        with self.assertRaises(CircuitOpenError):
+            transport.request('GET', '/pages/x')
+        self.assertEqual(len(self.requests), 2)
+        self.assertIn(
+            f'integration_circuit_open{{worker="{os.getpid()}",service="test"}} 1', self.metrics.render_prometheus()
+        )
+
+    @mock.patch('integrations.transport.time.monotonic')
+    def test_cancelled_probe_reopens_circuit(self, monotonic):
+        monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        transport = self.make_transport(
+            [asyncio.CancelledError(), httpx.Response(200, json={})], breaker=breaker
+        )
+        breaker.record_failure()
+
+        monotonic.return_value = 131.0
+        # http.run() bekor qilingan korutinani concurrent.futures.CancelledError sifatida beradi
+        with self.assertRaises(CancelledError):
+            transport.http.run(lambda client: transport.arequest(client, 'GET', '/pages/x'))
+
+        # Bekor qilingan sinov - xato: breaker yana ochiq, keyingi sinov reset_timeout dan keyin
+        self.assertEqual(breaker.state, breaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            transport.request('GET', '/pages/x')
+
+        monotonic.return_value = 162.0
+        transport.request('GET', '/pages/x')
+        self.assertEqual(breaker.state, breaker.CLOSED)
+
+    def test_non_transport_errors_become_integration_errors(self):
+        transport = self.make_transport([httpx.DecodingError('bad gzip')])
+
+        with self.assertRaises(IntegrationError):
+            transport.request('GET', '/pages/x')
+        with self.assertRaises(IntegrationError):
+            transport.request('GET', '/pages/\x00')
+
+        self.assertEqual(len(self.requests), 1)
+
+    def test_async_request_and_histogram(self):
+        transport = self.make_transport([httpx.Response(200, json={'id': 1})])
+
+        data = transport.http.run(lambda client: transport.arequest_json(client, 'GET', '/blocks/abc12345/children'))
+
+        self.assertEqual(data, {'id': 1})
+        exported = self.metrics.render_prometheus()
+        self.assertIn(
+            f'integration_request_duration_seconds_count{{worker="{os.getpid()}",service="test",'
+            'endpoint="/blocks/{id}/children",outcome="2xx"} 1',
+            exported
+        )
+        self.assertIn('le="+Inf"} 1', exported)
+
+    def test_per_endpoint_timeout(self):
+        transport = self.make_transport([httpx.Response(200, json={})], timeouts={'/pages/{id}': 2.5})
+
+        transport.request('GET', '/pages/0123456789abcdef')
+
+        self.assertEqual(self.requests[0].extensions['timeout']['read'], 2.5)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    @mock.patch('integrations.transport.time.monotonic')
+    def test_half_open_probe(self, monotonic):
+        monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow())
+        # Sinov so'rovi tugaguncha boshqalar kutadi
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        waits = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, places=2)
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+
+    def test_refills_over_time(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.reserve()
+        time.sleep(0.02)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class HelpersTests(SimpleTestCase):
+
+    def test_endpoint_label(self):
+        self.assertEqual(
+            get_endpoint_label('/blocks/1a2b3c4d-0000-0000-0000-000000000000/children'),
+            '/blocks/{id}/children'
+        )
+        self.assertEqual(get_endpoint_label('/videos'), '/videos')
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('5'), 5.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
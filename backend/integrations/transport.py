@@ -0,0 +1,435 @@
+"""
+Integratsiyalar uchun umumiy transport
+
+Notion va Kinescope klientlari so'rovlarni IntegrationTransport orqali
+yuboradi:
+- endpoint bo'yicha timeout (ID lar {id} ga almashtirilgan yo'l);
+- 429 va 5xx da jitterli eksponensial qayta urinish, Retry-After hisobga olinadi;
+- circuit breaker: ketma-ket xatolardan keyin servis ma'lum vaqt so'ralmaydi,
+  chaqiruvchi 30 s kutish o'rniga darhol IntegrationError oladi;
+- kechikish gistogrammalari (Prometheus text format, integration_metrics).
+
+Metrikalar, breaker va rate limit har bir worker jarayonida alohida: gunicorn
+--workers 3 da NOTION_RATE_LIMIT har bir jarayonga beriladi, metrikalar esa
+worker="<pid>" yorlig'i bilan chiqadi (Prometheus ularni sum by(...) bilan
+qo'shadi, har bir seriya o'z jarayoni ichida monoton).
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+from django.utils import timezone
+
+from .http import PooledHTTPClient
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# ID ga o'xshash segment (UUID, 32 belgili hex, raqamli ID)
+ID_SEGMENT_RE = re.compile(r'^(?=.*\d)[0-9a-zA-Z-]{8,}$|^\d+$')
+
+
+class IntegrationError(Exception):
+    """Integratsiya so'rovi bajarilmadi"""
+
+    def __init__(self, service: str, message: str, status_code: int | None = None):
+        self.service = service
+        self.status_code = status_code
+        super().__init__(f"{service}: {message}")
+
+
+class CircuitOpenError(IntegrationError):
+    """Servis vaqtincha o'chirilgan (circuit breaker ochiq)"""
+
+
+def get_endpoint_label(path: str) -> str:
+    """/pages/<uuid> -> /pages/{id} (metrikalar va timeoutlar uchun)"""
+    path = path.split('?', 1)[0]
+    return '/'.join('{id}' if ID_SEGMENT_RE.match(segment) else segment for segment in path.split('/'))
+
+
+# ============== RATE LIMIT ==============
+
+class TokenBucket:
+    """
+    So'rovlar tezligini cheklash: o'rtacha rate so'rov/s, capacity gacha portlash
+    Oqimlar va event looplar orasida umumiy (threading.Lock), lekin jarayon
+    ichida - N ta worker jami N * rate so'rov/s yuborishi mumkin
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Bitta token band qilish. Returns: so'rovdan oldin kutish kerak bo'lgan sekundlar"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Manfiy qoldiq - navbat: keyingi chaqiruvlar ko'proq kutadi
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+# ============== RETRY ==============
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Qayta urinish qoidalari"""
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    # Retry-After bundan uzun bo'lsa kutmaymiz - xato qaytaramiz
+    max_retry_after: float = 30.0
+    retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+
+    def should_retry(self, method: str, status_code: int | None) -> bool:
+        """status_code None - tarmoq xatosi yoki timeout"""
+        # 429 da so'rov bajarilmagan - har qanday metod uchun xavfsiz
+        if status_code == 429:
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def get_delay(self, attempt: int, response: httpx.Response | None = None) -> float | None:
+        """
+        attempt-urinishdan keyingi kutish (sekund)
+        Returns: None - Retry-After juda uzoq, qayta urinilmaydi
+        """
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+
+        # Full jitter: bir vaqtda yiqilgan klientlar bir vaqtda qaytmasin
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After: sekundlar yoki HTTP sana"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - timezone.now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+# ============== CIRCUIT BREAKER ==============
+
+class CircuitBreaker:
+    """
+    closed -> (failure_threshold ketma-ket xato) -> open -> (reset_timeout) -> half_open
+    half_open da bitta sinov so'rovi: muvaffaqiyat - closed, xato - yana open
+    Sinov so'rovi har doim record_success/record_failure bilan yakunlanishi kerak
+    (bekor qilingan so'rov - xato), aks holda breaker half_open da qotib qoladi
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+# ============== METRICS ==============
+
+class LatencyHistogram:
+    """Kumulyativ bucketli gistogramma (Prometheus histogram kabi)"""
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # oxirgisi +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        index = next((i for i, bound in enumerate(self.BUCKETS) if seconds <= bound), len(self.BUCKETS))
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        bounds = [str(bound) for bound in self.BUCKETS] + ['+Inf']
+        result = []
+        running = 0
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class IntegrationMetrics:
+    """Jarayon ichidagi integratsiya metrikalari (har bir seriya worker="<pid>" yorlig'i bilan)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}  # (service, endpoint, outcome) -> LatencyHistogram
+        self.retries = {}  # (service, endpoint) -> int
+        self.breakers = {}  # service -> CircuitBreaker
+
+    def observe(self, service: str, endpoint: str, outcome: str, seconds: float) -> None:
+        with self._lock:
+            key = (service, endpoint, outcome)
+            if key not in self.latency:
+                self.latency[key] = LatencyHistogram()
+            self.latency[key].observe(seconds)
+
+    def count_retry(self, service: str, endpoint: str) -> None:
+        with self._lock:
+            self.retries[(service, endpoint)] = self.retries.get((service, endpoint), 0) + 1
+
+    def register_breaker(self, service: str, breaker: CircuitBreaker) -> None:
+        self.breakers[service] = breaker
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        # Fork dan keyin ham to'g'ri bo'lishi uchun pid har safar olinadi
+        worker = f'worker="{os.getpid()}"'
+        lines = [
+            '# HELP integration_request_duration_seconds Integratsiya so\'rovlari kechikishi',
+            '# TYPE integration_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            for (service, endpoint, outcome), histogram in sorted(self.latency.items()):
+                labels = f'{worker},service="{service}",endpoint="{endpoint}",outcome="{outcome}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'integration_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'integration_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'integration_request_duration_seconds_count{{{labels}}} {histogram.count}')
+
+            lines += [
+                '# HELP integration_retries_total Qayta urinishlar soni',
+                '# TYPE integration_retries_total counter',
+            ]
+            for (service, endpoint), count in sorted(self.retries.items()):
+                lines.append(
+                    f'integration_retries_total{{{worker},service="{service}",endpoint="{endpoint}"}} {count}'
+                )
+
+        lines += [
+            '# HELP integration_circuit_open Circuit breaker ochiqmi (1 - so\'rovlar yuborilmayapti)',
+            '# TYPE integration_circuit_open gauge',
+        ]
+        for service, breaker in sorted(self.breakers.items()):
+            lines.append(
+                f'integration_circuit_open{{{worker},service="{service}"}} {int(breaker.state != breaker.CLOSED)}'
+            )
+
+        return '\n'.join(lines) + '\n'
+
+
+integration_metrics = IntegrationMetrics()
+
+
+# ============== TRANSPORT ==============
+
+class IntegrationTransport:
+    """Pooldagi klientlar ustidan retry, circuit breaker, rate limit va metrikalar"""
+
+    def __init__(
+            self,
+            service: str,
+            http: PooledHTTPClient,
+            timeouts: dict[str, float] | None = None,
+            retry: RetryPolicy | None = None,
+            breaker: CircuitBreaker | None = None,
+            rate_limiter: TokenBucket | None = None,
+            metrics: IntegrationMetrics = integration_metrics
+    ):
+        self.service = service
+        self.http = http
+        self.timeouts = timeouts or {}
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        metrics.register_breaker(service, self.breaker)
+
+    def _prepare(self, path: str, kwargs: dict) -> str:
+        endpoint = get_endpoint_label(path)
+        if 'timeout' not in kwargs and endpoint in self.timeouts:
+            kwargs['timeout'] = self.timeouts[endpoint]
+        return endpoint
+
+    def _check_circuit(self, endpoint: str) -> None:
+        if not self.breaker.allow():
+            self.metrics.observe(self.service, endpoint, 'circuit_open', 0.0)
+            raise CircuitOpenError(self.service, "servis vaqtincha o'chirilgan (circuit breaker)")
+
+    def _record(self, endpoint: str, started: float, response: httpx.Response | None) -> None:
+        """Natijani metrikaga va breaker ga yozish"""
+        if response is None:
+            outcome = 'error'
+        else:
+            outcome = f'{response.status_code // 100}xx'
+        self.metrics.observe(self.service, endpoint, outcome, time.perf_counter() - started)
+
+        # 4xx (shu jumladan 429) - servis ishlayapti, breaker uchun xato emas
+        if response is None or response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _abort(self, endpoint: str, started: float, error: BaseException) -> None:
+        """
+        So'rov transport xatosidan boshqa sabab bilan uzildi (bekor qilish, dekodlash xatosi...)
+        Xato sifatida yoziladi - half_open dagi sinov so'rovi breaker ni band qilib qolmasin
+        Raises: IntegrationError - httpx xatolari (chaqiruvchilar faqat IntegrationError ni kutadi)
+        """
+        self._record(endpoint, started, None)
+        if isinstance(error, (httpx.HTTPError, httpx.InvalidURL)):
+            raise IntegrationError(self.service, f"so'rov xatosi: {error}") from error
+
+    def _next_delay(self, method: str, attempt: int, endpoint: str, response, error) -> float | None:
+        status_code = response.status_code if response is not None else None
+        if attempt + 1 >= self.retry.max_attempts or not self.retry.should_retry(method, status_code):
+            return None
+        delay = self.retry.get_delay(attempt, response)
+        if delay is not None:
+            self.metrics.count_retry(self.service, endpoint)
+        return delay
+
+    def _raise_error(self, response: httpx.Response | None, error: Exception | None):
+        if response is None:
+            raise IntegrationError(self.service, f"so'rov xatosi: {error}") from error
+        if response.is_error:
+            raise IntegrationError(
+                self.service, f"{response.status_code} - {response.text[:200]}", status_code=response.status_code
+            )
+        return response
+
+    def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Sinxron so'rov
+        Raises: IntegrationError - barcha urinishlardan keyin ham xato (yoki breaker ochiq)
+        """
+        endpoint = self._prepare(path, kwargs)
+
+        attempt = 0
+        while True:
+            self._check_circuit(endpoint)
+
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                    started = time.perf_counter()
+                response = self.http.sync.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            except BaseException as e:
+                self._abort(endpoint, started, e)
+                raise
+            self._record(endpoint, started, response)
+
+            if response is not None and not response.is_error:
+                return response
+
+            delay = self._next_delay(method, attempt, endpoint, response, error)
+            if delay is None:
+                self._raise_error(response, error)
+            time.sleep(delay)
+            attempt += 1
+
+    async def arequest(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> httpx.Response:
+        """Asinxron so'rov (client - PooledHTTPClient.run() bergan klient)"""
+        endpoint = self._prepare(path, kwargs)
+
+        attempt = 0
+        while True:
+            self._check_circuit(endpoint)
+
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire_async()
+                    started = time.perf_counter()
+                response = await client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            except BaseException as e:
+                # asyncio.CancelledError ham shu yerga tushadi (masalan gather dagi qo'shni xato)
+                self._abort(endpoint, started, e)
+                raise
+            self._record(endpoint, started, response)
+
+            if response is not None and not response.is_error:
+                return response
+
+            delay = self._next_delay(method, attempt, endpoint, response, error)
+            if delay is None:
+                self._raise_error(response, error)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def request_json(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            return self.request(method, path, **kwargs).json()
+        except ValueError as e:
+            raise IntegrationError(self.service, f"JSON javob emas: {e}") from e
+
+    async def arequest_json(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> dict:
+        response = await self.arequest(client, method, path, **kwargs)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise IntegrationError(self.service, f"JSON javob emas: {e}") from e